@@ -6,3 +6,6 @@ class AccountsConfig(AppConfig):
     name = 'apps.v1.accounts'
     label = 'accounts'
     verbose_name = 'Пользователи'
+
+    def ready(self):
+        import apps.v1.accounts.signals
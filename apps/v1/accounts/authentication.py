@@ -0,0 +1,64 @@
+"""
+JWT аутентификация с ролями из токена
+"""
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import CustomUser
+from .roles import get_permissions_version
+from .tokens import PERMISSIONS_VERSION_CLAIM, ROLES_CLAIM
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    Пользователь из JWT claims
+    
+    id и роли доступны без запроса к БД, остальные атрибуты загружают
+    пользователя из БД при первом обращении.
+    """
+    is_authenticated = True
+    is_anonymous = False
+    
+    def __init__(self, user_id, roles):
+        super().__init__(lambda: CustomUser.objects.get(pk=user_id))
+        self.__dict__['_claims_user_id'] = user_id
+        # Используется apps.v1.accounts.roles.get_user_roles
+        self.__dict__['_role_names_cache'] = frozenset(roles)
+    
+    @property
+    def id(self):
+        return self.__dict__['_claims_user_id']
+    
+    pk = id
+    
+    def __bool__(self):
+        return True
+
+
+class RoleClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT аутентификация, доверяющая ролям из токена
+    
+    Токен отклоняется, если версия прав пользователя изменилась после его выпуска.
+    Токены без ролей (выпущенные ранее) обрабатываются стандартно.
+    """
+    def get_user(self, validated_token):
+        if ROLES_CLAIM not in validated_token or PERMISSIONS_VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+        
+        permissions_version = get_permissions_version(user_id)
+        if permissions_version is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        
+        if permissions_version != validated_token[PERMISSIONS_VERSION_CLAIM]:
+            raise AuthenticationFailed('Права пользователя изменились, выполните вход повторно', code='permissions_changed')
+        
+        return ClaimsUser(user_id, validated_token[ROLES_CLAIM])
@@ -1,20 +1,15 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import Group
 
+from apps.v1.accounts.roles import ROLE_CUSTOMER, WORKER_ROLES
+
 
 class Command(BaseCommand):
     help = 'Создание групп пользователей'
 
     def handle(self, *args, **options):
         # Список групп для создания
-        groups_to_create = [
-            'Дежурный инженер',
-            'Заказчик',
-            'Инспектор МЧС',
-            'Менеджер',
-            'Обслуживающий инженер',
-            'Исполнителя',
-        ]
+        groups_to_create = [ROLE_CUSTOMER, *WORKER_ROLES]
         
         created_count = 0
         existing_count = 0
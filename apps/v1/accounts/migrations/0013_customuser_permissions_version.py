@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_customuser_email_verification_token_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='permissions_version',
+            field=models.PositiveIntegerField(default=0, help_text='Увеличивается при изменении групп пользователя, старые JWT токены становятся недействительными', verbose_name='Версия прав'),
+        ),
+    ]
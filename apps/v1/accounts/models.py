@@ -150,6 +150,11 @@ class CustomUser(AbstractUser):
         verbose_name="Пароль (plain text)",
         help_text="Пароль в открытом виде (для администраторов)"
     )
+    permissions_version = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Версия прав",
+        help_text="Увеличивается при изменении групп пользователя, старые JWT токены становятся недействительными"
+    )
  
     # Use email as the username field
     USERNAME_FIELD = 'email'
@@ -176,6 +181,21 @@ class CustomUser(AbstractUser):
         """
         return self.first_name if self.first_name else self.email
 
+    def save(self, *args, **kwargs):
+        """
+        permissions_version меняется только через bump_permissions_version
+        (UPDATE с F() + 1), поэтому обычный save() существующего пользователя ее
+        не записывает: иначе устаревший объект вернул бы старую версию и отозванные
+        JWT токены снова стали бы действительными.
+        """
+        if not self._state.adding and self.pk is not None and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred_fields = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'permissions_version' and field.attname not in deferred_fields
+            ]
+        super().save(*args, **kwargs)
+
 
 class PurchasedService(models.Model):
     user = models.ForeignKey(
@@ -0,0 +1,117 @@
+"""
+Определение ролей (групп) пользователя
+
+Имена групп пользователя загружаются один раз за запрос: результат хранится
+на объекте пользователя и в общем кэше на короткое время. Кэш сбрасывается
+сигналами при изменении user.groups (см. signals.py).
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+ROLE_ADMIN = 'Администратор'
+ROLE_CUSTOMER = 'Заказчик'
+ROLE_MANAGER = 'Менеджер'
+
+# Роли работников (порядок - как в списке работников)
+WORKER_ROLES = [
+    'Дежурный инженер',
+    'Инспектор МЧС',
+    ROLE_MANAGER,
+    'Обслуживающий инженер',
+    'Исполнителя',
+]
+
+ROLES_CACHE_KEY = 'user_roles:{user_id}'
+ROLES_CACHE_TIMEOUT = 60  # секунд
+
+PERMISSIONS_VERSION_CACHE_KEY = 'user_permissions_version:{user_id}'
+PERMISSIONS_VERSION_CACHE_TIMEOUT = 300  # секунд
+
+
+def get_user_roles(user):
+    """
+    Получение множества имен групп пользователя
+    """
+    if user is None or not getattr(user, 'pk', None):
+        return frozenset()
+    
+    # Кэш на объекте пользователя (живет в рамках запроса)
+    roles = getattr(user, '_role_names_cache', None)
+    if roles is not None:
+        return roles
+    
+    cache_key = ROLES_CACHE_KEY.format(user_id=user.pk)
+    roles = cache.get(cache_key)
+    if roles is None:
+        roles = frozenset(user.groups.values_list('name', flat=True))
+        cache.set(cache_key, roles, ROLES_CACHE_TIMEOUT)
+    
+    user._role_names_cache = roles
+    return roles
+
+
+def has_role(user, role_name):
+    """
+    Проверка наличия роли у пользователя
+    """
+    return role_name in get_user_roles(user)
+
+
+def is_admin(user):
+    return has_role(user, ROLE_ADMIN)
+
+
+def is_customer(user):
+    return has_role(user, ROLE_CUSTOMER)
+
+
+def invalidate_user_roles(user_ids):
+    """
+    Сброс кэша ролей для указанных пользователей
+    """
+    cache.delete_many([ROLES_CACHE_KEY.format(user_id=user_id) for user_id in user_ids])
+
+
+def get_permissions_version(user_id):
+    """
+    Текущая версия прав активного пользователя (None - пользователь не найден или неактивен)
+    """
+    cache_key = PERMISSIONS_VERSION_CACHE_KEY.format(user_id=user_id)
+    version = cache.get(cache_key)
+    if version is None:
+        from .models import CustomUser
+        version = CustomUser.objects.filter(
+            pk=user_id, is_active=True
+        ).values_list('permissions_version', flat=True).first()
+        if version is not None:
+            cache.set(cache_key, version, PERMISSIONS_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def invalidate_permissions_version(user_ids):
+    """
+    Сброс кэша версии прав для указанных пользователей
+
+    Выполняется после коммита транзакции: иначе параллельный запрос успеет
+    закэшировать старую версию и отозванный токен будет приниматься до
+    истечения кэша.
+    """
+    keys = [PERMISSIONS_VERSION_CACHE_KEY.format(user_id=user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def bump_permissions_version(user_ids, instance=None):
+    """
+    Увеличение версии прав: ранее выданные JWT токены с ролями перестают приниматься
+    """
+    from .models import CustomUser
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    CustomUser.objects.filter(pk__in=user_ids).update(permissions_version=F('permissions_version') + 1)
+    invalidate_permissions_version(user_ids)
+    if instance is not None:
+        # Синхронизируем объект в памяти: токены, выпущенные по нему, получат новую версию
+        # (save() версию не записывает, см. CustomUser.save)
+        instance.permissions_version += 1
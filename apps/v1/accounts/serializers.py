@@ -231,90 +231,33 @@ class ProfileSerializer(serializers.ModelSerializer):
         """
         return [{'id': g.id, 'name': g.name} for g in obj.groups.all()]
     
+    def _get_profile_counters(self, obj):
+        """
+        Счетчики профиля из кэша (один расчет на сериализацию)
+        """
+        from apps.v1.user_objects.counters import get_profile_counters
+        
+        cache_attr = '_profile_counters'
+        counters = getattr(self, cache_attr, None)
+        if counters is None or counters[0] != obj.pk:
+            counters = (obj.pk, get_profile_counters(obj))
+            setattr(self, cache_attr, counters)
+        return counters[1]
+    
     def get_active_applications(self, obj):
         """
         Получение количества активных заявок
         Активные заявки - это заявки со статусами: active, pending, on_hold
+        Заказчик - свои объекты, администратор - все объекты, другие роли - объекты, где они работники
         """
-        from apps.v1.user_objects.models import UserObject, UserObjectWorkers
-        from django.utils import timezone
-        from datetime import datetime
-        
-        # Проверяем роли пользователя
-        is_customer = obj.groups.filter(name='Заказчик').exists()
-        is_admin = obj.groups.filter(name='Администратор').exists()
-        
-        if is_admin:
-            # Для Администратора считаем все объекты
-            count = UserObject.objects.filter(
-                is_deleted=False,
-                status__in=[UserObject.Status.ACTIVE, UserObject.Status.PENDING, UserObject.Status.ON_HOLD]
-            ).count()
-        elif is_customer:
-            # Для Заказчика считаем из UserObject
-            # Активные заявки: active, pending, on_hold
-            count = UserObject.objects.filter(
-                user=obj,
-                is_deleted=False,
-                status__in=[UserObject.Status.ACTIVE, UserObject.Status.PENDING, UserObject.Status.ON_HOLD]
-            ).count()
-        else:
-            # Для других ролей считаем из UserObjectWorkers
-            count = UserObjectWorkers.objects.filter(
-                user=obj,
-                user_object__is_deleted=False,
-                user_object__status__in=[UserObject.Status.ACTIVE, UserObject.Status.PENDING, UserObject.Status.ON_HOLD]
-            ).count()
-        
-        return count
+        return self._get_profile_counters(obj)['active_applications']
     
     def get_completed_this_month(self, obj):
         """
         Получение количества выполненных заявок за текущий месяц
         Выполненные заявки - это заявки со статусами: completed, cancelled
         """
-        from apps.v1.user_objects.models import UserObject, UserObjectWorkers
-        from django.utils import timezone
-        from datetime import datetime
-        
-        # Получаем текущий месяц и год
-        now = timezone.now()
-        current_month = now.month
-        current_year = now.year
-        
-        # Проверяем роли пользователя
-        is_customer = obj.groups.filter(name='Заказчик').exists()
-        is_admin = obj.groups.filter(name='Администратор').exists()
-        
-        if is_admin:
-            # Для Администратора считаем все объекты
-            count = UserObject.objects.filter(
-                is_deleted=False,
-                status__in=[UserObject.Status.COMPLETED, UserObject.Status.CANCELLED],
-                updated_at__month=current_month,
-                updated_at__year=current_year
-            ).count()
-        elif is_customer:
-            # Для Заказчика считаем из UserObject
-            # Выполненные заявки: completed, cancelled
-            count = UserObject.objects.filter(
-                user=obj,
-                is_deleted=False,
-                status__in=[UserObject.Status.COMPLETED, UserObject.Status.CANCELLED],
-                updated_at__month=current_month,
-                updated_at__year=current_year
-            ).count()
-        else:
-            # Для других ролей считаем из UserObjectWorkers
-            count = UserObjectWorkers.objects.filter(
-                user=obj,
-                user_object__is_deleted=False,
-                user_object__status__in=[UserObject.Status.COMPLETED, UserObject.Status.CANCELLED],
-                user_object__updated_at__month=current_month,
-                user_object__updated_at__year=current_year
-            ).count()
-        
-        return count
+        return self._get_profile_counters(obj)['completed_this_month']
     
     def get_awaiting_payment(self, obj):
         """
@@ -0,0 +1,59 @@
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import CustomUser
+from .roles import bump_permissions_version, invalidate_permissions_version, invalidate_user_roles
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Сброс кэша ролей и увеличение версии прав при изменении групп пользователя
+    """
+    if reverse and action == 'pre_clear':
+        # group.user_set.clear() - pk_set не передается, запоминаем пользователей заранее
+        instance._cleared_user_ids = list(instance.user_set.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action != 'post_clear' and not pk_set:
+        return
+    
+    if not reverse:
+        instance.__dict__.pop('_role_names_cache', None)
+        user_ids = [instance.pk]
+    elif action == 'post_clear':
+        user_ids = getattr(instance, '_cleared_user_ids', [])
+    else:
+        user_ids = list(pk_set or [])
+    
+    invalidate_user_roles(user_ids)
+    bump_permissions_version(user_ids, instance=None if reverse else instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    """
+    Сброс кэша ролей участников группы при переименовании или удалении группы
+    """
+    if instance.pk and not kwargs.get('created'):
+        user_ids = list(instance.user_set.values_list('id', flat=True))
+        invalidate_user_roles(user_ids)
+        bump_permissions_version(user_ids)
+
+
+@receiver(post_save, sender=CustomUser)
+def user_deactivated(sender, instance, created, **kwargs):
+    """
+    Деактивированный пользователь не должен проходить аутентификацию по ролям из токена
+    """
+    if not created and not instance.is_active:
+        invalidate_permissions_version([instance.pk])
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_permissions_version([instance.pk])
+    invalidate_user_roles([instance.pk])
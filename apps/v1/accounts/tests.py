@@ -1,3 +1,42 @@
+from django.contrib.auth.models import Group
 from django.test import TestCase
+from rest_framework.exceptions import AuthenticationFailed
 
-# Create your tests here.
+from .authentication import RoleClaimsJWTAuthentication
+from .models import CustomUser
+from .roles import ROLE_CUSTOMER
+from .tokens import get_tokens_for_user
+
+
+class PermissionsVersionTests(TestCase):
+    """
+    Версия прав растет при изменении групп и не откатывается обычным save()
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='user', email='user@example.com', password='password')
+        self.group = Group.objects.create(name=ROLE_CUSTOMER)
+
+    def authenticate(self, token):
+        return RoleClaimsJWTAuthentication().get_user(token.access_token)
+
+    def test_stale_save_keeps_bumped_version(self):
+        stale = CustomUser.objects.get(pk=self.user.pk)
+        token = get_tokens_for_user(stale)
+
+        self.user.groups.add(self.group)
+        stale.first_name = 'Имя'
+        stale.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.permissions_version, 1)
+        self.assertEqual(self.user.first_name, 'Имя')
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_token_after_bump_is_accepted(self):
+        self.user.groups.add(self.group)
+        self.user.save()
+
+        user = self.authenticate(get_tokens_for_user(self.user))
+        self.assertEqual(user.pk, self.user.pk)
@@ -0,0 +1,19 @@
+"""
+Выпуск JWT токенов с ролями пользователя
+"""
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .roles import get_user_roles
+
+ROLES_CLAIM = 'roles'
+PERMISSIONS_VERSION_CLAIM = 'pv'
+
+
+def get_tokens_for_user(user):
+    """
+    Refresh токен с ролями и версией прав; access токен наследует эти claims
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh[ROLES_CLAIM] = sorted(get_user_roles(user))
+    refresh[PERMISSIONS_VERSION_CLAIM] = user.permissions_version
+    return refresh
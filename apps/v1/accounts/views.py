@@ -15,6 +15,7 @@ from django.utils import timezone
 from datetime import timedelta
 import secrets
 from .models import CustomUser, PurchasedService, Storage, StorageFile
+from .tokens import get_tokens_for_user
 from .serializers import (
     PurchasedServiceReadSerializer,
     RegisterSerializer, LoginSerializer, ProfileSerializer, 
@@ -27,11 +28,13 @@ from .serializers import (
     UserDetailSerializer, UserDetailWithPasswordSerializer,
     UserUpdateSerializer, UserPasswordUpdateSerializer
 )
-from apps.v1.documents.mixins import PaginationMixin
+from apps.v1.documents.exports import ExportMixin, EXPORT_PARAMETERS
+from apps.v1.documents.mixins import PaginationMixin, CURSOR_PAGINATION_PARAMETERS
 from .error_handlers import get_error_message
+from .roles import is_admin, is_customer, ROLE_ADMIN
 from django.contrib.auth.models import Group
 from django.contrib.contenttypes.models import ContentType
-from apps.v1.notification.models import Notification
+from apps.v1.notification.services import NotificationDispatcher
 
 
 class RegisterAPIView(APIView):
@@ -369,8 +372,8 @@ class LoginAPIView(APIView):
                 user.last_login = timezone.now()
                 user.save(update_fields=['last_login'])
                 
-                # Создаем JWT токены
-                refresh = RefreshToken.for_user(user)
+                # Создаем JWT токены (с ролями пользователя)
+                refresh = get_tokens_for_user(user)
                 
                 return Response({
                     'success': True,
@@ -923,7 +926,7 @@ class PurchasedServiceListCreateAPIView(APIView):
     def get(self, request):
         try:
             user = request.user
-            if user.groups.filter(name='Администратор').exists():
+            if is_admin(user):
                 qs = PurchasedService.objects.select_related('service', 'user').all()
             else:
                 qs = PurchasedService.objects.select_related('service', 'user').filter(user=user)
@@ -942,36 +945,34 @@ class PurchasedServiceListCreateAPIView(APIView):
     def post(self, request):
         try:
             user = request.user
-            if not user.groups.filter(name='Заказчик').exists():
+            if not is_customer(user):
                 return Response({'success': False, 'message': 'Только роль Заказчик может покупать услуги.'}, status=403)
 
             serializer = PurchasedServiceSerializer(data=request.data, context={'request': request})
             if serializer.is_valid():
                 purchase = serializer.save()
 
-                # Notify admins about the purchase
-                admin_group = Group.objects.filter(name='Администратор').first()
-                if admin_group:
-                    admin_users = CustomUser.objects.filter(groups=admin_group)
-                    for admin in admin_users:
-                        Notification.objects.create(
-                            recipient=admin,
-                            actor=user,
-                            verb='service_purchased',
-                            message=f"Пользователь {user.get_full_name()} приобрел услугу '{purchase.service.title}'.",
-                            target=purchase,
-                            category='service'
+                # Notify admins about the purchase: одно широковещательное уведомление для роли
+                NotificationDispatcher().broadcast(
+                    ROLE_ADMIN,
+                    f"Пользователь {user.get_full_name()} приобрел услугу '{purchase.service.title}'.",
+                    'service_purchased',
+                    actor=user,
+                    target=purchase,
+                    category='service'
+                ).dispatch()
+                admin_emails = CustomUser.objects.filter(groups__name=ROLE_ADMIN).values_list('email', flat=True)
+                for admin_email in admin_emails:
+                    try:
+                        send_mail(
+                            'Новая покупка услуги',
+                            f"Пользователь {user.get_full_name()} ({user.email}) приобрел услугу '{purchase.service.title}'.",
+                            settings.DEFAULT_FROM_EMAIL,
+                            [admin_email],
+                            fail_silently=True,
                         )
-                        try:
-                            send_mail(
-                                'Новая покупка услуги',
-                                f"Пользователь {user.get_full_name()} ({user.email}) приобрел услугу '{purchase.service.title}'.",
-                                settings.DEFAULT_FROM_EMAIL,
-                                [admin.email],
-                                fail_silently=True,
-                            )
-                        except Exception:
-                            pass
+                    except Exception:
+                        pass
 
                 return Response({'success': True, 'data': PurchasedServiceSerializer(purchase).data}, status=201)
             return Response({'success': False, 'message': get_error_message('validation_error'), 'errors': serializer.errors}, status=400)
@@ -986,7 +987,7 @@ class PurchasedServiceDetailAPIView(APIView):
         obj = PurchasedService.objects.select_related('service', 'user').filter(pk=pk).first()
         if not obj:
             return None, Response({'success': False, 'message': 'Объект не найден'}, status=404)
-        if user.groups.filter(name='Администратор').exists() or obj.user_id == user.id:
+        if is_admin(user) or obj.user_id == user.id:
             return obj, None
         return None, Response({'success': False, 'message': 'Доступ запрещен'}, status=403)
 
@@ -1128,11 +1129,22 @@ class CreateUserAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class ListUsersAPIView(PaginationMixin, APIView):
+class ListUsersAPIView(ExportMixin, PaginationMixin, APIView):
     """
     Получение списка всех пользователей (исключая суперпользователей) с пагинацией
     """
     permission_classes = [IsAuthenticated]
+    EXPORT_FIELDS = (
+        ('id', 'ID'),
+        ('first_name', 'Имя'),
+        ('last_name', 'Фамилия'),
+        ('email', 'Электронная почта'),
+        ('phone_number', 'Номер телефона'),
+        ('is_active', 'Активен'),
+        ('created_at', 'Дата создания'),
+        ('last_login', 'Последний вход'),
+    )
+    EXPORT_FILENAME = 'users'
     
     @swagger_auto_schema(
         operation_description="Получение списка всех пользователей (исключая суперпользователей) с пагинацией",
@@ -1140,6 +1152,8 @@ class ListUsersAPIView(PaginationMixin, APIView):
         manual_parameters=[
             openapi.Parameter('page', openapi.IN_QUERY, description="Номер страницы", type=openapi.TYPE_INTEGER),
             openapi.Parameter('limit', openapi.IN_QUERY, description="Количество элементов на странице", type=openapi.TYPE_INTEGER),
+            *CURSOR_PAGINATION_PARAMETERS,
+            *EXPORT_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -1166,6 +1180,10 @@ class ListUsersAPIView(PaginationMixin, APIView):
             # Получаем всех пользователей, исключая суперпользователей
             users = CustomUser.objects.filter(is_superuser=False).exclude(groups__name__in=['Администратор']).order_by('-created_at')
             
+            export_response = self.get_export_response(request, users)
+            if export_response is not None:
+                return export_response
+            
             # Применяем пагинацию
             page_obj, paginator = self.paginate_queryset(users, request)
             serializer = UserListSerializer(page_obj.object_list, many=True)
@@ -1463,7 +1481,7 @@ class AdminPasswordRequestAPIView(APIView):
         try:
             # Проверяем, что пользователь является администратором
             admin_user = request.user
-            if not admin_user.groups.filter(name='Администратор').exists() and not admin_user.is_superuser:
+            if not is_admin(admin_user) and not admin_user.is_superuser:
                 return Response({
                     'success': False,
                     'message': 'Доступ запрещен',
@@ -1564,7 +1582,7 @@ class AdminPasswordVerifyAPIView(APIView):
         try:
             # Проверяем, что пользователь является администратором
             admin_user = request.user
-            if not admin_user.groups.filter(name='Администратор').exists() and not admin_user.is_superuser:
+            if not is_admin(admin_user) and not admin_user.is_superuser:
                 return Response({
                     'success': False,
                     'message': 'Доступ запрещен',
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import DashboardRollup
+
+
+@admin.register(DashboardRollup)
+class DashboardRollupAdmin(admin.ModelAdmin):
+    list_display = ['metric', 'period', 'period_start', 'status', 'count', 'amount']
+    list_filter = ['metric', 'period']
+    readonly_fields = ['metric', 'period', 'period_start', 'status', 'count', 'amount']
+    ordering = ['metric', 'period', '-period_start']
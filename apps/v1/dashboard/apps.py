@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class DashboardConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.v1.dashboard'
+    
+    def ready(self):
+        import apps.v1.dashboard.signals
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.v1.dashboard.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Полная пересборка агрегатов панели администратора'
+
+    def handle(self, *args, **options):
+        result = rebuild_rollups()
+        for metric, rows in result.items():
+            self.stdout.write(f'{metric}: {rows}')
+        self.stdout.write(self.style.SUCCESS('Агрегаты панели пересобраны'))
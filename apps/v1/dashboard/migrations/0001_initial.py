@@ -0,0 +1,92 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:10
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+
+TOTAL_PERIOD_START = date(2000, 1, 1)
+
+
+def fill_rollups(apps, schema_editor):
+    """
+    Начальное заполнение агрегатов (как rebuild_rollups)
+    """
+    DashboardRollup = apps.get_model('dashboard', 'DashboardRollup')
+    UserObject = apps.get_model('user_objects', 'UserObject')
+    UserObjectEvent = apps.get_model('user_objects', 'UserObjectEvent')
+    Bills = apps.get_model('documents', 'Bills')
+    Order = apps.get_model('orders', 'Order')
+    zero = Value(Decimal(0), output_field=DecimalField())
+    
+    sources = {
+        'objects': (UserObject.objects.filter(is_deleted=False), 'created_at', zero),
+        'objects_closed': (
+            UserObjectEvent.objects.filter(type=2, payload__new__in=['completed', 'cancelled'], user_object__is_deleted=False)
+            .exclude(payload__old__in=['completed', 'cancelled']).annotate(status=F('payload__new')),
+            'ts', zero
+        ),
+        'bills': (Bills.objects.all(), 'created_at', Coalesce(Sum('price'), zero)),
+        'orders': (Order.objects.all(), 'created_at', Coalesce(Sum('total_price'), zero)),
+    }
+    rows = []
+    for metric, (queryset, date_field, amount) in sources.items():
+        totals = {}
+        for period, trunc in (('day', TruncDate), ('month', TruncMonth)):
+            aggregated = queryset.order_by().annotate(period_start=trunc(date_field))\
+                .values('period_start', 'status')\
+                .annotate(count=Count('pk'), amount=amount)\
+                .values_list('period_start', 'status', 'count', 'amount')
+            for period_start, status, count, amount_value in aggregated:
+                if isinstance(period_start, datetime):
+                    period_start = period_start.date()
+                rows.append(DashboardRollup(
+                    metric=metric, period=period, period_start=period_start,
+                    status=status or '', count=count, amount=amount_value or 0
+                ))
+                if period == 'month':
+                    total = totals.setdefault(status or '', [0, Decimal(0)])
+                    total[0] += count
+                    total[1] += amount_value or 0
+        rows.extend(
+            DashboardRollup(
+                metric=metric, period='total', period_start=TOTAL_PERIOD_START,
+                status=status, count=count, amount=amount_value
+            )
+            for status, (count, amount_value) in totals.items()
+        )
+    DashboardRollup.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('user_objects', '0010_userobjectevent'),
+        ('documents', '0005_journalsandacts_updated_at'),
+        ('orders', '0002_order_orders_user_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('objects', 'Объекты (по дате создания)'), ('objects_closed', 'Закрытия объектов (по дате закрытия)'), ('bills', 'Счета'), ('orders', 'Заказы')], max_length=20, verbose_name='Метрика')),
+                ('period', models.CharField(choices=[('day', 'День'), ('month', 'Месяц'), ('total', 'Всего')], max_length=10, verbose_name='Период')),
+                ('period_start', models.DateField(verbose_name='Начало периода')),
+                ('status', models.CharField(blank=True, default='', max_length=255, verbose_name='Статус')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Сумма')),
+            ],
+            options={
+                'verbose_name': 'Агрегат панели',
+                'verbose_name_plural': 'Агрегаты панели',
+                'constraints': [models.UniqueConstraint(fields=('metric', 'period', 'period_start', 'status'), name='dr_metric_period_status_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+from django.db import models
+
+
+class DashboardRollup(models.Model):
+    """
+    Предрасчитанные агрегаты для панели администратора.
+    Одна строка - метрика, период (день/месяц/всего) и статус: количество и сумма.
+    Обновляется дельтами при записи (см. rollups.py) и периодической задачей
+    refresh_dashboard_rollups, пересобирается командой rebuild_dashboard_rollups.
+    """
+    class Metric(models.TextChoices):
+        OBJECTS = 'objects', 'Объекты (по дате создания)'
+        OBJECTS_CLOSED = 'objects_closed', 'Закрытия объектов (по дате закрытия)'
+        BILLS = 'bills', 'Счета'
+        ORDERS = 'orders', 'Заказы'
+    
+    class Period(models.TextChoices):
+        DAY = 'day', 'День'
+        MONTH = 'month', 'Месяц'
+        TOTAL = 'total', 'Всего'
+    
+    metric = models.CharField(max_length=20, choices=Metric.choices, verbose_name='Метрика')
+    period = models.CharField(max_length=10, choices=Period.choices, verbose_name='Период')
+    period_start = models.DateField(verbose_name='Начало периода')
+    status = models.CharField(max_length=255, blank=True, default='', verbose_name='Статус')
+    count = models.IntegerField(default=0, verbose_name='Количество')
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name='Сумма')
+    
+    objects = models.Manager()
+    
+    class Meta:
+        verbose_name = 'Агрегат панели'
+        verbose_name_plural = 'Агрегаты панели'
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'period', 'period_start', 'status'], name='dr_metric_period_status_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.metric} {self.period} {self.period_start} {self.status}: {self.count}"
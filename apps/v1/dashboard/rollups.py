@@ -0,0 +1,372 @@
+"""
+Агрегаты панели администратора (DashboardRollup)
+
+Объекты, счета и заказы учитываются по дате создания и текущему статусу:
+строка (метрика, день/месяц, статус) - сколько записей, созданных в этот
+период, сейчас имеют этот статус, и их сумма. Строки периода "total" -
+итоги по статусам, поэтому чтение панели не зависит от размера таблиц.
+Закрытия объектов (objects_closed) и дельты, и пересчет берут из одних и тех
+же событий STATUS_CHANGED журнала объектов: закрытие - переход из открытого
+статуса в закрытый (completed -> cancelled не считается повторно), события
+удаленных в архив объектов не учитываются.
+
+Поддержка:
+- дельты при записи: сигналы (save/delete) счетов и заказов, для объектов -
+  user_objects.changes.apply_user_object_changes (save() и массовые update());
+- периодическая задача refresh_rollups: пересчет дней, в которых создавались
+  записи, измененные за последний интервал, их месяцев и итогов;
+- rebuild_rollups: полная пересборка.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from django.utils import timezone
+
+from apps.v1.documents.models import Bills
+from apps.v1.orders.models import Order
+from apps.v1.user_objects.models import UserObject, UserObjectEvent
+from .models import DashboardRollup
+
+Metric = DashboardRollup.Metric
+Period = DashboardRollup.Period
+
+# Начало периода для строк "total"
+TOTAL_PERIOD_START = date(2000, 1, 1)
+
+# Окно пересчета периодической задачи (с запасом к интервалу запуска)
+REFRESH_LOOKBACK = timedelta(hours=1)
+
+ACTIVE_OBJECT_STATUSES = [UserObject.Status.ACTIVE, UserObject.Status.PENDING, UserObject.Status.ON_HOLD]
+CLOSED_OBJECT_STATUSES = [UserObject.Status.COMPLETED, UserObject.Status.CANCELLED]
+
+# События закрытия объекта (без учета удаления объекта в архив)
+CLOSURE_EVENTS = (
+    Q(type=UserObjectEvent.Type.STATUS_CHANGED, payload__new__in=CLOSED_OBJECT_STATUSES)
+    & ~Q(payload__old__in=CLOSED_OBJECT_STATUSES)
+)
+
+# Источники метрик по дате создания: модель, поле суммы, фильтр учитываемых записей
+ROLLUP_SOURCES = {
+    Metric.OBJECTS: {'model': UserObject, 'amount_field': None, 'filter': Q(is_deleted=False)},
+    Metric.BILLS: {'model': Bills, 'amount_field': 'price', 'filter': Q()},
+    Metric.ORDERS: {'model': Order, 'amount_field': 'total_price', 'filter': Q()},
+}
+
+# Поля, изменение которых меняет вклад записи в агрегаты
+ROLLUP_FIELDS = {
+    Metric.OBJECTS: ('created_at', 'status', 'is_deleted'),
+    Metric.BILLS: ('created_at', 'status', 'price'),
+    Metric.ORDERS: ('created_at', 'status', 'total_price'),
+}
+
+
+def get_rollup_state(metric, instance):
+    """
+    Вклад записи в агрегаты: (день создания, статус, сумма) или None
+    """
+    if instance is None or instance.created_at is None:
+        return None
+    if metric == Metric.OBJECTS and instance.is_deleted:
+        return None
+    amount_field = ROLLUP_SOURCES[metric]['amount_field']
+    amount = getattr(instance, amount_field) if amount_field else None
+    return (
+        timezone.localdate(instance.created_at),
+        instance.status or '',
+        Decimal(amount or 0),
+    )
+
+
+def _period_keys(day):
+    return (
+        (Period.DAY, day),
+        (Period.MONTH, day.replace(day=1)),
+        (Period.TOTAL, TOTAL_PERIOD_START),
+    )
+
+
+def _add_state_deltas(deltas, state, sign):
+    if state is None:
+        return
+    day, status, amount = state
+    for period, period_start in _period_keys(day):
+        delta = deltas[(period, period_start, status)]
+        delta[0] += sign
+        delta[1] += sign * amount
+
+
+def apply_rollup_deltas(metric, deltas):
+    """
+    Применение накопленных изменений {(period, period_start, status): [count, amount]}
+    """
+    for (period, period_start, status), (count, amount) in deltas.items():
+        if not count and not amount:
+            continue
+        lookup = {'metric': metric, 'period': period, 'period_start': period_start, 'status': status}
+        update = {'count': F('count') + count, 'amount': F('amount') + amount}
+        if DashboardRollup.objects.filter(**lookup).update(**update):
+            continue
+        try:
+            with transaction.atomic():
+                DashboardRollup.objects.create(count=count, amount=amount, **lookup)
+        except IntegrityError:
+            # Строка создана параллельно
+            DashboardRollup.objects.filter(**lookup).update(**update)
+
+
+def move_rollup_states(metric, changes):
+    """
+    Перенос вклада записей: changes - список (old_state, new_state)
+
+    Изменения в одной строке агрегата суммируются - один UPDATE на строку.
+    """
+    deltas = defaultdict(lambda: [0, Decimal(0)])
+    for old_state, new_state in changes:
+        if old_state == new_state:
+            continue
+        _add_state_deltas(deltas, old_state, -1)
+        _add_state_deltas(deltas, new_state, 1)
+    apply_rollup_deltas(metric, deltas)
+
+
+def get_closure_state(event):
+    """
+    Вклад события объекта в закрытия: (день перехода, статус, 0) или None
+
+    Закрытие - событие STATUS_CHANGED из открытого статуса в completed/cancelled
+    (CLOSURE_EVENTS); по тем же событиям метрика пересчитывается
+    (_get_source_queryset). Удаление объекта в архив учитывает вызывающий код.
+    """
+    if event.type != UserObjectEvent.Type.STATUS_CHANGED:
+        return None
+    if event.payload.get('new') not in CLOSED_OBJECT_STATUSES or event.payload.get('old') in CLOSED_OBJECT_STATUSES:
+        return None
+    return (timezone.localdate(event.ts), event.payload['new'], Decimal(0))
+
+
+def move_object_rollup_states(changes, added_events=(), removed_events=()):
+    """
+    Изменение объектов: агрегаты по дате создания (changes - список
+    (old_state, new_state)) и закрытия - по записанным и удаленным событиям
+    """
+    move_rollup_states(Metric.OBJECTS, changes)
+    move_rollup_states(Metric.OBJECTS_CLOSED, [
+        *((None, get_closure_state(event)) for event in added_events),
+        *((get_closure_state(event), None) for event in removed_events),
+    ])
+
+
+def _day_range(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def _month_range(month_start):
+    next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return (
+        timezone.make_aware(datetime.combine(month_start, time.min)),
+        timezone.make_aware(datetime.combine(next_month, time.min)),
+    )
+
+
+def _get_source_queryset(metric):
+    """
+    (queryset, поле даты, выражение суммы) для пересчета метрики
+    """
+    if metric == Metric.OBJECTS_CLOSED:
+        queryset = UserObjectEvent.objects.filter(CLOSURE_EVENTS, user_object__is_deleted=False)\
+            .annotate(status=F('payload__new'))
+        return queryset, 'ts', Value(Decimal(0), output_field=DecimalField())
+
+    source = ROLLUP_SOURCES[metric]
+    queryset = source['model'].objects.filter(source['filter'])
+    amount = source['amount_field']
+    amount = Coalesce(Sum(amount), Value(Decimal(0)), output_field=DecimalField()) if amount else Value(Decimal(0), output_field=DecimalField())
+    return queryset, 'created_at', amount
+
+
+def _aggregate_rows(metric, period, queryset, date_field, amount):
+    trunc = TruncDate(date_field) if period == Period.DAY else TruncMonth(date_field)
+    rows = queryset.order_by()\
+        .annotate(period_start=trunc)\
+        .values('period_start', 'status')\
+        .annotate(count=Count('pk'), amount=amount)\
+        .values_list('period_start', 'status', 'count', 'amount')
+    return [
+        DashboardRollup(
+            metric=metric, period=period,
+            period_start=period_start.date() if isinstance(period_start, datetime) else period_start,
+            status=status or '', count=count, amount=amount or 0
+        )
+        for period_start, status, count, amount in rows
+    ]
+
+
+def _rebuild_totals(metric):
+    """
+    Итоги по статусам - из месячных строк (без чтения исходной таблицы)
+    """
+    totals = DashboardRollup.objects.filter(metric=metric, period=Period.MONTH)\
+        .values('status')\
+        .annotate(total_count=Sum('count'), total_amount=Sum('amount'))
+    DashboardRollup.objects.filter(metric=metric, period=Period.TOTAL).delete()
+    DashboardRollup.objects.bulk_create([
+        DashboardRollup(
+            metric=metric, period=Period.TOTAL, period_start=TOTAL_PERIOD_START,
+            status=row['status'], count=row['total_count'], amount=row['total_amount']
+        )
+        for row in totals if row['total_count']
+    ])
+
+
+def _recompute_periods(metric, days):
+    """
+    Пересчет строк указанных дней и их месяцев из исходной таблицы
+    """
+    if not days:
+        return
+    months = {day.replace(day=1) for day in days}
+    queryset, date_field, amount = _get_source_queryset(metric)
+
+    day_filter = Q()
+    for day in days:
+        start, end = _day_range(day)
+        day_filter |= Q(**{f'{date_field}__gte': start, f'{date_field}__lt': end})
+    month_filter = Q()
+    for month_start in months:
+        start, end = _month_range(month_start)
+        month_filter |= Q(**{f'{date_field}__gte': start, f'{date_field}__lt': end})
+
+    day_rows = _aggregate_rows(metric, Period.DAY, queryset.filter(day_filter), date_field, amount)
+    month_rows = _aggregate_rows(metric, Period.MONTH, queryset.filter(month_filter), date_field, amount)
+
+    with transaction.atomic():
+        DashboardRollup.objects.filter(metric=metric, period=Period.DAY, period_start__in=days).delete()
+        DashboardRollup.objects.filter(metric=metric, period=Period.MONTH, period_start__in=months).delete()
+        DashboardRollup.objects.bulk_create(day_rows + month_rows)
+        _rebuild_totals(metric)
+
+
+def _get_touched_days(metric, since):
+    """
+    Дни, строки которых могли измениться с момента since
+    """
+    if metric == Metric.OBJECTS_CLOSED:
+        # Удаление в архив и восстановление меняют закрытия без новых событий
+        querysets = [
+            UserObjectEvent.objects.filter(ts__gte=since),
+            UserObjectEvent.objects.filter(CLOSURE_EVENTS, user_object__updated_at__gte=since),
+        ]
+        date_field = 'ts'
+    else:
+        # Без фильтра источника: удаление в архив тоже меняет агрегаты
+        querysets, date_field = [ROLLUP_SOURCES[metric]['model'].objects.filter(updated_at__gte=since)], 'created_at'
+    days = {timezone.localdate()}
+    for queryset in querysets:
+        days.update(
+            queryset.order_by()
+            .annotate(day=TruncDate(date_field))
+            .values_list('day', flat=True)
+            .distinct()
+        )
+    return days
+
+
+def refresh_rollups(since=None):
+    """
+    Инкрементальный пересчет: дни, в которых создавались записи, измененные
+    после since (по умолчанию - за REFRESH_LOOKBACK), их месяцы и итоги.
+    Исправляет расхождения дельт (например, после изменений в обход сигналов).
+
+    Возвращает {metric: количество пересчитанных дней}.
+    """
+    since = since or timezone.now() - REFRESH_LOOKBACK
+    result = {}
+    for metric in Metric.values:
+        days = _get_touched_days(metric, since)
+        _recompute_periods(metric, days)
+        result[metric] = len(days)
+    return result
+
+
+def rebuild_rollups():
+    """
+    Полная пересборка всех агрегатов
+    """
+    result = {}
+    for metric in Metric.values:
+        queryset, date_field, amount = _get_source_queryset(metric)
+        rows = (
+            _aggregate_rows(metric, Period.DAY, queryset, date_field, amount)
+            + _aggregate_rows(metric, Period.MONTH, queryset, date_field, amount)
+        )
+        with transaction.atomic():
+            DashboardRollup.objects.filter(metric=metric).delete()
+            DashboardRollup.objects.bulk_create(rows, batch_size=2000)
+            _rebuild_totals(metric)
+        result[metric] = len(rows)
+    return result
+
+
+def _group_rows(rows):
+    result = {}
+    for metric, period_start, status, count, amount in rows:
+        by_status = result.setdefault(metric, {}).setdefault(period_start, {})
+        by_status[status] = {'count': count, 'amount': str(amount)}
+    return result
+
+
+def _summarize(by_status):
+    return {
+        'count': sum(value['count'] for value in by_status.values()),
+        'amount': str(sum((Decimal(value['amount']) for value in by_status.values()), Decimal(0))),
+        'by_status': by_status,
+    }
+
+
+def get_dashboard(days=30, months=12):
+    """
+    Данные панели: итоги, ряды по дням и месяцам - только из DashboardRollup
+    (число читаемых строк ограничено days/months и числом статусов)
+    """
+    today = timezone.localdate()
+    first_day = today - timedelta(days=days - 1)
+    first_month = today.replace(day=1)
+    for _ in range(months - 1):
+        first_month = (first_month - timedelta(days=1)).replace(day=1)
+
+    rows = DashboardRollup.objects.filter(
+        Q(period=Period.TOTAL)
+        | Q(period=Period.DAY, period_start__gte=first_day)
+        | Q(period=Period.MONTH, period_start__gte=first_month)
+    ).values_list('period', 'metric', 'period_start', 'status', 'count', 'amount')
+
+    grouped = defaultdict(list)
+    for period, *row in rows:
+        grouped[period].append(row)
+    totals = _group_rows(grouped[Period.TOTAL])
+    daily = _group_rows(grouped[Period.DAY])
+    monthly = _group_rows(grouped[Period.MONTH])
+
+    def series(data, metric):
+        return [
+            {'period_start': period_start.isoformat(), **_summarize(by_status)}
+            for period_start, by_status in sorted(data.get(metric, {}).items())
+        ]
+
+    current_closures = monthly.get(Metric.OBJECTS_CLOSED, {}).get(today.replace(day=1), {})
+    object_totals = totals.get(Metric.OBJECTS, {}).get(TOTAL_PERIOD_START, {})
+    return {
+        'active_applications': sum(object_totals.get(status, {}).get('count', 0) for status in ACTIVE_OBJECT_STATUSES),
+        'completed_this_month': sum(value['count'] for value in current_closures.values()),
+        'totals': {
+            metric: _summarize(totals.get(metric, {}).get(TOTAL_PERIOD_START, {}))
+            for metric in Metric.values
+        },
+        'daily': {metric: series(daily, metric) for metric in Metric.values},
+        'monthly': {metric: series(monthly, metric) for metric in Metric.values},
+    }
@@ -0,0 +1,9 @@
+from rest_framework import serializers
+
+
+class DashboardQuerySerializer(serializers.Serializer):
+    """
+    Параметры панели администратора
+    """
+    days = serializers.IntegerField(min_value=1, max_value=90, default=30)
+    months = serializers.IntegerField(min_value=1, max_value=24, default=12)
@@ -0,0 +1,52 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.v1.documents.models import Bills
+from apps.v1.orders.models import Order
+from .models import DashboardRollup
+from .rollups import ROLLUP_FIELDS, get_rollup_state, move_rollup_states
+
+ROLLUP_METRICS = {
+    Bills: DashboardRollup.Metric.BILLS,
+    Order: DashboardRollup.Metric.ORDERS,
+}
+
+
+def _affects_rollups(metric, update_fields):
+    return update_fields is None or bool(set(ROLLUP_FIELDS[metric]) & set(update_fields))
+
+
+@receiver(pre_save, sender=Bills)
+@receiver(pre_save, sender=Order)
+def rollup_state_capture(sender, instance, update_fields=None, **kwargs):
+    """
+    Запоминаем вклад записи в агрегаты панели до сохранения
+    """
+    metric = ROLLUP_METRICS[sender]
+    if instance._state.adding or not instance.pk or not _affects_rollups(metric, update_fields):
+        return
+    old = sender.objects.filter(pk=instance.pk).only(*ROLLUP_FIELDS[metric]).first()
+    instance._rollup_state_before = get_rollup_state(metric, old)
+
+
+@receiver(post_save, sender=Bills)
+@receiver(post_save, sender=Order)
+def rollup_state_refresh(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Дельта агрегатов: создание, смена статуса/суммы
+
+    Объекты пользователей обновляются в user_objects.signals вместе с тайлами
+    карты (один снимок объекта до сохранения).
+    """
+    metric = ROLLUP_METRICS[sender]
+    if not created and not _affects_rollups(metric, update_fields):
+        return
+    old_state = None if created else instance.__dict__.pop('_rollup_state_before', None)
+    move_rollup_states(metric, [(old_state, get_rollup_state(metric, instance))])
+
+
+@receiver(post_delete, sender=Bills)
+@receiver(post_delete, sender=Order)
+def rollup_state_delete(sender, instance, **kwargs):
+    metric = ROLLUP_METRICS[sender]
+    move_rollup_states(metric, [(get_rollup_state(metric, instance), None)])
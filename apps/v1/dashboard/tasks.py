@@ -0,0 +1,11 @@
+from celery import shared_task
+
+from .rollups import refresh_rollups
+
+
+@shared_task
+def refresh_dashboard_rollups():
+    """
+    Периодический пересчет агрегатов панели за последний интервал (Celery beat)
+    """
+    return refresh_rollups()
@@ -0,0 +1,57 @@
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from apps.v1.accounts.error_handlers import get_error_message
+from apps.v1.accounts.roles import is_admin
+from .rollups import get_dashboard
+from .serializers import DashboardQuerySerializer
+
+
+class DashboardAPIView(APIView):
+    """
+    Панель администратора: объекты, счета и заказы по статусам
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @swagger_auto_schema(
+        operation_description="Панель администратора. Данные читаются из предрасчитанных агрегатов (DashboardRollup): итоги по статусам (totals), ряды по дням (daily) и месяцам (monthly) для метрик objects, objects_closed, bills (сумма - price), orders (сумма - total_price). Объекты, счета и заказы учитываются по дате создания и текущему статусу, objects_closed - по дате перехода в completed/cancelled. Доступно только администраторам.",
+        tags=['Dashboard'],
+        manual_parameters=[
+            openapi.Parameter('days', openapi.IN_QUERY, description='Количество дней в ряду daily (1-90, по умолчанию 30)', type=openapi.TYPE_INTEGER, required=False),
+            openapi.Parameter('months', openapi.IN_QUERY, description='Количество месяцев в ряду monthly (1-24, по умолчанию 12)', type=openapi.TYPE_INTEGER, required=False),
+        ],
+        responses={200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 401: 'Unauthorized'},
+        security=[{'Bearer': []}]
+    )
+    def get(self, request):
+        try:
+            if not is_admin(request.user):
+                return Response({
+                    'success': False,
+                    'message': 'Только администраторы могут просматривать панель'
+                }, status=status.HTTP_403_FORBIDDEN)
+            
+            query_serializer = DashboardQuerySerializer(data=request.query_params)
+            if not query_serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'message': get_error_message('validation_error'),
+                    'errors': query_serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+            params = query_serializer.validated_data
+            
+            return Response({
+                'success': True,
+                'message': 'Данные панели получены успешно',
+                'data': get_dashboard(days=params['days'], months=params['months'])
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': get_error_message('server_error'),
+                'errors': {'detail': str(e)}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,316 @@
+"""
+Потоковый экспорт списков (CSV / NDJSON / XLSX)
+
+Строки читаются из БД через values_list().iterator(chunk_size=...) и сразу
+пишутся в ответ StreamingHttpResponse, поэтому память не зависит от
+количества строк. XLSX собирается как ZIP поток (zipfile в буфер без
+seek): служебные части пишутся сразу, лист - порциями по мере чтения строк,
+поэтому первые байты уходят клиенту до окончания выборки.
+
+Под ASGI (daphne) синхронный итератор Django собрал бы целиком в список,
+поэтому для ASGI запросов генератор оборачивается в асинхронный - каждая
+порция читается в том же потоке (thread_sensitive), что и курсор БД.
+"""
+import csv
+import json
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from drf_yasg import openapi
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.v1.accounts.error_handlers import get_error_message
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Строк из БД за один запрос курсора / строк в одной порции ответа
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_PARAMETERS = [
+    openapi.Parameter('export', openapi.IN_QUERY, description='Потоковый экспорт всего списка (без пагинации) в файл: csv, ndjson или xlsx', type=openapi.TYPE_STRING, enum=list(EXPORT_FORMATS), required=False),
+]
+
+
+class _Echo:
+    """
+    Псевдо-буфер для csv.writer: writerow() возвращает строку вместо записи
+    """
+    def write(self, value):
+        return value
+
+
+def _localize(value):
+    # Даты со временем - в локальной таймзоне, как в ответах API
+    if getattr(value, 'tzinfo', None) is not None:
+        return timezone.localtime(value)
+    return value
+
+
+# Начало текста, которое Excel / LibreOffice считают формулой (CSV injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _to_text(value):
+    """
+    Текст ячейки CSV / XLSX; строки, похожие на формулу, экранируются апострофом
+    """
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return "'" + value if value.startswith(FORMULA_PREFIXES) else value
+    value = _localize(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def iter_csv(rows, fields, headers):
+    writer = csv.writer(_Echo())
+    # BOM - Excel корректно открывает кириллицу в UTF-8
+    chunk = ['\ufeff' + writer.writerow(headers)]
+    for row in rows:
+        chunk.append(writer.writerow([_to_text(value) for value in row]))
+        if len(chunk) >= EXPORT_CHUNK_SIZE:
+            yield ''.join(chunk).encode()
+            chunk = []
+    if chunk:
+        yield ''.join(chunk).encode()
+
+
+def iter_ndjson(rows, fields, headers):
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(
+            {field: _localize(value) for field, value in zip(fields, row)},
+            cls=DjangoJSONEncoder, ensure_ascii=False
+        ))
+        if len(chunk) >= EXPORT_CHUNK_SIZE:
+            yield ('\n'.join(chunk) + '\n').encode()
+            chunk = []
+    if chunk:
+        yield ('\n'.join(chunk) + '\n').encode()
+
+
+# Символы, недопустимые в XML листа
+XLSX_ILLEGAL_CHARACTERS_RE = re.compile(r'[\000-\010]|[\013-\014]|[\016-\037]')
+XLSX_EPOCH = datetime(1899, 12, 30)
+
+# Стили ячеек: 1 - дата со временем, 2 - дата (встроенные форматы 22 и 14)
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '</cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+XLSX_SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XLSX_SHEET_FOOTER = '</sheetData></worksheet>'
+
+
+class _ZipStream:
+    """
+    Буфер без seek для zipfile: записанные байты забираются порциями (drain)
+    """
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def _xlsx_cell(ref, value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        # Excel не хранит таймзону - локальное время, как в ответах API
+        value = _localize(value).replace(tzinfo=None)
+        return f'<c r="{ref}" s="1"><v>{(value - XLSX_EPOCH).total_seconds() / 86400}</v></c>'
+    if isinstance(value, date):
+        return f'<c r="{ref}" s="2"><v>{(value - XLSX_EPOCH.date()).days}</v></c>'
+    text = escape(XLSX_ILLEGAL_CHARACTERS_RE.sub('', _to_text(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(number, columns, values):
+    cells = ''.join(_xlsx_cell(f'{column}{number}', value) for column, value in zip(columns, values))
+    return f'<row r="{number}">{cells}</row>'
+
+
+def iter_xlsx(rows, fields, headers):
+    output = _ZipStream()
+    columns = [_column_letter(index) for index in range(len(headers))]
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        yield output.drain()
+
+        # Размер листа заранее неизвестен - zip64, иначе больше 2 ГБ не записать
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            chunk = [XLSX_SHEET_HEADER, _xlsx_row(1, columns, headers)]
+            for number, row in enumerate(rows, start=2):
+                chunk.append(_xlsx_row(number, columns, row))
+                if len(chunk) >= EXPORT_CHUNK_SIZE:
+                    sheet.write(''.join(chunk).encode())
+                    chunk = []
+                    data = output.drain()
+                    if data:
+                        yield data
+            chunk.append(XLSX_SHEET_FOOTER)
+            sheet.write(''.join(chunk).encode())
+    yield output.drain()
+
+
+EXPORT_WRITERS = {
+    'csv': iter_csv,
+    'ndjson': iter_ndjson,
+    'xlsx': iter_xlsx,
+}
+
+
+async def _iterate_async(chunks):
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while True:
+        chunk = await next_chunk(chunks, None)
+        if chunk is None:
+            break
+        yield chunk
+
+
+def get_streaming_content(request, chunks):
+    """
+    Итератор для StreamingHttpResponse: под ASGI - асинхронная обертка
+    """
+    django_request = getattr(request, '_request', request)
+    if isinstance(django_request, ASGIRequest):
+        return _iterate_async(iter(chunks))
+    return chunks
+
+
+def stream_export(request, queryset, export_fields, export_format, filename):
+    """
+    StreamingHttpResponse с экспортом queryset
+
+    export_fields - список пар (lookup, заголовок колонки); lookup может
+    идти через связи (user__email). NDJSON использует lookup как ключи.
+    """
+    fields = [lookup for lookup, _ in export_fields]
+    headers = [header for _, header in export_fields]
+    rows = queryset.select_related(None).prefetch_related(None)\
+        .values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    chunks = EXPORT_WRITERS[export_format](rows, fields, headers)
+
+    response = StreamingHttpResponse(get_streaming_content(request, chunks), content_type=EXPORT_FORMATS[export_format])
+    timestamp = timezone.localtime().strftime('%Y%m%d-%H%M')
+    response['Content-Disposition'] = f'attachment; filename="{filename}-{timestamp}.{export_format}"'
+    response['Cache-Control'] = 'no-store'
+    # nginx не должен буферизовать ответ целиком
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class ExportMixin:
+    """
+    Экспорт списка через параметр ?export=csv|ndjson|xlsx
+
+    Весь список (без пагинации) отдается файлом в потоке: view вызывает
+    get_export_response(request, queryset) до пагинации и возвращает его
+    ответ, если он не None.
+
+    EXPORT_FIELDS - пары (lookup, заголовок колонки), EXPORT_FILENAME -
+    префикс имени файла. Фильтры и права - те же, что и у списка.
+    """
+    EXPORT_FIELDS = ()
+    EXPORT_FILENAME = 'export'
+
+    def get_export_response(self, request, queryset):
+        """
+        Ответ с экспортом, 400 при неизвестном формате или None, если экспорт не запрошен
+        """
+        export_format = request.query_params.get('export')
+        if not export_format:
+            return None
+        if export_format not in EXPORT_FORMATS:
+            return Response({
+                'success': False,
+                'message': get_error_message('validation_error'),
+                'errors': {'export': [f'Допустимые значения: {", ".join(EXPORT_FORMATS)}']}
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return stream_export(request, queryset, self.EXPORT_FIELDS, export_format, self.EXPORT_FILENAME)
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def fill_updated_at(apps, schema_editor):
+    JournalsAndActs = apps.get_model('documents', 'JournalsAndActs')
+    JournalsAndActs.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_bills_bills_user_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journalsandacts',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Дата обновления'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
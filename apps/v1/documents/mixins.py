@@ -1,17 +1,265 @@
 """
 Mixin'lar va helper funksiyalar kod takrorlanishini kamaytirish uchun
 """
+import base64
+import binascii
+import hashlib
+import json
+
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.db.models import Count, Max, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from drf_yasg import openapi
 from rest_framework.response import Response
 from rest_framework import status
 
 
+# Cursor rejimi uchun swagger parametrlari
+CURSOR_PAGINATION_PARAMETERS = [
+    openapi.Parameter('pagination', openapi.IN_QUERY, description='Режим пагинации: page (по умолчанию) или cursor', type=openapi.TYPE_STRING, enum=['page', 'cursor'], required=False),
+    openapi.Parameter('cursor', openapi.IN_QUERY, description='Курсор страницы (next_cursor/previous_cursor из предыдущего ответа). Включает режим cursor', type=openapi.TYPE_STRING, required=False),
+    openapi.Parameter('include_total', openapi.IN_QUERY, description='В режиме cursor: вернуть total_items (дополнительный COUNT запрос)', type=openapi.TYPE_BOOLEAN, required=False),
+]
+
+
+def encode_cursor(values, direction):
+    """
+    Cursor'ni shifrlash (ochiq bo'lmagan base64 satr)
+    """
+    payload = json.dumps({'v': values, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Cursor'ni o'qish. Noto'g'ri cursor uchun None qaytaradi
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        ordering_value, pk = payload['v']
+        direction = payload['d']
+    except (ValueError, TypeError, KeyError, binascii.Error, UnicodeDecodeError):
+        return None
+    
+    ordering_value = parse_datetime(ordering_value) if isinstance(ordering_value, str) else None
+    if ordering_value is None or direction not in ('next', 'prev'):
+        return None
+    # pk faqat butun son (bool ham int, lekin pk emas) - aks holda so'rov 500 bilan tushadi
+    if not isinstance(pk, int) or isinstance(pk, bool):
+        return None
+    return ordering_value, pk, direction
+
+
+# Conditional GET uchun swagger parametrlari
+CONDITIONAL_GET_PARAMETERS = [
+    openapi.Parameter('If-None-Match', openapi.IN_HEADER, description='ETag из предыдущего ответа. Если данные не изменились - 304 Not Modified без тела', type=openapi.TYPE_STRING, required=False),
+    openapi.Parameter('If-Modified-Since', openapi.IN_HEADER, description='Last-Modified из предыдущего ответа (учитывается, только если не передан If-None-Match)', type=openapi.TYPE_STRING, required=False),
+]
+
+
+def make_etag(*parts):
+    """
+    Strong ETag qismlar (versiya, foydalanuvchi, URL) bo'yicha
+    """
+    payload = '|'.join('' if part is None else str(part) for part in parts)
+    return '"%s"' % hashlib.sha1(payload.encode()).hexdigest()
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """
+    If-None-Match / If-Modified-Since tekshiruvi (RFC 9110)
+    
+    If-None-Match berilgan bo'lsa If-Modified-Since e'tiborga olinmaydi:
+    o'chirishlar Last-Modified'ni oshirmaydi, ETag esa o'zgaradi.
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        # GET uchun weak comparison: W/ prefiksi hisobga olinmaydi
+        etags = {value.removeprefix('W/') for value in parse_etags(if_none_match)}
+        return '*' in etags or etag in etags
+    
+    if_modified_since = request.headers.get('If-Modified-Since')
+    if if_modified_since and last_modified is not None:
+        since = parse_http_date_safe(if_modified_since)
+        return since is not None and int(last_modified.timestamp()) <= since
+    return False
+
+
+def set_conditional_headers(response, etag, last_modified=None):
+    """
+    ETag va Last-Modified header'larini qo'shish
+    """
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Javob foydalanuvchiga bog'liq: faqat brauzer keshi, har safar tekshiriladi
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def get_not_modified_response(request, etag, last_modified=None):
+    """
+    So'rov sharti bajarilsa 304 javob, aks holda None
+    """
+    if request.method not in ('GET', 'HEAD') or not is_not_modified(request, etag, last_modified):
+        return None
+    return set_conditional_headers(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+
+class CursorPage:
+    """
+    Cursor rejimidagi sahifa (Paginator page object o'rniga)
+    """
+    number = None
+    
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+    
+    def __iter__(self):
+        return iter(self.object_list)
+    
+    def __len__(self):
+        return len(self.object_list)
+    
+    def __getitem__(self, index):
+        return self.object_list[index]
+    
+    def has_next(self):
+        return self.next_cursor is not None
+    
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class CursorPaginator:
+    """
+    Cursor rejimidagi paginator (count faqat include_total=true bo'lganda hisoblanadi)
+    """
+    def __init__(self, per_page, count=None):
+        self.per_page = per_page
+        self.count = count
+
+
+def _split_to_many_field(model, field):
+    """
+    Ko'p-qiymatli bog'lanish orqali o'tadigan maydon uchun
+    (ota yo'li, bog'lanish modeli, bog'lanishdan ota'ga yo'l, qolgan yo'l), aks holda None
+    
+    'items__product__updated_at' (Order) -> ('', OrderItem, 'order', 'product__updated_at')
+    """
+    parts = field.split('__')
+    current = model
+    for index, name in enumerate(parts[:-1]):
+        model_field = current._meta.get_field(name)
+        if model_field.one_to_many or model_field.many_to_many:
+            return (
+                '__'.join(parts[:index]),
+                model_field.related_model,
+                model_field.remote_field.name,
+                '__'.join(parts[index + 1:]),
+            )
+        current = model_field.related_model
+    return None
+
+
 class PaginationMixin:
     """
     Pagination logikasini birlashtiruvchi Mixin
+    
+    Default rejim - sahifa raqami bo'yicha (page/limit, COUNT + OFFSET).
+    ?pagination=cursor yoki ?cursor=... berilsa - keyset (cursor) rejimi:
+    (CURSOR_ORDERING_FIELD, id) bo'yicha kamayish tartibida, COUNT va OFFSET'siz.
+    
+    ETAG_VERSION_FIELDS berilgan bo'lsa - conditional GET: ro'yxat versiyasi
+    (maydonlar bo'yicha Max va yozuvlar soni) asosiy jadval va FK'lar uchun
+    bitta aggregate, har bir ko'p-qiymatli bog'lanish uchun alohida aggregate
+    bilan hisoblanadi, If-None-Match mos kelsa 304 serializatsiyasiz qaytariladi.
     """
     DEFAULT_PAGE_SIZE = 10
     MAX_PAGE_SIZE = 100
+    CURSOR_ORDERING_FIELD = 'created_at'
+    ETAG_VERSION_FIELDS = ()
+    
+    def get_list_version(self, queryset):
+        """
+        Ro'yxat versiyasi: (qismlar, last_modified)
+        
+        Asosiy jadval va FK maydonlari bitta aggregate bilan hisoblanadi
+        (JOIN qatorlarni ko'paytirmaydi). Ko'p-qiymatli bog'lanishlar
+        (masalan 'bill_documents__updated_at') har biri alohida so'rov:
+        bog'lanish jadvali ro'yxat yozuvlari bo'yicha filtrlanadi, shuning uchun
+        bir nechta bog'lanishning JOIN ko'paytmasi hosil bo'lmaydi. Bog'lanishdagi
+        yozuvlar soni ham qo'shiladi - o'chirish ham versiyani o'zgartiradi.
+        """
+        root_aggregates = {'items_count': Count('pk', distinct=True)}
+        relations = {}
+        for index, field in enumerate(self.ETAG_VERSION_FIELDS):
+            relation = _split_to_many_field(queryset.model, field)
+            if relation is None:
+                root_aggregates[f'version_{index}'] = Max(field)
+                continue
+            key = relation[:3]
+            relations.setdefault(key, {})[f'version_{index}'] = Max(relation[3])
+        
+        values = queryset.order_by().aggregate(**root_aggregates)
+        for index, ((parent_path, related_model, back_name), aggregates) in enumerate(relations.items()):
+            parent_ids = queryset.order_by().values(f'{parent_path}__pk' if parent_path else 'pk')
+            values.update(
+                related_model._default_manager.filter(**{f'{back_name}__in': parent_ids})
+                .order_by()
+                .aggregate(**{f'relation_count_{index}': Count('pk')}, **aggregates)
+            )
+        
+        timestamps = [
+            values[f'version_{index}'] for index in range(len(self.ETAG_VERSION_FIELDS))
+            if values[f'version_{index}'] is not None
+        ]
+        parts = [values[key] for key in sorted(values)]
+        return parts, max(timestamps, default=None)
+    
+    def get_list_not_modified_response(self, request, queryset):
+        """
+        Ro'yxat o'zgarmagan bo'lsa 304 javob, aks holda None
+        
+        ETag foydalanuvchi va to'liq URL (filtrlar, sahifa, fields) bo'yicha farqlanadi.
+        Header'lar get_paginated_response'da javobga qo'shiladi.
+        """
+        self._conditional_headers = None
+        if not self.ETAG_VERSION_FIELDS:
+            return None
+        
+        parts, last_modified = self.get_list_version(queryset)
+        etag = make_etag(request.user.pk, request.get_host(), request.get_full_path(), *parts)
+        self._conditional_headers = (etag, last_modified)
+        return get_not_modified_response(request, etag, last_modified)
+    
+    def get_page_size(self, request, page_size=None):
+        """
+        limit parametrini o'qish va cheklash
+        """
+        if page_size is None:
+            page_size = self.DEFAULT_PAGE_SIZE
+        
+        try:
+            limit = int(request.query_params.get('limit', page_size))
+        except ValueError:
+            return page_size
+        # Limit'ni cheklash
+        if limit > self.MAX_PAGE_SIZE:
+            limit = self.MAX_PAGE_SIZE
+        if limit < 1:
+            limit = page_size
+        return limit
+    
+    def is_cursor_pagination(self, request):
+        return (
+            request.query_params.get('pagination') == 'cursor'
+            or 'cursor' in request.query_params
+        )
     
     def paginate_queryset(self, queryset, request, page_size=None):
         """
@@ -25,23 +273,17 @@ class PaginationMixin:
         Returns:
             tuple: (page_obj, paginator)
         """
+        if self.is_cursor_pagination(request):
+            return self.paginate_queryset_by_cursor(queryset, request, page_size)
+        
         if page_size is None:
             page_size = self.DEFAULT_PAGE_SIZE
         
-        page = request.query_params.get('page', 1)
-        limit = request.query_params.get('limit', page_size)
-        
+        limit = self.get_page_size(request, page_size)
         try:
-            page = int(page)
-            limit = int(limit)
-            # Limit'ni cheklash
-            if limit > self.MAX_PAGE_SIZE:
-                limit = self.MAX_PAGE_SIZE
-            if limit < 1:
-                limit = page_size
+            page = int(request.query_params.get('page', 1))
         except ValueError:
             page = 1
-            limit = page_size
         
         paginator = Paginator(queryset, limit)
         
@@ -54,6 +296,66 @@ class PaginationMixin:
         
         return page_obj, paginator
     
+    def paginate_queryset_by_cursor(self, queryset, request, page_size=None, ordering_field=None):
+        """
+        Queryset'ni cursor bo'yicha paginate qilish
+        
+        Queryset (ordering_field, id) bo'yicha kamayish tartibida qayta saralanadi,
+        shuning uchun '-created_at' indekslaridan foydalaniladi. Noto'g'ri cursor
+        birinchi sahifa sifatida qabul qilinadi.
+        
+        Returns:
+            tuple: (CursorPage, CursorPaginator)
+        """
+        ordering_field = ordering_field or self.CURSOR_ORDERING_FIELD
+        limit = self.get_page_size(request, page_size)
+        
+        count = None
+        if request.query_params.get('include_total', '').lower() in ('true', '1', 'yes'):
+            count = queryset.order_by().count()
+        
+        cursor = request.query_params.get('cursor')
+        position = decode_cursor(cursor) if cursor else None
+        
+        if position is None:
+            direction = 'next'
+            queryset = queryset.order_by(f'-{ordering_field}', '-pk')
+        else:
+            ordering_value, pk, direction = position
+            if direction == 'next':
+                queryset = queryset.filter(
+                    Q(**{f'{ordering_field}__lt': ordering_value})
+                    | Q(**{ordering_field: ordering_value, 'pk__lt': pk})
+                ).order_by(f'-{ordering_field}', '-pk')
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{ordering_field}__gt': ordering_value})
+                    | Q(**{ordering_field: ordering_value, 'pk__gt': pk})
+                ).order_by(ordering_field, 'pk')
+        
+        # Keyingi sahifa borligini bilish uchun bitta ortiqcha element olinadi
+        items = list(queryset[:limit + 1])
+        has_more = len(items) > limit
+        items = items[:limit]
+        if direction == 'prev':
+            items.reverse()
+        
+        def make_cursor(item, cursor_direction):
+            return encode_cursor([getattr(item, ordering_field).isoformat(), item.pk], cursor_direction)
+        
+        next_cursor = previous_cursor = None
+        if items:
+            if direction == 'next':
+                has_next, has_previous = has_more, position is not None
+            else:
+                has_next, has_previous = True, has_more
+            if has_next:
+                next_cursor = make_cursor(items[-1], 'next')
+            if has_previous:
+                previous_cursor = make_cursor(items[0], 'prev')
+        
+        return CursorPage(items, next_cursor, previous_cursor), CursorPaginator(limit, count)
+    
     def get_paginated_response(self, page_obj, paginator, serializer_data, message='Успешно'):
         """
         Paginated response yaratish
@@ -67,19 +369,139 @@ class PaginationMixin:
         Returns:
             Response: DRF Response object
         """
-        return Response({
-            'success': True,
-            'message': message,
-            'data': serializer_data,
-            'pagination': {
-                'current_page': page_obj.number,
-                'total_pages': paginator.num_pages,
-                'total_items': paginator.count,
+        if isinstance(page_obj, CursorPage):
+            pagination = {
+                'next_cursor': page_obj.next_cursor,
+                'previous_cursor': page_obj.previous_cursor,
                 'items_per_page': paginator.per_page,
                 'has_next': page_obj.has_next(),
                 'has_previous': page_obj.has_previous(),
             }
-        }, status=status.HTTP_200_OK)
+            if paginator.count is not None:
+                pagination['total_items'] = paginator.count
+            response = Response({
+                'success': True,
+                'message': message,
+                'data': serializer_data,
+                'pagination': pagination,
+            }, status=status.HTTP_200_OK)
+        else:
+            response = Response({
+                'success': True,
+                'message': message,
+                'data': serializer_data,
+                'pagination': {
+                    'current_page': page_obj.number,
+                    'total_pages': paginator.num_pages,
+                    'total_items': paginator.count,
+                    'items_per_page': paginator.per_page,
+                    'has_next': page_obj.has_next(),
+                    'has_previous': page_obj.has_previous(),
+                }
+            }, status=status.HTTP_200_OK)
+        
+        conditional_headers = getattr(self, '_conditional_headers', None)
+        if conditional_headers:
+            set_conditional_headers(response, *conditional_headers)
+        return response
+
+
+# Sparse fieldset uchun swagger parametrlari
+SPARSE_FIELDSET_PARAMETERS = [
+    openapi.Parameter('fields', openapi.IN_QUERY, description='Вернуть только перечисленные поля (через запятую). Тяжелые вложенные поля при этом выключены, если не указаны в fields или expand', type=openapi.TYPE_STRING, required=False),
+    openapi.Parameter('omit', openapi.IN_QUERY, description='Исключить перечисленные поля (через запятую)', type=openapi.TYPE_STRING, required=False),
+    openapi.Parameter('expand', openapi.IN_QUERY, description='Включить тяжелые вложенные поля вместе с fields (через запятую)', type=openapi.TYPE_STRING, required=False),
+]
+
+
+def _parse_field_list(value):
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_sparse_fieldset(request):
+    """
+    fields/omit/expand query parametrlarini o'qish (serializer context uchun)
+    
+    Parametrlar berilmagan bo'lsa None qaytaradi - javob o'zgarmaydi.
+    """
+    fieldset = {
+        'fields': _parse_field_list(request.query_params.get('fields')),
+        'omit': _parse_field_list(request.query_params.get('omit')) or set(),
+        'expand': _parse_field_list(request.query_params.get('expand')) or set(),
+    }
+    if fieldset['fields'] is None and not fieldset['omit'] and not fieldset['expand']:
+        return None
+    return fieldset
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer uchun fields/omit/expand konventsiyasi
+    
+    context['sparse_fieldset'] (get_sparse_fieldset natijasi) berilmasa -
+    serializer o'zgarishsiz ishlaydi. EXPANDABLE_FIELDS - qimmat ichki
+    maydonlar: fields berilganda ular faqat fields yoki expand'da
+    ko'rsatilsa qaytariladi. FIELD_RELATIONS - maydon uchun kerakli
+    select_related/prefetch_related (apply_sparse_fieldset ishlatadi).
+    """
+    EXPANDABLE_FIELDS = ()
+    FIELD_RELATIONS = {}
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fieldset = self.context.get('sparse_fieldset')
+        if fieldset:
+            allowed = self.get_rendered_fields(fieldset)
+            for field_name in list(self.fields):
+                if field_name not in allowed:
+                    self.fields.pop(field_name)
+    
+    @classmethod
+    def get_rendered_fields(cls, fieldset):
+        """
+        Javobda qaytariladigan maydonlar to'plami
+        """
+        declared = list(cls.Meta.fields)
+        if not fieldset:
+            return set(declared)
+        
+        requested = fieldset.get('fields')
+        expand = fieldset.get('expand') or set()
+        if requested is None:
+            rendered = set(declared)
+        else:
+            rendered = {
+                name for name in declared
+                if name in requested or (name in cls.EXPANDABLE_FIELDS and name in expand)
+            }
+        return rendered - (fieldset.get('omit') or set())
+
+
+def apply_sparse_fieldset(queryset, serializer_class, fieldset):
+    """
+    Faqat qaytariladigan maydonlar uchun select_related/prefetch_related qo'shish
+    
+    View'dagi barcha select_related/prefetch_related bekor qilinadi va
+    serializer_class.FIELD_RELATIONS bo'yicha qayta qo'shiladi.
+    """
+    if not fieldset:
+        return queryset
+    
+    rendered = serializer_class.get_rendered_fields(fieldset)
+    select_related, prefetch_related = [], []
+    for field_name, relations in serializer_class.FIELD_RELATIONS.items():
+        if field_name in rendered:
+            select_related.extend(relations.get('select_related', ()))
+            prefetch_related.extend(relations.get('prefetch_related', ()))
+    
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
 
 
 class FileValidationMixin:
@@ -41,6 +41,10 @@ class JournalsAndActs(models.Model):
         auto_now_add=True,
         verbose_name='Дата создания'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата обновления'
+    )
     
     objects = models.Manager()
     
@@ -2,7 +2,7 @@ from rest_framework import serializers
 from .models import JournalsAndActs, Bills, JournalAndActDocuments, BillDocuments
 from apps.v1.user_objects.models import UserObject
 from apps.v1.accounts.models import CustomUser
-from .mixins import FileValidationMixin
+from .mixins import FileValidationMixin, SparseFieldsetMixin
 
 
 class JournalsAndActsDocumentSerializer(serializers.ModelSerializer):
@@ -28,10 +28,17 @@ class JournalsAndActsDocumentSerializer(serializers.ModelSerializer):
         return None
         
 
-class JournalsAndActsSerializer(serializers.ModelSerializer):
+class JournalsAndActsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Сериализатор для чтения JournalsAndActs
     """
+    EXPANDABLE_FIELDS = ('object_id', 'user', 'document_list')
+    FIELD_RELATIONS = {
+        'object_id': {'select_related': ['object_id']},
+        'user': {'select_related': ['user']},
+        'document_list': {'prefetch_related': ['journal_and_act_documents']},
+    }
+    
     object_id = serializers.SerializerMethodField()
     user = serializers.SerializerMethodField()
     document_list = serializers.SerializerMethodField()
@@ -330,10 +337,17 @@ class BillsDocumentSerializer(serializers.ModelSerializer):
         return None
 
 
-class BillsSerializer(serializers.ModelSerializer):
+class BillsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Сериализатор для чтения Bills
     """
+    EXPANDABLE_FIELDS = ('object_id', 'user', 'document_list')
+    FIELD_RELATIONS = {
+        'object_id': {'select_related': ['object_id']},
+        'user': {'select_related': ['user']},
+        'document_list': {'prefetch_related': ['bill_documents']},
+    }
+    
     object_id = serializers.SerializerMethodField()
     user = serializers.SerializerMethodField()
     document_list = serializers.SerializerMethodField()
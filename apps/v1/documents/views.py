@@ -12,14 +12,47 @@ from .serializers import (
 )
 from apps.v1.accounts.error_handlers import get_error_message
 from apps.v1.user_objects.models import UserObject
-from .mixins import PaginationMixin
+from .exports import ExportMixin, EXPORT_PARAMETERS
+from .mixins import (
+    PaginationMixin, CURSOR_PAGINATION_PARAMETERS, SPARSE_FIELDSET_PARAMETERS, CONDITIONAL_GET_PARAMETERS,
+    get_sparse_fieldset, apply_sparse_fieldset
+)
+
+# Колонки экспорта (?export=csv|ndjson|xlsx)
+JOURNALS_AND_ACTS_EXPORT_FIELDS = (
+    ('id', 'ID'),
+    ('type', 'Тип'),
+    ('date', 'Дата'),
+    ('object_id_id', 'ID объекта'),
+    ('object_id__name', 'Название объекта'),
+    ('user_id', 'ID пользователя'),
+    ('user__email', 'Email пользователя'),
+    ('created_at', 'Дата создания'),
+    ('updated_at', 'Дата обновления'),
+)
+
+BILLS_EXPORT_FIELDS = (
+    ('id', 'ID'),
+    ('object_id_id', 'ID объекта'),
+    ('object_id__name', 'Название объекта'),
+    ('price', 'Цена'),
+    ('status', 'Статус'),
+    ('comment', 'Комментарий'),
+    ('user_id', 'ID пользователя'),
+    ('user__email', 'Email пользователя'),
+    ('created_at', 'Дата создания'),
+    ('updated_at', 'Дата обновления'),
+)
 
 
-class JournalsAndActsListCreateAPIView(PaginationMixin, APIView):
+class JournalsAndActsListCreateAPIView(ExportMixin, PaginationMixin, APIView):
     """
     Список и создание журналов и актов
     """
     permission_classes = [IsAuthenticated]
+    EXPORT_FIELDS = JOURNALS_AND_ACTS_EXPORT_FIELDS
+    EXPORT_FILENAME = 'journals-and-acts'
+    ETAG_VERSION_FIELDS = ('updated_at', 'object_id__updated_at', 'user__updated_at', 'journal_and_act_documents__updated_at')
     parser_classes = [MultiPartParser, FormParser]
     
     @swagger_auto_schema(
@@ -28,6 +61,10 @@ class JournalsAndActsListCreateAPIView(PaginationMixin, APIView):
         manual_parameters=[
             openapi.Parameter('page', openapi.IN_QUERY, description='Номер страницы', type=openapi.TYPE_INTEGER, required=False),
             openapi.Parameter('limit', openapi.IN_QUERY, description='Количество элементов на странице', type=openapi.TYPE_INTEGER, required=False),
+            *CURSOR_PAGINATION_PARAMETERS,
+            *CONDITIONAL_GET_PARAMETERS,
+            *SPARSE_FIELDSET_PARAMETERS,
+            *EXPORT_PARAMETERS,
         ],
         responses={200: 'OK', 401: 'Unauthorized'},
         security=[{'Bearer': []}]
@@ -43,10 +80,23 @@ class JournalsAndActsListCreateAPIView(PaginationMixin, APIView):
                 .prefetch_related('journal_and_act_documents')\
                 .order_by('-created_at')
             
+            export_response = self.get_export_response(request, queryset)
+            if export_response is not None:
+                return export_response
+            
+            # fields/omit/expand - keraksiz join va prefetch'lar olib tashlanadi
+            fieldset = get_sparse_fieldset(request)
+            queryset = apply_sparse_fieldset(queryset, JournalsAndActsSerializer, fieldset)
+            
+            # Conditional GET: ro'yxat o'zgarmagan bo'lsa 304 (serializatsiyasiz)
+            not_modified = self.get_list_not_modified_response(request, queryset)
+            if not_modified is not None:
+                return not_modified
+            
             # Pagination Mixin ishlatilmoqda
             journals_and_acts, paginator = self.paginate_queryset(queryset, request)
             
-            serializer = JournalsAndActsSerializer(journals_and_acts, many=True, context={'request': request})
+            serializer = JournalsAndActsSerializer(journals_and_acts, many=True, context={'request': request, 'sparse_fieldset': fieldset})
             
             return self.get_paginated_response(
                 journals_and_acts, 
@@ -242,11 +292,14 @@ class JournalsAndActsDetailAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class BillsListCreateAPIView(PaginationMixin, APIView):
+class BillsListCreateAPIView(ExportMixin, PaginationMixin, APIView):
     """
     Список и создание счетов
     """
     permission_classes = [IsAuthenticated]
+    EXPORT_FIELDS = BILLS_EXPORT_FIELDS
+    EXPORT_FILENAME = 'bills'
+    ETAG_VERSION_FIELDS = ('updated_at', 'object_id__updated_at', 'user__updated_at', 'bill_documents__updated_at')
     parser_classes = [MultiPartParser, FormParser]
     
     @swagger_auto_schema(
@@ -255,6 +308,10 @@ class BillsListCreateAPIView(PaginationMixin, APIView):
         manual_parameters=[
             openapi.Parameter('page', openapi.IN_QUERY, description='Номер страницы', type=openapi.TYPE_INTEGER, required=False),
             openapi.Parameter('limit', openapi.IN_QUERY, description='Количество элементов на странице', type=openapi.TYPE_INTEGER, required=False),
+            *CURSOR_PAGINATION_PARAMETERS,
+            *CONDITIONAL_GET_PARAMETERS,
+            *SPARSE_FIELDSET_PARAMETERS,
+            *EXPORT_PARAMETERS,
         ],
         responses={200: 'OK', 401: 'Unauthorized'},
         security=[{'Bearer': []}]
@@ -270,10 +327,23 @@ class BillsListCreateAPIView(PaginationMixin, APIView):
                 .prefetch_related('bill_documents')\
                 .order_by('-created_at')
             
+            export_response = self.get_export_response(request, queryset)
+            if export_response is not None:
+                return export_response
+            
+            # fields/omit/expand - keraksiz join va prefetch'lar olib tashlanadi
+            fieldset = get_sparse_fieldset(request)
+            queryset = apply_sparse_fieldset(queryset, BillsSerializer, fieldset)
+            
+            # Conditional GET: ro'yxat o'zgarmagan bo'lsa 304 (serializatsiyasiz)
+            not_modified = self.get_list_not_modified_response(request, queryset)
+            if not_modified is not None:
+                return not_modified
+            
             # Pagination Mixin ishlatilmoqda
             bills, paginator = self.paginate_queryset(queryset, request)
             
-            serializer = BillsSerializer(bills, many=True, context={'request': request})
+            serializer = BillsSerializer(bills, many=True, context={'request': request, 'sparse_fieldset': fieldset})
             
             return self.get_paginated_response(
                 bills, 
@@ -471,11 +541,14 @@ class BillsDetailAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class JournalsAndActsByObjectUserListAPIView(PaginationMixin, APIView):
+class JournalsAndActsByObjectUserListAPIView(ExportMixin, PaginationMixin, APIView):
     """
     Список журналов и актов, отфильтрованных по пользователю объекта (не по создателю)
     """
     permission_classes = [IsAuthenticated]
+    EXPORT_FIELDS = JOURNALS_AND_ACTS_EXPORT_FIELDS
+    EXPORT_FILENAME = 'journals-and-acts'
+    ETAG_VERSION_FIELDS = ('updated_at', 'object_id__updated_at', 'user__updated_at', 'journal_and_act_documents__updated_at')
     
     @swagger_auto_schema(
         operation_description="Получение списка журналов и актов, отфильтрованных по пользователю объекта (UserObject.user)",
@@ -483,6 +556,10 @@ class JournalsAndActsByObjectUserListAPIView(PaginationMixin, APIView):
         manual_parameters=[
             openapi.Parameter('page', openapi.IN_QUERY, description='Номер страницы', type=openapi.TYPE_INTEGER, required=False),
             openapi.Parameter('limit', openapi.IN_QUERY, description='Количество элементов на странице', type=openapi.TYPE_INTEGER, required=False),
+            *CURSOR_PAGINATION_PARAMETERS,
+            *CONDITIONAL_GET_PARAMETERS,
+            *SPARSE_FIELDSET_PARAMETERS,
+            *EXPORT_PARAMETERS,
         ],
         responses={200: 'OK', 401: 'Unauthorized'},
         security=[{'Bearer': []}]
@@ -498,10 +575,23 @@ class JournalsAndActsByObjectUserListAPIView(PaginationMixin, APIView):
                 .prefetch_related('journal_and_act_documents')\
                 .order_by('-created_at')
             
+            export_response = self.get_export_response(request, queryset)
+            if export_response is not None:
+                return export_response
+            
+            # fields/omit/expand - keraksiz join va prefetch'lar olib tashlanadi
+            fieldset = get_sparse_fieldset(request)
+            queryset = apply_sparse_fieldset(queryset, JournalsAndActsSerializer, fieldset)
+            
+            # Conditional GET: ro'yxat o'zgarmagan bo'lsa 304 (serializatsiyasiz)
+            not_modified = self.get_list_not_modified_response(request, queryset)
+            if not_modified is not None:
+                return not_modified
+            
             # Pagination Mixin ishlatilmoqda
             journals_and_acts, paginator = self.paginate_queryset(queryset, request)
             
-            serializer = JournalsAndActsSerializer(journals_and_acts, many=True, context={'request': request})
+            serializer = JournalsAndActsSerializer(journals_and_acts, many=True, context={'request': request, 'sparse_fieldset': fieldset})
             
             return self.get_paginated_response(
                 journals_and_acts, 
@@ -518,11 +608,14 @@ class JournalsAndActsByObjectUserListAPIView(PaginationMixin, APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class BillsByObjectUserListAPIView(PaginationMixin, APIView):
+class BillsByObjectUserListAPIView(ExportMixin, PaginationMixin, APIView):
     """
     Список счетов, отфильтрованных по пользователю объекта (не по создателю счета)
     """
     permission_classes = [IsAuthenticated]
+    EXPORT_FIELDS = BILLS_EXPORT_FIELDS
+    EXPORT_FILENAME = 'bills'
+    ETAG_VERSION_FIELDS = ('updated_at', 'object_id__updated_at', 'user__updated_at', 'bill_documents__updated_at')
     
     @swagger_auto_schema(
         operation_description="Получение списка счетов, отфильтрованных по пользователю объекта (UserObject.user)",
@@ -530,6 +623,10 @@ class BillsByObjectUserListAPIView(PaginationMixin, APIView):
         manual_parameters=[
             openapi.Parameter('page', openapi.IN_QUERY, description='Номер страницы', type=openapi.TYPE_INTEGER, required=False),
             openapi.Parameter('limit', openapi.IN_QUERY, description='Количество элементов на странице', type=openapi.TYPE_INTEGER, required=False),
+            *CURSOR_PAGINATION_PARAMETERS,
+            *CONDITIONAL_GET_PARAMETERS,
+            *SPARSE_FIELDSET_PARAMETERS,
+            *EXPORT_PARAMETERS,
         ],
         responses={200: 'OK', 401: 'Unauthorized'},
         security=[{'Bearer': []}]
@@ -545,10 +642,23 @@ class BillsByObjectUserListAPIView(PaginationMixin, APIView):
                 .prefetch_related('bill_documents')\
                 .order_by('-created_at')
             
+            export_response = self.get_export_response(request, queryset)
+            if export_response is not None:
+                return export_response
+            
+            # fields/omit/expand - keraksiz join va prefetch'lar olib tashlanadi
+            fieldset = get_sparse_fieldset(request)
+            queryset = apply_sparse_fieldset(queryset, BillsSerializer, fieldset)
+            
+            # Conditional GET: ro'yxat o'zgarmagan bo'lsa 304 (serializatsiyasiz)
+            not_modified = self.get_list_not_modified_response(request, queryset)
+            if not_modified is not None:
+                return not_modified
+            
             # Pagination Mixin ishlatilmoqda
             bills, paginator = self.paginate_queryset(queryset, request)
             
-            serializer = BillsSerializer(bills, many=True, context={'request': request})
+            serializer = BillsSerializer(bills, many=True, context={'request': request, 'sparse_fieldset': fieldset})
             
             return self.get_paginated_response(
                 bills, 
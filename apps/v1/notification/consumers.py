@@ -7,6 +7,8 @@ from rest_framework_simplejwt.tokens import UntypedToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from jwt import decode as jwt_decode
 from django.conf import settings
+from apps.v1.accounts.roles import get_user_roles
+from .services import get_role_groups, get_unread_count
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -57,8 +59,21 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 )
                 print(f"[DEBUG] Successfully added to group: {self.room_group_name}")
                 
+                # Группы ролей (широковещательные уведомления) - роли на момент подключения
+                self.role_group_names = await self.get_role_group_names(user)
+                for group_name in self.role_group_names:
+                    await self.channel_layer.group_add(group_name, self.channel_name)
+                logger.debug("Role groups: %s", self.role_group_names)
+                
                 print(f"[DEBUG] Accepting WebSocket connection...")
                 await self.accept()
+                
+                # Текущий счетчик непрочитанных; дальше он приходит в каждом уведомлении
+                self.unread_count = await self.get_unread_count(user)
+                await self.send(text_data=json.dumps({
+                    'type': 'unread_count',
+                    'unread_count': self.unread_count
+                }, ensure_ascii=False))
                 print(f"[DEBUG] ========== WebSocket CONNECTED successfully ==========")
             else:
                 print(f"[DEBUG] ERROR: User is None, closing connection")
@@ -83,6 +98,8 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 self.channel_name
             )
             print(f"[DEBUG] Removed from group: {self.room_group_name}")
+            for group_name in getattr(self, 'role_group_names', []):
+                await self.channel_layer.group_discard(group_name, self.channel_name)
         else:
             print(f"[DEBUG] WARNING: room_group_name not found")
         if hasattr(self, 'user'):
@@ -142,10 +159,15 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             print(f"[DEBUG] Notification ID: {notification.get('id')}")
             print(f"[DEBUG] Notification message: {notification.get('message')}")
             
+            # Счетчик из события (личная группа) или +1 к текущему (группа роли)
+            unread_count = event.get('unread_count')
+            self.unread_count = unread_count if unread_count is not None else getattr(self, 'unread_count', 0) + 1
+            
             # Отправляем уведомление через WebSocket
             message = json.dumps({
                 'type': 'notification',
-                'data': notification
+                'data': notification,
+                'unread_count': self.unread_count
             }, ensure_ascii=False)
             print(f"[DEBUG] Prepared message to send: {message}")
             print(f"[DEBUG] Attempting to send message to WebSocket client...")
@@ -161,6 +183,41 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             import traceback
             print(f"[DEBUG] Traceback: {traceback.format_exc()}")
     
+    async def notification_batch(self, event):
+        """
+        Отправка пакета уведомлений клиенту (каждое - отдельным сообщением 'notification')
+        """
+        notifications = event.get('notifications', [])
+        unread_count = event.get('unread_count')
+        for index, notification in enumerate(notifications, start=1):
+            await self.notification_message({
+                'type': 'notification_message',
+                'notification': notification,
+                # Счетчик после index-го уведомления пакета
+                'unread_count': None if unread_count is None else unread_count - len(notifications) + index
+            })
+    
+    async def notification_unread_count(self, event):
+        """
+        Новое значение счетчика непрочитанных (прочтение в другом подключении или через API)
+        """
+        self.unread_count = event['unread_count']
+        await self.send(text_data=json.dumps({
+            'type': 'unread_count',
+            'unread_count': self.unread_count
+        }, ensure_ascii=False))
+    
+    @database_sync_to_async
+    def get_unread_count(self, user):
+        return get_unread_count(user)
+    
+    @database_sync_to_async
+    def get_role_group_names(self, user):
+        """
+        WebSocket группы ролей пользователя (role_admin, ...)
+        """
+        return get_role_groups(get_user_roles(user))
+    
     @database_sync_to_async
     def get_user_from_token(self, token):
         """
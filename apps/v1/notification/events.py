@@ -0,0 +1,86 @@
+"""
+События уведомлений и способ их доставки (NOTIFICATION_DELIVERY)
+
+Сигналы не создают уведомления сами, а вызывают notify(event, **payload)
+с компактным событием - только id (JSON для Celery). Обработчик события,
+зарегистрированный через @notification_event, по id загружает данные,
+определяет получателей и добавляет их в NotificationDispatcher.
+
+Режимы NOTIFICATION_DELIVERY:
+- sync - сразу в сигнале (внутри запроса);
+- on_commit - в том же процессе после коммита транзакции;
+- celery - после коммита ставится задача deliver_notification_event,
+  уведомления создает и отправляет воркер. Если брокер недоступен,
+  событие доставляется в процессе.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from .services import NotificationDispatcher
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_SYNC = 'sync'
+DELIVERY_ON_COMMIT = 'on_commit'
+DELIVERY_CELERY = 'celery'
+DELIVERY_MODES = (DELIVERY_SYNC, DELIVERY_ON_COMMIT, DELIVERY_CELERY)
+
+# Имя события -> обработчик handler(dispatcher, **payload)
+NOTIFICATION_EVENTS = {}
+
+
+def notification_event(name):
+    """
+    Регистрация обработчика события уведомлений
+    """
+    def register(handler):
+        NOTIFICATION_EVENTS[name] = handler
+        return handler
+    return register
+
+
+def get_delivery_mode():
+    mode = getattr(settings, 'NOTIFICATION_DELIVERY', DELIVERY_SYNC)
+    return mode if mode in DELIVERY_MODES else DELIVERY_SYNC
+
+
+def deliver_event(event, payload):
+    """
+    Создание и отправка уведомлений события; возвращает созданные уведомления
+    """
+    handler = NOTIFICATION_EVENTS.get(event)
+    if handler is None:
+        logger.warning('Unknown notification event: %s', event)
+        return []
+    dispatcher = NotificationDispatcher()
+    handler(dispatcher, **payload)
+    return dispatcher.dispatch()
+
+
+def _enqueue_event(event, payload):
+    from .tasks import deliver_notification_event
+
+    try:
+        deliver_notification_event.delay(event, payload)
+    except Exception as e:
+        # Брокер недоступен - уведомления не теряем, доставляем в процессе
+        logger.warning('Notification task enqueue failed, delivering in process: %s', e)
+        deliver_event(event, payload)
+
+
+def notify(event, **payload):
+    """
+    Уведомления по событию в режиме NOTIFICATION_DELIVERY
+
+    payload - только JSON-сериализуемые значения (id), данные загружает обработчик.
+    """
+    mode = get_delivery_mode()
+    # robust=True: ошибка доставки логируется и не мешает остальным on_commit колбэкам
+    if mode == DELIVERY_CELERY:
+        transaction.on_commit(lambda: _enqueue_event(event, payload), robust=True)
+    elif mode == DELIVERY_ON_COMMIT:
+        transaction.on_commit(lambda: deliver_event(event, payload), robust=True)
+    else:
+        deliver_event(event, payload)
@@ -0,0 +1,129 @@
+import asyncio
+import multiprocessing
+import queue
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from apps.v1.notification.redis_stub import start_in_thread
+from config.libraries.channels import build_channel_layer
+
+BENCH_GROUP = 'bench_fanout'
+
+
+def _create_layer(layer_config):
+    return import_string(layer_config['BACKEND'])(**layer_config.get('CONFIG', {}))
+
+
+async def _close_layer(layer):
+    # core layer - close_pools(); pubsub layer - flush() закрывает подписки и соединения
+    if hasattr(layer, 'close_pools'):
+        await layer.close_pools()
+    elif hasattr(layer, 'flush'):
+        await layer.flush()
+
+
+def _consume(layer_config, expected, timeout, ready, results):
+    """
+    Процесс-потребитель (отдельный процесс Daphne): подписка на группу и прием сообщений
+    """
+    async def run():
+        layer = _create_layer(layer_config)
+        channel = await layer.new_channel()
+        await layer.group_add(BENCH_GROUP, channel)
+        ready.release()
+        latencies = []
+        try:
+            while len(latencies) < expected:
+                message = await asyncio.wait_for(layer.receive(channel), timeout)
+                latencies.append(time.time() - message['sent'])
+        except asyncio.TimeoutError:
+            pass
+        await layer.group_discard(BENCH_GROUP, channel)
+        await _close_layer(layer)
+        return latencies
+
+    results.put(asyncio.run(run()))
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк доставки group_send через channel layer в 1 / 4 / 16 процессов-потребителей'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--consumers', default='1,4,16', help='Количество процессов-потребителей через запятую')
+        parser.add_argument('--messages', type=int, default=2000, help='Сообщений group_send на прогон')
+        parser.add_argument('--backend', default='redis_pubsub', choices=['redis', 'redis_pubsub'], help='Channel layer')
+        parser.add_argument('--redis-urls', default='', help='Redis URL через запятую (шарды); по умолчанию - локальная замена Redis')
+        parser.add_argument('--shards', type=int, default=1, help='Количество шардов локальной замены Redis')
+        parser.add_argument('--timeout', type=float, default=10.0, help='Ожидание сообщения потребителем (с)')
+
+    def handle(self, *args, **options):
+        urls = [url.strip() for url in options['redis_urls'].split(',') if url.strip()]
+        if not urls:
+            if options['backend'] != 'redis_pubsub':
+                raise CommandError('Локальная замена Redis поддерживает только --backend redis_pubsub')
+            urls = [server.url for server in start_in_thread(ports=[0] * options['shards'])]
+        messages = options['messages']
+        # Емкость канала (core layer) - весь прогон, иначе потребитель не успевает и получает ChannelFull
+        layer_config = build_channel_layer(options['backend'], urls, prefix='bench', capacity=messages + 100)
+        try:
+            import_string(layer_config['BACKEND'])
+        except ImportError as e:
+            raise CommandError(f'Channel layer недоступен ({e}): установите channels_redis из requirements.txt')
+        self.stdout.write(f"{layer_config['BACKEND']} hosts={urls}")
+
+        # spawn - потребители не наследуют соединения и потоки текущего процесса
+        context = multiprocessing.get_context('spawn')
+        self.stdout.write(
+            f"{'consumers':>9} {'sent/s':>9} {'delivered':>10} {'deliv/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        )
+        for consumers in [int(value) for value in options['consumers'].split(',') if value.strip()]:
+            ready = context.Semaphore(0)
+            results = context.Queue()
+            processes = [
+                context.Process(target=_consume, args=(layer_config, messages, options['timeout'], ready, results), daemon=True)
+                for _ in range(consumers)
+            ]
+            for process in processes:
+                process.start()
+            connected = 0
+            deadline = time.monotonic() + 60
+            while connected < consumers:
+                if ready.acquire(timeout=1):
+                    connected += 1
+                elif time.monotonic() > deadline or any(process.exitcode is not None for process in processes):
+                    raise CommandError('Потребитель не подключился к channel layer')
+
+            started = time.perf_counter()
+            asyncio.run(self._produce(layer_config, messages))
+            send_seconds = time.perf_counter() - started
+
+            latencies = []
+            for _ in processes:
+                try:
+                    latencies.extend(results.get(timeout=options['timeout'] + 60))
+                except queue.Empty:
+                    break
+            delivered_seconds = time.perf_counter() - started
+            for process in processes:
+                process.join(timeout=5)
+
+            expected = consumers * messages
+            latencies.sort()
+            p50 = statistics.median(latencies) * 1000 if latencies else 0
+            p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000 if latencies else 0
+            peak = latencies[-1] * 1000 if latencies else 0
+            self.stdout.write(
+                f'{consumers:>9} {messages / send_seconds:>9.0f} {len(latencies):>5}/{expected:<4} '
+                f'{len(latencies) / delivered_seconds:>9.0f} {p50:>8.1f} {p99:>8.1f} {peak:>8.1f}'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершен'))
+
+    async def _produce(self, layer_config, messages):
+        layer = _create_layer(layer_config)
+        for sequence in range(messages):
+            await layer.group_send(BENCH_GROUP, {'type': 'bench.message', 'sequence': sequence, 'sent': time.time()})
+        await _close_layer(layer)
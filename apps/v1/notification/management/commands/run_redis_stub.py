@@ -0,0 +1,27 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from apps.v1.notification.redis_stub import RedisStubServer
+
+
+class Command(BaseCommand):
+    help = 'Локальная замена Redis (Pub/Sub) для channel layer: по одному серверу на порт (шард)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Адрес')
+        parser.add_argument('--ports', default='6390', help='Порты через запятую - по одному шарду на порт')
+
+    def handle(self, *args, **options):
+        ports = [int(port) for port in options['ports'].split(',') if port.strip()]
+
+        async def serve():
+            servers = [await RedisStubServer(options['host'], port).start() for port in ports]
+            urls = ','.join(server.url for server in servers)
+            self.stdout.write(f'CHANNEL_LAYER_BACKEND=redis_pubsub CHANNEL_REDIS_URLS={urls}')
+            await asyncio.gather(*[server.server.serve_forever() for server in servers])
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('notification', '0003_notification_notif_recip_read_created_idx_and_more'),
+        ('user_objects', '0012_userobject_deleted_at_partial_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_at', models.DateTimeField(auto_now_add=True, verbose_name='Прочитано')),
+            ],
+            options={
+                'verbose_name': 'Прочтение уведомления',
+                'verbose_name_plural': 'Прочтения уведомлений',
+            },
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='audience_role',
+            field=models.CharField(blank=True, max_length=150, null=True, verbose_name='Роль получателей'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('audience_role__isnull', False)), fields=['audience_role', '-created_at'], name='notif_role_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='notificationreceipt',
+            name='notification',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='notification.notification', verbose_name='Уведомление'),
+        ),
+        migrations.AddField(
+            model_name='notificationreceipt',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_receipts', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AddConstraint(
+            model_name='notificationreceipt',
+            constraint=models.UniqueConstraint(fields=('user', 'notification'), name='notif_receipt_user_notif_uniq'),
+        ),
+    ]
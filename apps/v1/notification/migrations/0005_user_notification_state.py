@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_customuser_permissions_version'),
+        ('notification', '0004_notification_audience_role_receipts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserNotificationState',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_state', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('unread_count', models.PositiveIntegerField(default=0, verbose_name='Непрочитанные')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Состояние уведомлений пользователя',
+                'verbose_name_plural': 'Состояния уведомлений пользователей',
+            },
+        ),
+    ]
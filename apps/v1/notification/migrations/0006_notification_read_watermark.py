@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0005_user_notification_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usernotificationstate',
+            name='read_until_id',
+            field=models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Прочитано до id'),
+        ),
+    ]
@@ -39,6 +39,9 @@ class Notification(models.Model):
     )
 
     category = models.CharField(max_length=100, blank=True, null=True, verbose_name="Категория")
+    # Широковещательное уведомление: одна строка для всех пользователей роли (recipient пустой),
+    # прочтение - NotificationReceipt для каждого пользователя
+    audience_role = models.CharField(max_length=150, blank=True, null=True, verbose_name="Роль получателей")
     is_read = models.BooleanField(default=False, verbose_name="Прочитано")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
 
@@ -50,9 +53,69 @@ class Notification(models.Model):
             models.Index(fields=['recipient', 'is_read', '-created_at'], name='notif_recip_read_created_idx'),
             models.Index(fields=['recipient', '-created_at'], name='notif_recip_created_idx'),
             models.Index(fields=['category', '-created_at'], name='notif_cat_created_idx'),
+            models.Index(fields=['audience_role', '-created_at'], name='notif_role_created_idx', condition=models.Q(audience_role__isnull=False)),
         ]
 
     def __str__(self):
-        return f"{self.recipient} - {self.verb}"
+        return f"{self.recipient or self.audience_role} - {self.verb}"
+
+
+class NotificationReceipt(models.Model):
+    """
+    Прочтение широковещательного уведомления пользователем
+    """
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.CASCADE,
+        related_name="receipts",
+        verbose_name="Уведомление",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="notification_receipts",
+        verbose_name="Пользователь",
+    )
+    read_at = models.DateTimeField(auto_now_add=True, verbose_name="Прочитано")
+
+    class Meta:
+        verbose_name = "Прочтение уведомления"
+        verbose_name_plural = "Прочтения уведомлений"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'notification'], name='notif_receipt_user_notif_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.notification_id}"
+
+
+class UserNotificationState(models.Model):
+    """
+    Счетчик непрочитанных уведомлений пользователя (денормализация)
+    
+    Изменяется только через F() выражения при создании и прочтении
+    уведомлений; расхождения исправляет периодическая сверка.
+    
+    read_until_id - граница прочтения: все уведомления с id не больше
+    считаются прочитанными без изменения их строк ("прочитать все" - O(1)).
+    Граница по id, а не по времени: одинаковые created_at не делают ее неоднозначной.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_state",
+        verbose_name="Пользователь",
+    )
+    unread_count = models.PositiveIntegerField(default=0, verbose_name="Непрочитанные")
+    read_until_id = models.PositiveBigIntegerField(null=True, blank=True, verbose_name="Прочитано до id")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлено")
+
+    class Meta:
+        verbose_name = "Состояние уведомлений пользователя"
+        verbose_name_plural = "Состояния уведомлений пользователей"
+
+    def __str__(self):
+        return f"{self.user} - {self.unread_count}"
 
 # Create your models here.
@@ -0,0 +1,244 @@
+"""
+Локальная замена Redis для channel layer (тесты, бенчмарки, разработка)
+
+Asyncio сервер с протоколом Redis (RESP2) и подмножеством команд, которых
+достаточно для channels_redis.pubsub.RedisPubSubChannelLayer через redis-py:
+PUBLISH / SUBSCRIBE / UNSUBSCRIBE, PING, а также служебные команды,
+которые клиент отправляет при подключении (AUTH, SELECT, CLIENT, HELLO 2).
+Данные не сохраняются, сообщения доставляются только текущим подписчикам -
+как и в Redis Pub/Sub.
+
+Несколько экземпляров на разных портах - несколько шардов:
+
+    CHANNEL_LAYER_BACKEND=redis_pubsub
+    CHANNEL_REDIS_URLS=redis://127.0.0.1:6390/0,redis://127.0.0.1:6391/0
+"""
+import asyncio
+import threading
+
+
+class RedisProtocolError(Exception):
+    pass
+
+
+def encode(value):
+    """
+    Значение Python -> RESP2 (bytes/str - bulk string, int - integer, list - array)
+    """
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, str):
+        value = value.encode()
+    if isinstance(value, bytes):
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+    return b'*%d\r\n' % len(value) + b''.join(encode(item) for item in value)
+
+
+OK = b'+OK\r\n'
+PONG = b'+PONG\r\n'
+
+
+def error(message):
+    return b'-ERR %s\r\n' % message.encode()
+
+
+async def read_command(reader):
+    """
+    Команда клиента: массив bulk строк или inline команда (redis-cli, telnet); None - соединение закрыто
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b'*'):
+        return line.split() or [b'']
+    try:
+        count = int(line[1:])
+    except ValueError:
+        raise RedisProtocolError('invalid multibulk length')
+    arguments = []
+    for _ in range(count):
+        header = await reader.readline()
+        if not header.startswith(b'$'):
+            raise RedisProtocolError("expected '$'")
+        length = int(header[1:])
+        data = await reader.readexactly(length + 2)
+        arguments.append(data[:-2])
+    return arguments
+
+
+class _Client:
+    def __init__(self, writer):
+        self.writer = writer
+        self.channels = set()
+
+
+class RedisStubServer:
+    """
+    Сервер Pub/Sub с протоколом Redis; port=0 - свободный порт
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.host = host
+        self.port = port
+        self.subscribers = {}  # канал -> множество клиентов
+        self.published = 0
+        self.server = None
+
+    @property
+    def url(self):
+        return f'redis://{self.host}:{self.port}/0'
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        client = _Client(writer)
+        try:
+            while True:
+                try:
+                    command = await read_command(reader)
+                except RedisProtocolError as e:
+                    writer.write(error(f'Protocol error: {e}'))
+                    break
+                if command is None:
+                    break
+                name = command[0].upper()
+                if name == b'QUIT':
+                    writer.write(OK)
+                    break
+                writer.write(self.execute(client, name, command[1:]))
+                # Медленный клиент не должен накапливать буфер без ограничений
+                if writer.transport.get_write_buffer_size() > 1024 * 1024:
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._unsubscribe(client, list(client.channels))
+            writer.close()
+
+    def execute(self, client, name, arguments):
+        handler = getattr(self, f'command_{name.decode(errors="replace").lower()}', None)
+        if handler is None:
+            return error(f"unknown command '{name.decode(errors='replace')}'")
+        try:
+            return handler(client, *arguments)
+        except TypeError:
+            return error(f"wrong number of arguments for '{name.decode().lower()}' command")
+
+    # Служебные команды при подключении клиента
+    def command_ping(self, client, message=None):
+        if client.channels:
+            return encode([b'pong', message or b''])
+        return PONG if message is None else encode(message)
+
+    def command_echo(self, client, message):
+        return encode(message)
+
+    def command_auth(self, client, *arguments):
+        return OK
+
+    def command_select(self, client, db):
+        return OK
+
+    def command_client(self, client, subcommand, *arguments):
+        if subcommand.upper() == b'ID':
+            return encode(id(client))
+        return OK
+
+    def command_hello(self, client, *arguments):
+        if arguments and arguments[0] != b'2':
+            return b'-NOPROTO unsupported protocol version\r\n'
+        return encode([b'server', b'redis', b'version', b'7.2.0', b'proto', 2])
+
+    def command_info(self, client, *arguments):
+        return encode(b'# Server\r\nredis_version:7.2.0\r\nredis_mode:standalone\r\n')
+
+    def command_flushall(self, client, *arguments):
+        return OK
+
+    command_flushdb = command_flushall
+
+    # Pub/Sub
+    def command_publish(self, client, channel, message):
+        subscribers = self.subscribers.get(channel, ())
+        payload = encode([b'message', channel, message])
+        delivered = 0
+        for subscriber in subscribers:
+            # Клиент отключился, но соединение еще не обработано
+            if subscriber.writer.is_closing():
+                continue
+            subscriber.writer.write(payload)
+            delivered += 1
+        self.published += 1
+        return encode(delivered)
+
+    def command_subscribe(self, client, *channels):
+        if not channels:
+            raise TypeError
+        replies = []
+        for channel in channels:
+            client.channels.add(channel)
+            self.subscribers.setdefault(channel, set()).add(client)
+            replies.append(encode([b'subscribe', channel, len(client.channels)]))
+        return b''.join(replies)
+
+    def command_unsubscribe(self, client, *channels):
+        channels = list(channels) or list(client.channels)
+        if not channels:
+            return encode([b'unsubscribe', None, 0])
+        replies = []
+        for channel in channels:
+            self._unsubscribe(client, [channel])
+            replies.append(encode([b'unsubscribe', channel, len(client.channels)]))
+        return b''.join(replies)
+
+    def command_pubsub(self, client, subcommand, *arguments):
+        subcommand = subcommand.upper()
+        if subcommand == b'CHANNELS':
+            return encode(sorted(channel for channel, subscribers in self.subscribers.items() if subscribers))
+        if subcommand == b'NUMSUB':
+            return encode([item for channel in arguments for item in (channel, len(self.subscribers.get(channel, ())))])
+        return error(f"unknown subcommand '{subcommand.decode(errors='replace')}'")
+
+    def _unsubscribe(self, client, channels):
+        for channel in channels:
+            client.channels.discard(channel)
+            subscribers = self.subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self.subscribers[channel]
+
+
+def start_in_thread(host='127.0.0.1', ports=(0,)):
+    """
+    Запуск серверов (по одному на шард) в фоновом потоке; возвращает список серверов
+    """
+    started = threading.Event()
+    servers = [RedisStubServer(host, port) for port in ports]
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        for server in servers:
+            loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name='redis-stub', daemon=True).start()
+    started.wait()
+    return servers
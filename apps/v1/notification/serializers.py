@@ -9,6 +9,7 @@ class NotificationSerializer(serializers.ModelSerializer):
     actor = serializers.SerializerMethodField()
     user_object = serializers.SerializerMethodField()
     target = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
     
     class Meta:
         model = Notification
@@ -20,6 +21,7 @@ class NotificationSerializer(serializers.ModelSerializer):
             'user_object',
             'target',
             'category',
+            'audience_role',
             'is_read',
             'created_at'
         ]
@@ -38,6 +40,12 @@ class NotificationSerializer(serializers.ModelSerializer):
             }
         return None
     
+    def get_is_read(self, obj):
+        """
+        Прочитано текущим пользователем (для широковещательных - по NotificationReceipt)
+        """
+        return getattr(obj, 'is_read_by_user', obj.is_read)
+    
     def get_user_object(self, obj):
         """
         Получение информации об объекте пользователя
@@ -79,3 +87,29 @@ class NotificationSerializer(serializers.ModelSerializer):
             }
         return None
 
+
+
+class NotificationBulkReadSerializer(serializers.Serializer):
+    """
+    Сериализатор для массового прочтения уведомлений: список ids или all (до up_to_id / up_to)
+    """
+    MAX_NOTIFICATIONS = 1000
+    
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_NOTIFICATIONS
+    )
+    all = serializers.BooleanField(required=False, default=False)
+    up_to_id = serializers.IntegerField(required=False, min_value=1)
+    up_to = serializers.DateTimeField(required=False)
+    
+    def validate(self, attrs):
+        if bool(attrs.get('ids')) == attrs.get('all'):
+            raise serializers.ValidationError('Укажите либо ids, либо all=true')
+        if not attrs.get('all') and ('up_to_id' in attrs or 'up_to' in attrs):
+            raise serializers.ValidationError('up_to_id и up_to используются только с all=true')
+        if 'up_to_id' in attrs and 'up_to' in attrs:
+            raise serializers.ValidationError('Укажите либо up_to_id, либо up_to')
+        return attrs
@@ -0,0 +1,454 @@
+"""
+Пакетное создание и отправка уведомлений
+
+Уведомления создаются одним bulk_create, а отправка в WebSocket группы
+выполняется за один переход в event loop (asyncio.gather) - одно сообщение
+на получателя вместо async_to_sync(group_send) на каждое уведомление.
+
+NotificationDispatcher собирает получателей из нескольких источников
+(администраторы, работники объекта) и отправляет все одним пакетом.
+
+Широковещательное уведомление для роли (broadcast) - одна строка с
+audience_role и одна отправка в группу role_<роль>, к которой consumer
+подключает всех пользователей роли. Прочтение хранится отдельно для
+каждого пользователя (NotificationReceipt).
+
+Счетчик непрочитанных (UserNotificationState) увеличивается F() выражением
+в том же bulk_create, уменьшается при прочтении и передается в каждом
+WebSocket сообщении. Строка счетчика создается при первом обращении
+(подключение к WebSocket, API) подсчетом по БД; reconcile_unread_counts()
+периодически исправляет расхождения (смена роли, удаленные уведомления).
+
+Массовое прочтение: список id - один UPDATE (и один INSERT прочтений),
+"прочитать все" - только сдвиг границы прочтения read_until_id.
+"""
+import asyncio
+import logging
+from collections import Counter
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import BooleanField, Case, Exists, F, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from apps.v1.accounts.models import CustomUser
+from apps.v1.accounts.roles import ROLE_ADMIN, ROLE_CUSTOMER, ROLE_MANAGER, get_user_roles
+
+from .models import Notification, NotificationReceipt, UserNotificationState
+
+logger = logging.getLogger(__name__)
+
+# Роли с широковещательными уведомлениями -> WebSocket группа
+# (имя группы channels - только ASCII, поэтому не имя роли)
+ROLE_GROUPS = {
+    ROLE_ADMIN: 'role_admin',
+    ROLE_MANAGER: 'role_manager',
+    ROLE_CUSTOMER: 'role_customer',
+}
+
+
+def get_role_groups(roles):
+    """
+    WebSocket группы ролей пользователя
+    """
+    return sorted(ROLE_GROUPS[role] for role in roles if role in ROLE_GROUPS)
+
+
+def get_notification_group(notification):
+    if notification.audience_role:
+        return ROLE_GROUPS.get(notification.audience_role)
+    if notification.recipient_id:
+        return f"user_{notification.recipient_id}"
+    return None
+
+
+def build_notification_event(notification):
+    """
+    Сообщение для группы user_<id> (формат NotificationConsumer.notification_message)
+    """
+    actor = notification.actor
+    user_object = notification.user_object
+    return {
+        "type": "notification_message",
+        "notification": {
+            "id": notification.id,
+            "message": notification.message,
+            "verb": notification.verb,
+            "actor": {
+                "id": actor.id,
+                "first_name": actor.first_name,
+                "last_name": actor.last_name,
+            } if actor else None,
+            "user_object": {
+                "id": user_object.id,
+                "name": user_object.name,
+            } if user_object else None,
+            "created_at": notification.created_at.isoformat(),
+            "is_read": notification.is_read,
+            "audience_role": notification.audience_role,
+        }
+    }
+
+
+def get_visible_notifications(user):
+    """
+    Уведомления пользователя: личные и широковещательные для его ролей
+    
+    is_read_by_user - прочитано ли уведомление этим пользователем: id не
+    больше границы прочтения (UserNotificationState.read_until_id), иначе
+    is_read для личных и NotificationReceipt для широковещательных.
+    Широковещательные уведомления видны начиная с даты регистрации пользователя.
+    """
+    broadcast_roles = [role for role in get_user_roles(user) if role in ROLE_GROUPS]
+    visibility = Q(recipient=user)
+    if broadcast_roles:
+        visibility |= Q(audience_role__in=broadcast_roles, created_at__gte=user.date_joined)
+    receipts = NotificationReceipt.objects.filter(notification=OuterRef('pk'), user=user)
+    read_until_id = UserNotificationState.objects.filter(user=user).values('read_until_id')[:1]
+    return Notification.objects.filter(visibility).annotate(
+        is_read_by_user=Case(
+            When(id__lte=Subquery(read_until_id), then=Value(True)),
+            When(audience_role__isnull=True, then=F('is_read')),
+            default=Exists(receipts),
+            output_field=BooleanField()
+        )
+    )
+
+
+def mark_notification_read(notification, user):
+    """
+    Отметка прочтения: личное - is_read, широковещательное - NotificationReceipt пользователя
+    
+    Счетчик уменьшается только если уведомление действительно стало прочитанным.
+    """
+    if getattr(notification, 'is_read_by_user', False):
+        return notification
+    if notification.audience_role:
+        became_read = NotificationReceipt.objects.get_or_create(notification=notification, user=user)[1]
+    else:
+        # Условный UPDATE - повторное прочтение не уменьшит счетчик второй раз
+        became_read = bool(Notification.objects.filter(pk=notification.pk, is_read=False).update(is_read=True))
+        notification.is_read = True
+    notification.is_read_by_user = True
+    if became_read:
+        decrement_unread_count(user, 1)
+    return notification
+
+
+def mark_notifications_read(user, ids):
+    """
+    Прочтение списка уведомлений: один UPDATE личных и один INSERT прочтений широковещательных
+    
+    Возвращает количество уведомлений, ставших прочитанными. Чужие и уже
+    прочитанные (в том числе до границы прочтения) id пропускаются.
+    """
+    read_until_id = get_read_until_id(user)
+    personal = Notification.objects.filter(recipient=user, id__in=ids, is_read=False)
+    if read_until_id is not None:
+        personal = personal.filter(id__gt=read_until_id)
+    marked = personal.update(is_read=True)
+    
+    broadcast_ids = list(
+        get_visible_notifications(user)
+        .filter(id__in=ids, audience_role__isnull=False, is_read_by_user=False)
+        .values_list('id', flat=True)
+    )
+    if broadcast_ids:
+        NotificationReceipt.objects.bulk_create(
+            [NotificationReceipt(notification_id=notification_id, user=user) for notification_id in broadcast_ids],
+            ignore_conflicts=True
+        )
+        marked += len(broadcast_ids)
+    if marked:
+        decrement_unread_count(user, marked)
+    return marked
+
+
+def get_read_until_id(user):
+    return UserNotificationState.objects.filter(user=user).values_list('read_until_id', flat=True).first()
+
+
+def get_last_notification_id(user, up_to=None):
+    """
+    id последнего видимого пользователю уведомления, созданного не позже up_to (None - нет таких)
+    """
+    queryset = get_visible_notifications(user)
+    if up_to is not None:
+        queryset = queryset.filter(created_at__lte=up_to)
+    return queryset.aggregate(last_id=Max('id'))['last_id']
+
+
+def mark_all_notifications_read(user, up_to_id=None):
+    """
+    Прочтение всех уведомлений с id не больше up_to_id (по умолчанию - все существующие)
+    
+    Сдвигает только границу прочтения пользователя (граница не сдвигается
+    назад), строки уведомлений не изменяются. Без up_to_id счетчик обнуляется
+    без подсчета; с up_to_id пересчитываются только более новые уведомления.
+    Возвращает (read_until_id, unread_count).
+    """
+    now = timezone.now()
+    if up_to_id is None:
+        read_until_id = Notification.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        unread_count = 0
+        UserNotificationState.objects.update_or_create(
+            user=user, defaults={'read_until_id': read_until_id, 'unread_count': unread_count}
+        )
+    else:
+        state = UserNotificationState.objects.get_or_create(user=user)[0]
+        UserNotificationState.objects.filter(user=user).filter(
+            Q(read_until_id__isnull=True) | Q(read_until_id__lt=up_to_id)
+        ).update(read_until_id=up_to_id, updated_at=now)
+        read_until_id = max(up_to_id, state.read_until_id or 0)
+        unread_count = reconcile_unread_count(user)
+    push_unread_count(user.pk, unread_count)
+    return read_until_id, unread_count
+
+
+def reconcile_unread_count(user):
+    """
+    Подсчет непрочитанных по БД и запись в счетчик пользователя
+    
+    Уведомления до границы прочтения не подсчитываются.
+    """
+    queryset = get_visible_notifications(user).filter(is_read_by_user=False)
+    read_until_id = get_read_until_id(user)
+    if read_until_id is not None:
+        queryset = queryset.filter(id__gt=read_until_id)
+    unread_count = queryset.count()
+    UserNotificationState.objects.update_or_create(user=user, defaults={'unread_count': unread_count})
+    return unread_count
+
+
+def get_unread_count(user):
+    """
+    Количество непрочитанных уведомлений из счетчика (один запрос по первичному ключу)
+    """
+    unread_count = UserNotificationState.objects.filter(user=user).values_list('unread_count', flat=True).first()
+    if unread_count is None:
+        return reconcile_unread_count(user)
+    return unread_count
+
+
+def increment_unread_counts(notifications):
+    """
+    Увеличение счетчиков получателей новых уведомлений; возвращает {user_id: unread_count} личных получателей
+    
+    Один UPDATE на группу получателей с одинаковым приростом и один на роль.
+    Пользователи без строки счетчика пропускаются - их счетчик будет
+    посчитан по БД при первом обращении.
+    """
+    per_user = Counter(notification.recipient_id for notification in notifications if notification.recipient_id)
+    per_role = Counter(notification.audience_role for notification in notifications if notification.audience_role)
+    by_amount = {}
+    for user_id, amount in per_user.items():
+        by_amount.setdefault(amount, []).append(user_id)
+    now = timezone.now()
+    for amount, user_ids in by_amount.items():
+        UserNotificationState.objects.filter(user_id__in=user_ids).update(
+            unread_count=F('unread_count') + amount, updated_at=now
+        )
+    for role, amount in per_role.items():
+        UserNotificationState.objects.filter(user__groups__name=role).update(
+            unread_count=F('unread_count') + amount, updated_at=now
+        )
+    if not per_user:
+        return {}
+    return dict(UserNotificationState.objects.filter(user_id__in=per_user).values_list('user_id', 'unread_count'))
+
+
+def decrement_unread_count(user, amount):
+    """
+    Уменьшение счетчика пользователя (не ниже нуля) и отправка нового значения во все его подключения
+    """
+    UserNotificationState.objects.filter(user=user).update(
+        unread_count=Greatest(F('unread_count') - amount, 0), updated_at=timezone.now()
+    )
+    push_unread_count(user.pk, get_unread_count(user))
+
+
+def reconcile_unread_counts(chunk_size=500):
+    """
+    Сверка всех счетчиков с БД (периодическая задача); возвращает количество исправленных
+    
+    Запись только если счетчик не изменился с момента чтения - параллельное
+    создание или прочтение уведомления не перезаписывается (исправится при
+    следующей сверке).
+    """
+    fixed = 0
+    states = UserNotificationState.objects.select_related('user').order_by('pk')
+    for state in states.iterator(chunk_size=chunk_size):
+        queryset = get_visible_notifications(state.user).filter(is_read_by_user=False)
+        if state.read_until_id is not None:
+            queryset = queryset.filter(id__gt=state.read_until_id)
+        unread_count = queryset.count()
+        if unread_count == state.unread_count:
+            continue
+        fixed += UserNotificationState.objects.filter(pk=state.pk, unread_count=state.unread_count).update(
+            unread_count=unread_count, updated_at=timezone.now()
+        )
+    return fixed
+
+
+def push_unread_count(user_id, unread_count):
+    """
+    Новое значение счетчика во все WebSocket подключения пользователя
+    """
+    channel_layer = get_channel_layer()
+    if not channel_layer:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(f"user_{user_id}", {
+            "type": "notification_unread_count",
+            "unread_count": unread_count,
+        })
+    except Exception as e:
+        logger.warning('WebSocket unread count failed: %s', e)
+
+
+def push_notifications(notifications, unread_counts=None):
+    """
+    Отправка уже сохраненных уведомлений через WebSocket
+    
+    Одно сообщение на группу (пользователь или роль): несколько уведомлений
+    одной группе отправляются как notification_batch (consumer передает их
+    клиенту по одному). unread_counts - {user_id: счетчик} для групп
+    пользователей; для групп ролей счетчик ведет consumer.
+    """
+    unread_counts = unread_counts or {}
+    by_group = {}
+    for notification in notifications:
+        group_name = get_notification_group(notification)
+        if group_name:
+            by_group.setdefault(group_name, []).append(notification)
+    if not by_group:
+        return
+    
+    channel_layer = get_channel_layer()
+    if not channel_layer:
+        return
+    
+    def build_event(group_notifications):
+        if len(group_notifications) == 1:
+            event = build_notification_event(group_notifications[0])
+        else:
+            event = {
+                "type": "notification_batch",
+                "notifications": [
+                    build_notification_event(notification)["notification"]
+                    for notification in group_notifications
+                ]
+            }
+        recipient_id = group_notifications[0].recipient_id
+        if recipient_id in unread_counts:
+            event["unread_count"] = unread_counts[recipient_id]
+        return event
+    
+    async def send_all():
+        results = await asyncio.gather(*[
+            channel_layer.group_send(group_name, build_event(group_notifications))
+            for group_name, group_notifications in by_group.items()
+        ], return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning('WebSocket notification failed: %s', result)
+    
+    try:
+        async_to_sync(send_all)()
+    except Exception as e:
+        # Если WebSocket недоступен, уведомления остаются в БД
+        logger.warning('WebSocket notifications failed: %s', e)
+
+
+def send_notifications(notifications, batch_size=500):
+    """
+    Создание списка Notification одним bulk_create и отправка через WebSocket
+    
+    actor и user_object должны быть переданы объектами, а не *_id,
+    чтобы сообщения строились без дополнительных запросов.
+    """
+    notifications = list(notifications)
+    if not notifications:
+        return []
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(notifications, batch_size=batch_size)
+        unread_counts = increment_unread_counts(created)
+    push_notifications(created, unread_counts)
+    return created
+
+
+def get_admin_ids():
+    """
+    id активных администраторов (получатели служебных уведомлений)
+    """
+    return list(CustomUser.objects.filter(groups__name=ROLE_ADMIN, is_active=True).values_list('id', flat=True))
+
+
+class NotificationDispatcher:
+    """
+    Сбор уведомлений для нескольких получателей и отправка одним пакетом
+    
+        dispatcher = NotificationDispatcher()
+        dispatcher.add(get_admin_ids(), message, verb, actor=..., user_object=...)
+        dispatcher.add(worker_ids, message, verb, actor=..., user_object=...)
+        dispatcher.dispatch()
+    
+    Получатели - пользователи или их id. Повторное уведомление того же
+    события (verb, объект, target) одному получателю не добавляется:
+    администратор, который также работник объекта, получит одно уведомление.
+    
+    broadcast(role, ...) - одно уведомление для всех пользователей роли
+    (роль должна быть в ROLE_GROUPS).
+    """
+    
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.notifications = []
+        self._seen = set()
+    
+    def add(self, recipients, message, verb, actor=None, user_object=None, target=None, category='user_object'):
+        target_content_type = ContentType.objects.get_for_model(target) if target is not None else None
+        target_object_id = target.pk if target is not None else None
+        for recipient in recipients:
+            recipient_id = getattr(recipient, 'pk', recipient)
+            key = (recipient_id, verb, getattr(user_object, 'pk', None), target_content_type, target_object_id)
+            if recipient_id is None or key in self._seen:
+                continue
+            self._seen.add(key)
+            self.notifications.append(Notification(
+                recipient_id=recipient_id,
+                actor=actor,
+                verb=verb,
+                message=message,
+                user_object=user_object,
+                target_content_type=target_content_type,
+                target_object_id=target_object_id,
+                category=category
+            ))
+        return self
+    
+    def broadcast(self, role, message, verb, actor=None, user_object=None, target=None, category='user_object'):
+        if role not in ROLE_GROUPS:
+            raise ValueError(f'Role without broadcast group: {role}')
+        self.notifications.append(Notification(
+            audience_role=role,
+            actor=actor,
+            verb=verb,
+            message=message,
+            user_object=user_object,
+            target_content_type=ContentType.objects.get_for_model(target) if target is not None else None,
+            target_object_id=target.pk if target is not None else None,
+            category=category
+        ))
+        return self
+    
+    def dispatch(self):
+        """
+        Один bulk_create и одна отправка в WebSocket; возвращает созданные уведомления
+        """
+        notifications, self.notifications = self.notifications, []
+        self._seen = set()
+        return send_notifications(notifications, batch_size=self.batch_size)
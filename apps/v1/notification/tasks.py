@@ -0,0 +1,20 @@
+from celery import shared_task
+
+from .events import deliver_event
+from .services import reconcile_unread_counts
+
+
+@shared_task(ignore_result=True)
+def deliver_notification_event(event, payload):
+    """
+    Создание и отправка уведомлений события вне HTTP запроса (NOTIFICATION_DELIVERY=celery)
+    """
+    return len(deliver_event(event, payload))
+
+
+@shared_task(ignore_result=True)
+def reconcile_unread_notification_counts():
+    """
+    Сверка счетчиков непрочитанных уведомлений (UserNotificationState) с БД
+    """
+    return reconcile_unread_counts()
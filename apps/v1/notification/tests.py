@@ -1,3 +1,169 @@
-from django.test import TestCase
+"""
+Доставка уведомлений в режимах NOTIFICATION_DELIVERY (sync, on_commit, celery)
 
-# Create your tests here.
+Задачи Celery выполняются сразу (task_always_eager), WebSocket сообщения
+читаются из InMemoryChannelLayer. Отдельно - RedisPubSubChannelLayer поверх
+локальной замены Redis (redis_stub).
+"""
+import asyncio
+import importlib.util
+import unittest
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from config.celery import app as celery_app
+from .events import notification_event, notify
+from .models import Notification
+from .redis_stub import RedisStubServer
+from .tasks import deliver_notification_event
+
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@notification_event('delivery_check')
+def delivery_check_notifications(dispatcher, user_id):
+    dispatcher.add([user_id], 'Проверка доставки', 'delivery_check')
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class NotificationDeliveryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Настройки Celery читаются с префиксом CELERY_ (config/celery.py)
+        eager_conf = {
+            'CELERY_TASK_ALWAYS_EAGER': True,
+            'CELERY_TASK_EAGER_PROPAGATES': True,
+            'CELERY_RESULT_BACKEND': 'cache+memory://',
+        }
+        cls._celery_conf = {key: celery_app.conf.get(key) for key in eager_conf}
+        celery_app.conf.update(eager_conf)
+
+    @classmethod
+    def tearDownClass(cls):
+        celery_app.conf.update(cls._celery_conf)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='delivery', email='delivery@example.com', password='password'
+        )
+        self.channel_layer = get_channel_layer()
+        self.channel = async_to_sync(self._subscribe)()
+
+    async def _subscribe(self):
+        channel = await self.channel_layer.new_channel()
+        await self.channel_layer.group_add(f'user_{self.user.pk}', channel)
+        return channel
+
+    async def _receive_all(self, timeout=0.2):
+        messages = []
+        while True:
+            try:
+                messages.append(await asyncio.wait_for(self.channel_layer.receive(self.channel), timeout))
+            except asyncio.TimeoutError:
+                return messages
+
+    def received(self):
+        return async_to_sync(self._receive_all)()
+
+    def notifications(self):
+        return Notification.objects.filter(recipient=self.user, verb='delivery_check')
+
+    def assert_delivered_once(self):
+        self.assertEqual(self.notifications().count(), 1)
+        messages = self.received()
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0]['type'], 'notification_message')
+        self.assertEqual(messages[0]['notification']['message'], 'Проверка доставки')
+
+    def assert_nothing_delivered(self):
+        self.assertFalse(self.notifications().exists())
+        self.assertEqual(self.received(), [])
+
+    def notify_and_rollback(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    notify('delivery_check', user_id=self.user.pk)
+                    raise RuntimeError('rollback')
+        self.assertEqual(callbacks, [])
+
+    def notify_and_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                notify('delivery_check', user_id=self.user.pk)
+            # До коммита ничего не создано и не отправлено
+            self.assertFalse(self.notifications().exists())
+        self.assertEqual(len(callbacks), 1)
+
+    @override_settings(NOTIFICATION_DELIVERY='sync')
+    def test_sync_delivers_immediately(self):
+        notify('delivery_check', user_id=self.user.pk)
+        self.assert_delivered_once()
+
+    @override_settings(NOTIFICATION_DELIVERY='on_commit')
+    def test_on_commit_rollback_sends_nothing(self):
+        self.notify_and_rollback()
+        self.assert_nothing_delivered()
+
+    @override_settings(NOTIFICATION_DELIVERY='on_commit')
+    def test_on_commit_delivers_once_after_commit(self):
+        self.notify_and_commit()
+        self.assert_delivered_once()
+
+    @override_settings(NOTIFICATION_DELIVERY='celery')
+    def test_celery_rollback_enqueues_nothing(self):
+        with mock.patch.object(deliver_notification_event, 'delay', wraps=deliver_notification_event.delay) as delay:
+            self.notify_and_rollback()
+        delay.assert_not_called()
+        self.assert_nothing_delivered()
+
+    @override_settings(NOTIFICATION_DELIVERY='celery')
+    def test_celery_delivers_once_after_commit(self):
+        # assertNoLogs: задача выполнена Celery, а не резервной доставкой в процессе
+        with mock.patch.object(deliver_notification_event, 'delay', wraps=deliver_notification_event.delay) as delay, \
+                self.assertNoLogs('apps.v1.notification.events', 'WARNING'):
+            self.notify_and_commit()
+        delay.assert_called_once_with('delivery_check', {'user_id': self.user.pk})
+        self.assert_delivered_once()
+
+
+@unittest.skipUnless(importlib.util.find_spec('channels_redis'), 'channels_redis не установлен')
+class RedisStubChannelLayerTests(SimpleTestCase):
+    async def test_pubsub_layer_group_send(self):
+        from channels_redis.pubsub import RedisPubSubChannelLayer
+
+        # Два экземпляра - два шарда, группы и каналы распределяются между ними
+        servers = [await RedisStubServer().start() for _ in range(2)]
+        layer = RedisPubSubChannelLayer(hosts=[{'address': server.url} for server in servers])
+        try:
+            channels = [await layer.new_channel() for _ in range(2)]
+            for channel in channels:
+                await layer.group_add('user_1', channel)
+            other = await layer.new_channel()
+            await layer.group_add('user_2', other)
+
+            await layer.group_send('user_1', {'type': 'notification_message', 'id': 1})
+            for channel in channels:
+                message = await asyncio.wait_for(layer.receive(channel), 2)
+                self.assertEqual(message, {'type': 'notification_message', 'id': 1})
+
+            await layer.group_discard('user_1', channels[0])
+            await layer.group_send('user_1', {'type': 'notification_message', 'id': 2})
+            message = await asyncio.wait_for(layer.receive(channels[1]), 2)
+            self.assertEqual(message['id'], 2)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(layer.receive(channels[0]), 0.2)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(layer.receive(other), 0.2)
+            self.assertTrue(any(server.published for server in servers))
+        finally:
+            await layer.flush()
+            for server in servers:
+                await server.stop()
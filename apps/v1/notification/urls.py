@@ -5,5 +5,7 @@ app_name = 'notification'
 
 urlpatterns = [
     path('', views.NotificationListAPIView.as_view(), name='notification_list'),
+    path('read/', views.NotificationBulkReadAPIView.as_view(), name='notification_bulk_read'),
+    path('unread-count/', views.NotificationUnreadCountAPIView.as_view(), name='notification_unread_count'),
     path('<int:notification_id>/read/', views.NotificationMarkAsReadAPIView.as_view(), name='notification_mark_as_read'),
 ]
\ No newline at end of file
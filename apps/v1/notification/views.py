@@ -12,9 +12,18 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from .serializers import NotificationSerializer
+from .serializers import NotificationBulkReadSerializer, NotificationSerializer
+from .services import (
+    NotificationDispatcher,
+    get_last_notification_id,
+    get_unread_count,
+    get_visible_notifications,
+    mark_all_notifications_read,
+    mark_notification_read,
+    mark_notifications_read,
+)
 from apps.v1.accounts.error_handlers import get_error_message
-from apps.v1.documents.mixins import PaginationMixin
+from apps.v1.documents.mixins import PaginationMixin, CURSOR_PAGINATION_PARAMETERS
 
 
 @shared_task
@@ -23,13 +32,14 @@ def notify_expiring_services():
     for days_left in [10, 7, 4, 1]:
         target_date = now + timedelta(days=days_left)
         purchases = PurchasedService.objects.filter(is_active=True, finished_date__date=target_date.date())
+        dispatcher = NotificationDispatcher()
         for purchase in purchases.select_related('user', 'service'):
             # In-app notification
-            Notification.objects.create(
-                recipient=purchase.user,
+            dispatcher.add(
+                [purchase.user],
+                f"Услуга '{purchase.service.title}' истекает через {days_left} дней. Пожалуйста, продлите.",
+                'service_expiry_reminder',
                 actor=None,
-                verb='service_expiry_reminder',
-                message=f"Услуга '{purchase.service.title}' истекает через {days_left} дней. Пожалуйста, продлите.",
                 target=purchase,
                 category='service'
             )
@@ -44,6 +54,8 @@ def notify_expiring_services():
                 )
             except Exception:
                 pass
+        # Уведомления всем получателям одним bulk_create (и счетчики непрочитанных)
+        dispatcher.dispatch()
 
 
 class NotificationListAPIView(PaginationMixin, APIView):
@@ -53,12 +65,13 @@ class NotificationListAPIView(PaginationMixin, APIView):
     permission_classes = [IsAuthenticated]
     
     @swagger_auto_schema(
-        operation_description="Получение списка уведомлений текущего пользователя. Можно фильтровать по is_read параметру.",
+        operation_description="Получение списка уведомлений текущего пользователя: личные и широковещательные для его ролей (audience_role). Можно фильтровать по is_read параметру.",
         tags=['Notifications'],
         manual_parameters=[
             openapi.Parameter('is_read', openapi.IN_QUERY, description='Фильтр по статусу прочтения (true/false). Если не указан, возвращаются все уведомления.', type=openapi.TYPE_BOOLEAN, required=False),
             openapi.Parameter('page', openapi.IN_QUERY, description='Номер страницы', type=openapi.TYPE_INTEGER, required=False),
             openapi.Parameter('limit', openapi.IN_QUERY, description='Количество элементов на странице', type=openapi.TYPE_INTEGER, required=False),
+            *CURSOR_PAGINATION_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -75,14 +88,14 @@ class NotificationListAPIView(PaginationMixin, APIView):
             
             user = request.user
             
-            # Получаем все уведомления пользователя
-            queryset = Notification.objects.filter(recipient=user)
+            # Получаем все уведомления пользователя (личные и широковещательные для его ролей)
+            queryset = get_visible_notifications(user)
             
             # Фильтр по is_read, если указан
             is_read_param = request.query_params.get('is_read')
             if is_read_param is not None:
                 is_read_value = is_read_param.lower() in ('true', '1', 'yes')
-                queryset = queryset.filter(is_read=is_read_value)
+                queryset = queryset.filter(is_read_by_user=is_read_value)
             
             # prefetch_related va select_related qo'shildi - N+1 query muammosini hal qilish uchun
             queryset = queryset.select_related('actor', 'user_object', 'target_content_type')\
@@ -93,8 +106,8 @@ class NotificationListAPIView(PaginationMixin, APIView):
             
             serializer = NotificationSerializer(notifications, many=True)
             
-            # Unread count
-            unread_count = Notification.objects.filter(recipient=user, is_read=False).count()
+            # Unread count (denormalizatsiya qilingan hisoblagich)
+            unread_count = get_unread_count(user)
             
             response_data = self.get_paginated_response(
                 notifications,
@@ -123,7 +136,7 @@ class NotificationMarkAsReadAPIView(APIView):
     permission_classes = [IsAuthenticated]
     
     @swagger_auto_schema(
-        operation_description="Отметка уведомления как прочитанного (is_read=True)",
+        operation_description="Отметка уведомления как прочитанного (is_read=True). Для широковещательного уведомления роли прочтение сохраняется только для текущего пользователя.",
         tags=['Notifications'],
         responses={
             200: openapi.Response(
@@ -141,19 +154,15 @@ class NotificationMarkAsReadAPIView(APIView):
             
             # Получаем уведомление
             try:
-                notification = Notification.objects.get(
-                    id=notification_id,
-                    recipient=user
-                )
+                notification = get_visible_notifications(user).get(id=notification_id)
             except Notification.DoesNotExist:
                 return Response({
                     'success': False,
                     'message': 'Уведомление не найдено'
                 }, status=status.HTTP_404_NOT_FOUND)
             
-            # Отмечаем как прочитанное
-            notification.is_read = True
-            notification.save()
+            # Отмечаем как прочитанное (широковещательное - только для текущего пользователя)
+            mark_notification_read(notification, user)
             
             serializer = NotificationSerializer(notification)
             
@@ -169,3 +178,121 @@ class NotificationMarkAsReadAPIView(APIView):
                 'message': get_error_message('server_error'),
                 'errors': {'detail': str(e)}
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class NotificationBulkReadAPIView(APIView):
+    """
+    Массовая отметка уведомлений как прочитанных
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @swagger_auto_schema(
+        operation_description=(
+            "Массовое прочтение уведомлений. ids - список уведомлений (один UPDATE). "
+            "all=true - все уведомления с id не больше up_to_id или созданные не позже up_to (по умолчанию - все): "
+            "сдвигается только граница прочтения пользователя, строки уведомлений не изменяются."
+        ),
+        tags=['Notifications'],
+        request_body=NotificationBulkReadSerializer,
+        responses={
+            200: openapi.Response('Уведомления отмечены как прочитанные'),
+            400: openapi.Response('Ошибка валидации'),
+            401: openapi.Response('Требуется авторизация'),
+            404: openapi.Response('Уведомление up_to_id не найдено')
+        },
+        security=[{'Bearer': []}]
+    )
+    def post(self, request):
+        try:
+            serializer = NotificationBulkReadSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'message': get_error_message('validation_error'),
+                    'errors': serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            user = request.user
+            data = serializer.validated_data
+            
+            if not data['all']:
+                marked = mark_notifications_read(user, data['ids'])
+                return Response({
+                    'success': True,
+                    'message': 'Уведомления отмечены как прочитанные',
+                    'data': {
+                        'marked': marked,
+                        'unread_count': get_unread_count(user)
+                    }
+                }, status=status.HTTP_200_OK)
+            
+            up_to_id = data.get('up_to_id')
+            if up_to_id is not None:
+                if not get_visible_notifications(user).filter(id=up_to_id).exists():
+                    return Response({
+                        'success': False,
+                        'message': 'Уведомление не найдено'
+                    }, status=status.HTTP_404_NOT_FOUND)
+            elif 'up_to' in data:
+                # Граница по времени переводится в id последнего уведомления до нее
+                up_to_id = get_last_notification_id(user, data['up_to']) or 0
+            
+            read_until_id, unread_count = mark_all_notifications_read(user, up_to_id)
+            return Response({
+                'success': True,
+                'message': 'Уведомления отмечены как прочитанные',
+                'data': {
+                    'read_until_id': read_until_id,
+                    'unread_count': unread_count
+                }
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': get_error_message('server_error'),
+                'errors': {'detail': str(e)}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class NotificationUnreadCountAPIView(APIView):
+    """
+    Количество непрочитанных уведомлений текущего пользователя
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @swagger_auto_schema(
+        operation_description="Количество непрочитанных уведомлений (личные и широковещательные) из счетчика пользователя, без подсчета по списку уведомлений",
+        tags=['Notifications'],
+        responses={
+            200: openapi.Response(
+                'Количество непрочитанных',
+                openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                        'message': openapi.Schema(type=openapi.TYPE_STRING),
+                        'data': openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={'unread_count': openapi.Schema(type=openapi.TYPE_INTEGER)}
+                        ),
+                    }
+                )
+            ),
+            401: openapi.Response('Требуется авторизация')
+        },
+        security=[{'Bearer': []}]
+    )
+    def get(self, request):
+        try:
+            return Response({
+                'success': True,
+                'message': 'Количество непрочитанных уведомлений получено успешно',
+                'data': {'unread_count': get_unread_count(request.user)}
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': get_error_message('server_error'),
+                'errors': {'detail': str(e)}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
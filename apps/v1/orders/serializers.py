@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Order, OrderItem, DeliveryMethod, PaymentMethod
 from apps.v1.products.models import Product
+from apps.v1.documents.mixins import SparseFieldsetMixin
 
 
 class DeliveryMethodSerializer(serializers.ModelSerializer):
@@ -99,10 +100,18 @@ class OrderItemCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Сериализатор для чтения заказа
     """
+    EXPANDABLE_FIELDS = ('user', 'delivery_method', 'payment_method', 'items')
+    FIELD_RELATIONS = {
+        'user': {'select_related': ['user']},
+        'delivery_method': {'select_related': ['delivery_method']},
+        'payment_method': {'select_related': ['payment_method']},
+        'items': {'prefetch_related': ['items__product']},
+    }
+    
     items = OrderItemSerializer(many=True, read_only=True)
     delivery_method = serializers.SerializerMethodField()
     payment_method = serializers.SerializerMethodField()
@@ -11,14 +11,40 @@ from .serializers import (
     PaymentMethodSerializer, PaymentMethodCreateSerializer
 )
 from apps.v1.accounts.error_handlers import get_error_message
-from apps.v1.documents.mixins import PaginationMixin
+from apps.v1.documents.exports import ExportMixin, EXPORT_PARAMETERS
+from apps.v1.documents.mixins import (
+    PaginationMixin, CURSOR_PAGINATION_PARAMETERS, SPARSE_FIELDSET_PARAMETERS, CONDITIONAL_GET_PARAMETERS,
+    get_sparse_fieldset, apply_sparse_fieldset
+)
+
+# Колонки экспорта заказов (?export=csv|ndjson|xlsx)
+ORDER_EXPORT_FIELDS = (
+    ('id', 'ID'),
+    ('order_number', 'Номер заказа'),
+    ('status', 'Статус'),
+    ('total_price', 'Общая стоимость'),
+    ('city', 'Город'),
+    ('street', 'Улица'),
+    ('house', 'Дом'),
+    ('apartment', 'Квартира'),
+    ('postal_index', 'Индекс'),
+    ('delivery_method__name', 'Способ доставки'),
+    ('payment_method__name', 'Способ оплаты'),
+    ('user_id', 'ID пользователя'),
+    ('user__email', 'Email пользователя'),
+    ('created_at', 'Дата создания'),
+    ('updated_at', 'Дата обновления'),
+)
 
 
-class OrderListCreateAPIView(PaginationMixin, APIView):
+class OrderListCreateAPIView(ExportMixin, PaginationMixin, APIView):
     """
     Список и создание заказов текущего пользователя
     """
     permission_classes = [IsAuthenticated]
+    EXPORT_FIELDS = ORDER_EXPORT_FIELDS
+    EXPORT_FILENAME = 'orders'
+    ETAG_VERSION_FIELDS = ('updated_at', 'user__updated_at', 'delivery_method__updated_at', 'payment_method__updated_at', 'items__updated_at', 'items__product__updated_at')
     
     @swagger_auto_schema(
         operation_description="""
@@ -45,6 +71,14 @@ class OrderListCreateAPIView(PaginationMixin, APIView):
         - created_at, updated_at: Даты создания и обновления
         """,
         tags=['Orders'],
+        manual_parameters=[
+            openapi.Parameter('page', openapi.IN_QUERY, description='Номер страницы', type=openapi.TYPE_INTEGER, required=False),
+            openapi.Parameter('limit', openapi.IN_QUERY, description='Количество элементов на странице', type=openapi.TYPE_INTEGER, required=False),
+            *CURSOR_PAGINATION_PARAMETERS,
+            *CONDITIONAL_GET_PARAMETERS,
+            *SPARSE_FIELDSET_PARAMETERS,
+            *EXPORT_PARAMETERS,
+        ],
         responses={
             200: openapi.Response(
                 'Список заказов получен успешно',
@@ -72,10 +106,23 @@ class OrderListCreateAPIView(PaginationMixin, APIView):
                 .prefetch_related('items__product')\
                 .order_by('-created_at')
             
+            export_response = self.get_export_response(request, queryset)
+            if export_response is not None:
+                return export_response
+            
+            # fields/omit/expand - keraksiz join va prefetch'lar olib tashlanadi
+            fieldset = get_sparse_fieldset(request)
+            queryset = apply_sparse_fieldset(queryset, OrderSerializer, fieldset)
+            
+            # Conditional GET: ro'yxat o'zgarmagan bo'lsa 304 (serializatsiyasiz)
+            not_modified = self.get_list_not_modified_response(request, queryset)
+            if not_modified is not None:
+                return not_modified
+            
             # Pagination Mixin ishlatilmoqda
             orders_page, paginator = self.paginate_queryset(queryset, request)
             
-            serializer = OrderSerializer(orders_page, many=True)
+            serializer = OrderSerializer(orders_page, many=True, context={'sparse_fieldset': fieldset})
             
             return self.get_paginated_response(
                 orders_page,
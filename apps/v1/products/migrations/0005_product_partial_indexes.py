@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_category_category_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_category_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_active_deleted_idx',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['category', '-created_at'], name='product_category_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['-created_at'], name='product_live_created_idx'),
+        ),
+    ]
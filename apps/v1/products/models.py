@@ -38,9 +38,10 @@ class Product(models.Model):
         verbose_name = "Продукт"
         verbose_name_plural = "02. Продукты"
         ordering = ['-created_at']
+        # Частичные индексы только по неудаленным товарам (все списки фильтруют is_deleted=False)
         indexes = [
-            models.Index(fields=['category', '-created_at'], name='product_category_created_idx'),
-            models.Index(fields=['is_active', 'is_deleted', '-created_at'], name='product_active_deleted_idx'),
+            models.Index(fields=['category', '-created_at'], name='product_category_live_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['-created_at'], name='product_live_created_idx', condition=models.Q(is_deleted=False)),
             models.Index(fields=['article'], name='product_article_idx'),
         ]
     
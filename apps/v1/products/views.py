@@ -11,7 +11,7 @@ from .serializers import (
     ProductImageSerializer, FavoriteProductSerializer, CategorySerializer
 )
 from apps.v1.accounts.error_handlers import get_error_message
-from apps.v1.documents.mixins import PaginationMixin
+from apps.v1.documents.mixins import PaginationMixin, CURSOR_PAGINATION_PARAMETERS, CONDITIONAL_GET_PARAMETERS
 
 
 class CategoryListAPIView(APIView):
@@ -39,6 +39,7 @@ class ProductListCreateAPIView(PaginationMixin, APIView):
     """
     permission_classes = [AllowAny]
     parser_classes = [MultiPartParser, FormParser]
+    ETAG_VERSION_FIELDS = ('updated_at', 'category__updated_at', 'productimage__updated_at', 'productsizes__updated_at')
     
     @swagger_auto_schema(
         operation_description="Получение списка всех продуктов с фильтрацией по name и article, с пагинацией",
@@ -79,6 +80,8 @@ class ProductListCreateAPIView(PaginationMixin, APIView):
                 type=openapi.TYPE_INTEGER,
                 required=False
             ),
+            *CURSOR_PAGINATION_PARAMETERS,
+            *CONDITIONAL_GET_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -134,6 +137,11 @@ class ProductListCreateAPIView(PaginationMixin, APIView):
             # prefetch_related qo'shildi - N+1 query muammosini hal qilish uchun
             queryset = queryset.prefetch_related('productimage_set', 'productsizes_set')
             
+            # Conditional GET: ro'yxat o'zgarmagan bo'lsa 304 (serializatsiyasiz)
+            not_modified = self.get_list_not_modified_response(request, queryset)
+            if not_modified is not None:
+                return not_modified
+            
             # Pagination Mixin ishlatilmoqda
             products_page, paginator = self.paginate_queryset(queryset, request)
             
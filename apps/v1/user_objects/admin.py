@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserObject, UserObjectWorkers, UserObjectDocuments, UserObjectDocumentItems
+from .models import UserObject, UserObjectWorkers, UserObjectDocuments, UserObjectDocumentItems, UserObjectSummary, UserObjectEvent
 
 
 @admin.register(UserObject)
@@ -36,3 +36,20 @@ class UserObjectDocumentItemsAdmin(admin.ModelAdmin):
     search_fields = ['user_object_document__user_object__name']
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
+
+
+@admin.register(UserObjectSummary)
+class UserObjectSummaryAdmin(admin.ModelAdmin):
+    list_display = ['user_object', 'updated_at']
+    search_fields = ['user_object__name']
+    readonly_fields = ['user_object', 'workers_document', 'updated_at']
+    ordering = ['-updated_at']
+
+
+@admin.register(UserObjectEvent)
+class UserObjectEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user_object', 'type', 'actor', 'ts']
+    list_filter = ['type']
+    search_fields = ['user_object__name']
+    readonly_fields = ['user_object', 'type', 'actor', 'ts', 'payload']
+    ordering = ['-ts']
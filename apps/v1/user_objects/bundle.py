@@ -0,0 +1,447 @@
+"""
+ZIP архив всех файлов объекта, собираемый на лету
+
+Файлы объекта (документы работников, журналы и акты, счета, хранилище)
+читаются из хранилища частями и сразу пишутся в ответ - без временных
+файлов, память ограничена размером порции.
+
+Архив детерминирован: порядок записей, имена, даты и параметры сжатия
+зависят только от набора файлов (ETag). В ETag входит и время изменения
+файла в хранилище - замена файла тем же размером меняет ETag и план. Каждая запись пишется с data
+descriptor (бит 3), поэтому локальный заголовок известен до чтения файла.
+Уже сжатые форматы (изображения, видео, архивы, офисные документы, PDF)
+хранятся без сжатия (STORED), остальные - DEFLATE.
+
+Неизвестны заранее только CRC и размеры сжатых записей ("план"). Они
+сохраняются в кэше по ETag после каждой отданной записи, полный план - в
+конце отдачи. С планом размер архива и смещение любого байта вычисляются
+без чтения файлов: ответ получает Content-Length, а Range запросы (докачка)
+отдают только нужный диапазон - STORED записи читаются с seek, DEFLATE
+записи сжимаются заново (результат тот же) с пропуском начала. Если плана
+нет (первая отдача прервана), Range запрос получает весь архив (200), а
+план достраивается задачей build_object_bundle_plan - только по записям,
+которые не успели отдать.
+"""
+import logging
+import os
+import struct
+import zlib
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.v1.accounts.models import StorageFile
+from apps.v1.documents.exports import get_streaming_content
+from apps.v1.documents.mixins import make_etag, set_conditional_headers
+from apps.v1.documents.models import BillDocuments, JournalAndActDocuments
+from .models import UserObjectDocumentItems
+
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_CHUNK_SIZE = 64 * 1024
+BUNDLE_COMPRESS_LEVEL = 6
+BUNDLE_PLAN_CACHE_KEY = 'object_bundle_plan:{etag}'
+BUNDLE_PARTIAL_PLAN_CACHE_KEY = 'object_bundle_plan_partial:{etag}'
+BUNDLE_PLAN_LOCK_CACHE_KEY = 'object_bundle_plan_lock:{etag}'
+BUNDLE_PLAN_CACHE_TIMEOUT = 24 * 3600  # секунд
+BUNDLE_PLAN_LOCK_TIMEOUT = 3600  # секунд
+
+logger = logging.getLogger(__name__)
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# Форматы, которые уже сжаты: повторное сжатие тратит CPU почти без выигрыша
+STORED_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.heif',
+    '.mp3', '.m4a', '.aac', '.ogg', '.mp4', '.mov', '.avi', '.mkv', '.webm',
+    '.zip', '.rar', '.7z', '.gz', '.tgz', '.bz2', '.xz', '.zst',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.pdf',
+}
+
+# (папка в архиве, модель, поле родителя, поле файла, фильтр по объекту)
+BUNDLE_SOURCES = [
+    ('Документы объекта', UserObjectDocumentItems, 'user_object_document_id', 'document', 'user_object_document__user_object'),
+    ('Журналы и акты', JournalAndActDocuments, 'journal_and_act_id_id', 'document', 'journal_and_act_id__object_id'),
+    ('Счета', BillDocuments, 'bill_id_id', 'document', 'bill_id__object_id'),
+    ('Хранилище', StorageFile, 'storage_id', 'file', 'storage__object'),
+]
+
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP_MAX_ENTRIES = 0xFFFF
+
+BundleEntry = namedtuple('BundleEntry', 'name storage path size modified method date_time zip64')
+Bundle = namedtuple('Bundle', 'user_object entries etag')
+
+
+def _dos_date_time(value):
+    value = timezone.localtime(value) if timezone.is_aware(value) else value
+    if value.year < 1980:
+        return 0, (1 << 5) | 1
+    return (
+        (value.hour << 11) | (value.minute << 5) | (value.second // 2),
+        ((value.year - 1980) << 9) | (value.month << 5) | value.day,
+    )
+
+
+def collect_bundle_entries(user_object):
+    """
+    Файлы объекта в детерминированном порядке (источник, родитель, id)
+
+    Файлы, которых нет в хранилище, пропускаются.
+    """
+    entries = []
+    for folder, model, parent_field, file_field_name, object_lookup in BUNDLE_SOURCES:
+        storage = model._meta.get_field(file_field_name).storage
+        rows = model.objects.filter(**{object_lookup: user_object})\
+            .exclude(**{file_field_name: ''}).exclude(**{f'{file_field_name}__isnull': True})\
+            .order_by(parent_field, 'id')\
+            .values_list('id', parent_field, file_field_name, 'created_at')
+        for file_id, parent_id, path, created_at in rows:
+            try:
+                size = storage.size(path)
+            except (OSError, NotImplementedError):
+                continue
+            try:
+                modified = storage.get_modified_time(path).isoformat()
+            except (OSError, NotImplementedError):
+                modified = None
+            method = ZIP_STORED if os.path.splitext(path)[1].lower() in STORED_EXTENSIONS else ZIP_DEFLATED
+            # Худший случай DEFLATE немного больше исходного размера
+            max_compressed = size if method == ZIP_STORED else size + (size >> 8) + 64
+            entries.append(BundleEntry(
+                name=f'{folder}/{parent_id}/{file_id}_{os.path.basename(path)}',
+                storage=storage,
+                path=path,
+                size=size,
+                modified=modified,
+                method=method,
+                date_time=_dos_date_time(created_at),
+                zip64=max_compressed >= ZIP64_LIMIT,
+            ))
+    return entries
+
+
+def build_bundle(user_object):
+    entries = collect_bundle_entries(user_object)
+    etag = make_etag(
+        'bundle', BUNDLE_FORMAT_VERSION, zlib.ZLIB_RUNTIME_VERSION, BUNDLE_COMPRESS_LEVEL, user_object.pk,
+        *[(entry.name, entry.size, entry.modified, entry.method, entry.date_time) for entry in entries]
+    )
+    return Bundle(user_object, entries, etag)
+
+
+def _flags(entry):
+    # бит 3 - CRC и размеры в data descriptor, бит 11 - имя в UTF-8
+    return 0x08 | (0x800 if not entry.name.isascii() else 0)
+
+
+def _local_header(entry):
+    name = entry.name.encode()
+    extra = b''
+    version = 20
+    size_field = 0
+    if entry.zip64:
+        extra = struct.pack('<HHQQ', 0x0001, 16, 0, 0)
+        version = 45
+        size_field = ZIP64_LIMIT
+    time_field, date_field = entry.date_time
+    return struct.pack(
+        '<IHHHHHIIIHH', 0x04034b50, version, _flags(entry), entry.method, time_field, date_field,
+        0, size_field, size_field, len(name), len(extra)
+    ) + name + extra
+
+
+def _data_descriptor(entry, crc, compressed_size):
+    if entry.zip64:
+        return struct.pack('<IIQQ', 0x08074b50, crc, compressed_size, entry.size)
+    return struct.pack('<IIII', 0x08074b50, crc, compressed_size, entry.size)
+
+
+def _central_header(entry, crc, compressed_size, offset):
+    name = entry.name.encode()
+    version = 45 if entry.zip64 else 20
+    size_field, compressed_field, offset_field = entry.size, compressed_size, offset
+    extra_values = []
+    if entry.zip64:
+        extra_values += [entry.size, compressed_size]
+        size_field = compressed_field = ZIP64_LIMIT
+    if offset >= ZIP64_LIMIT:
+        extra_values.append(offset)
+        offset_field = ZIP64_LIMIT
+        version = 45
+    extra = struct.pack(f'<HH{len(extra_values)}Q', 0x0001, 8 * len(extra_values), *extra_values) if extra_values else b''
+    time_field, date_field = entry.date_time
+    return struct.pack(
+        '<IHHHHHHIIIHHHHHII', 0x02014b50, (3 << 8) | version, version, _flags(entry), entry.method,
+        time_field, date_field, crc, compressed_field, size_field, len(name), len(extra), 0, 0, 0,
+        0o100644 << 16, offset_field
+    ) + name + extra
+
+
+def _end_records(count, central_size, central_offset):
+    records = b''
+    if count >= ZIP_MAX_ENTRIES or central_size >= ZIP64_LIMIT or central_offset >= ZIP64_LIMIT:
+        zip64_offset = central_offset + central_size
+        records += struct.pack('<IQHHIIQQQQ', 0x06064b50, 44, 45, 45, 0, 0, count, count, central_size, central_offset)
+        records += struct.pack('<IIQI', 0x07064b50, 0, zip64_offset, 1)
+    return records + struct.pack(
+        '<IHHHHIIH', 0x06054b50, 0, 0, min(count, ZIP_MAX_ENTRIES), min(count, ZIP_MAX_ENTRIES),
+        min(central_size, ZIP64_LIMIT), min(central_offset, ZIP64_LIMIT), 0
+    )
+
+
+def _central_directory(entries, plan, offsets, central_offset):
+    central = b''.join(
+        _central_header(entry, crc, compressed_size, offset)
+        for entry, (crc, compressed_size), offset in zip(entries, plan, offsets)
+    )
+    return central + _end_records(len(entries), len(central), central_offset)
+
+
+def _iter_entry_data(entry, result=None):
+    """
+    Данные записи (сжатые для DEFLATE); в result добавляются (crc, сжатый размер)
+    """
+    crc = 0
+    compressed_size = 0
+    size = 0
+    compressor = zlib.compressobj(BUNDLE_COMPRESS_LEVEL, zlib.DEFLATED, -15) if entry.method == ZIP_DEFLATED else None
+    with entry.storage.open(entry.path, 'rb') as source:
+        while True:
+            chunk = source.read(BUNDLE_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            crc = zlib.crc32(chunk, crc)
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                compressed_size += len(chunk)
+                yield chunk
+    if compressor is not None:
+        chunk = compressor.flush()
+        compressed_size += len(chunk)
+        yield chunk
+    if size != entry.size:
+        raise OSError(f'Файл {entry.path} изменился во время отправки архива')
+    if result is not None:
+        result.append((crc, compressed_size))
+
+
+def _cache_key(template, bundle):
+    return template.format(etag=bundle.etag.strip('"'))
+
+
+def get_bundle_plan(bundle):
+    return cache.get(_cache_key(BUNDLE_PLAN_CACHE_KEY, bundle))
+
+
+def _save_bundle_plan(bundle, plan):
+    """
+    План после каждой записи: неполный - отдельным ключом, полный - основным
+    """
+    if len(plan) < len(bundle.entries):
+        cache.set(_cache_key(BUNDLE_PARTIAL_PLAN_CACHE_KEY, bundle), plan, BUNDLE_PLAN_CACHE_TIMEOUT)
+        return
+    cache.set(_cache_key(BUNDLE_PLAN_CACHE_KEY, bundle), plan, BUNDLE_PLAN_CACHE_TIMEOUT)
+    cache.delete(_cache_key(BUNDLE_PARTIAL_PLAN_CACHE_KEY, bundle))
+
+
+def compute_bundle_plan(bundle):
+    """
+    CRC и сжатые размеры всех записей (чтение файлов без отдачи)
+
+    Продолжает неполный план прерванной отдачи - читаются только остальные записи.
+    """
+    plan = list(cache.get(_cache_key(BUNDLE_PARTIAL_PLAN_CACHE_KEY, bundle)) or [])
+    for entry in bundle.entries[len(plan):]:
+        for _ in _iter_entry_data(entry, plan):
+            pass
+        _save_bundle_plan(bundle, plan)
+    if not bundle.entries:
+        _save_bundle_plan(bundle, plan)
+    return plan
+
+
+def schedule_bundle_plan(bundle):
+    """
+    Постановка задачи построения плана (одна задача на ETag)
+    """
+    from .tasks import build_object_bundle_plan
+
+    lock_key = _cache_key(BUNDLE_PLAN_LOCK_CACHE_KEY, bundle)
+    if not cache.add(lock_key, True, BUNDLE_PLAN_LOCK_TIMEOUT):
+        return
+    try:
+        build_object_bundle_plan.delay(bundle.user_object.pk, bundle.etag)
+    except Exception as e:
+        # Брокер недоступен - план достроится при следующей полной отдаче
+        logger.warning('Bundle plan task enqueue failed: %s', e)
+        cache.delete(lock_key)
+
+
+def iter_bundle(bundle):
+    """
+    Полный архив без плана: CRC и размеры считаются по ходу и сохраняются после каждой записи
+    """
+    plan = []
+    offsets = []
+    offset = 0
+    for entry in bundle.entries:
+        offsets.append(offset)
+        header = _local_header(entry)
+        offset += len(header)
+        yield header
+        for chunk in _iter_entry_data(entry, plan):
+            offset += len(chunk)
+            yield chunk
+        descriptor = _data_descriptor(entry, *plan[-1])
+        offset += len(descriptor)
+        yield descriptor
+        _save_bundle_plan(bundle, plan)
+    if not bundle.entries:
+        _save_bundle_plan(bundle, plan)
+    yield _central_directory(bundle.entries, plan, offsets, offset)
+
+
+def get_bundle_layout(bundle, plan):
+    """
+    Сегменты архива по плану: [(смещение, длина, bytes или запись)], общий размер
+    """
+    segments = []
+    offsets = []
+    offset = 0
+
+    def add(length, payload):
+        nonlocal offset
+        segments.append((offset, length, payload))
+        offset += length
+
+    for entry, (crc, compressed_size) in zip(bundle.entries, plan):
+        offsets.append(offset)
+        header = _local_header(entry)
+        add(len(header), header)
+        add(compressed_size, entry)
+        descriptor = _data_descriptor(entry, crc, compressed_size)
+        add(len(descriptor), descriptor)
+    central = _central_directory(bundle.entries, plan, offsets, offset)
+    add(len(central), central)
+    return segments, offset
+
+
+def _iter_entry_range(entry, skip, length):
+    if entry.method == ZIP_STORED:
+        with entry.storage.open(entry.path, 'rb') as source:
+            source.seek(skip)
+            while length > 0:
+                chunk = source.read(min(BUNDLE_CHUNK_SIZE, length))
+                if not chunk:
+                    raise OSError(f'Файл {entry.path} изменился во время отправки архива')
+                length -= len(chunk)
+                yield chunk
+        return
+    # DEFLATE: сжатие детерминировано - сжимаем заново и пропускаем начало
+    for chunk in _iter_entry_data(entry):
+        if skip >= len(chunk):
+            skip -= len(chunk)
+            continue
+        chunk = chunk[skip:skip + length]
+        skip = 0
+        length -= len(chunk)
+        yield chunk
+        if length <= 0:
+            return
+
+
+def iter_bundle_range(segments, start, end):
+    """
+    Байты архива [start, end] по сегментам плана
+    """
+    for offset, length, payload in segments:
+        if offset + length <= start or length == 0:
+            continue
+        if offset > end:
+            break
+        skip = max(start - offset, 0)
+        take = min(offset + length, end + 1) - offset - skip
+        if isinstance(payload, bytes):
+            yield payload[skip:skip + take]
+        else:
+            yield from _iter_entry_range(payload, skip, take)
+
+
+def parse_range(header, total):
+    """
+    Один диапазон из заголовка Range: (start, end), None - весь файл, False - 416
+
+    Несколько диапазонов и некорректный заголовок - весь файл (RFC 9110).
+    """
+    if not header or not header.startswith('bytes='):
+        return None
+    spec = header[len('bytes='):].strip()
+    if ',' in spec:
+        return None
+    first, separator, last = spec.partition('-')
+    if not separator:
+        return None
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                return False
+            return max(total - suffix, 0), total - 1
+        start = int(first)
+        end = int(last) if last else total - 1
+    except ValueError:
+        return None
+    if start >= total:
+        return False
+    if start < 0 or end < start:
+        return None
+    return start, min(end, total - 1)
+
+
+def get_bundle_response(request, bundle):
+    """
+    Ответ с архивом: 200 (весь архив) или 206 / 416 для Range запросов
+    """
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range.strip() != bundle.etag:
+        # If-Range с другим ETag (или датой) - архив изменился, отдаем целиком
+        range_header = None
+
+    plan = get_bundle_plan(bundle)
+    if range_header and plan is None:
+        # Без плана диапазон не вычислить, не читая все файлы в запросе -
+        # отдаем весь архив, план строит задача
+        schedule_bundle_plan(bundle)
+
+    if plan is None:
+        response = StreamingHttpResponse(get_streaming_content(request, iter_bundle(bundle)), content_type='application/zip')
+    else:
+        segments, total = get_bundle_layout(bundle, plan)
+        byte_range = parse_range(range_header, total) if range_header else None
+        if byte_range is False:
+            return Response({
+                'success': False,
+                'message': 'Запрошенный диапазон недоступен'
+            }, status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers={'Content-Range': f'bytes */{total}'})
+        start, end = byte_range or (0, total - 1)
+        response = StreamingHttpResponse(
+            get_streaming_content(request, iter_bundle_range(segments, start, end)),
+            content_type='application/zip',
+            status=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK
+        )
+        response['Content-Length'] = str(end - start + 1)
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end}/{total}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'attachment; filename="object-{bundle.user_object.pk}-documents.zip"'
+    response['X-Accel-Buffering'] = 'no'
+    return set_conditional_headers(response, bundle.etag)
@@ -0,0 +1,92 @@
+"""
+Изменения объектов пользователей и зависящие от них денормализованные данные
+
+Любое изменение UserObject - save()/delete() (через сигналы) и массовые
+update() - проходит через apply_user_object_changes: тайлы карты, агрегаты
+панели, журнал событий (STATUS_CHANGED) и кэш счетчиков профиля обновляются
+в одном месте. Новую денормализацию объекта достаточно добавить сюда.
+"""
+from django.utils import timezone
+
+from apps.v1.dashboard.models import DashboardRollup
+from apps.v1.dashboard.rollups import CLOSURE_EVENTS, ROLLUP_FIELDS, get_rollup_state, move_object_rollup_states
+from .clusters import MAP_TILE_FIELDS, get_map_state, move_map_states
+from .counters import invalidate_object_counters
+from .events import record_events, status_changed_event
+from .models import UserObjectEvent
+
+# Поля объекта, от которых зависят денормализованные данные (снимок до сохранения)
+TRACKED_FIELDS = tuple(sorted(
+    set(MAP_TILE_FIELDS) | set(ROLLUP_FIELDS[DashboardRollup.Metric.OBJECTS]) | {'user'}
+))
+
+
+def affects_tracked_fields(update_fields):
+    return update_fields is None or bool(set(TRACKED_FIELDS) & set(update_fields))
+
+
+def _is_counted(instance):
+    """
+    Учитываются ли закрытия объекта в агрегатах (объект существует и не в архиве)
+    """
+    return instance is not None and not instance.is_deleted
+
+
+def _closure_events(object_ids):
+    if not object_ids:
+        return []
+    return list(
+        UserObjectEvent.objects.filter(CLOSURE_EVENTS, user_object_id__in=object_ids).only('type', 'ts', 'payload')
+    )
+
+
+def apply_user_object_changes(changes, actor=None, now=None, events=()):
+    """
+    Применение изменений объектов: changes - список (old, new)
+
+    old - объект до изменения (None - создание), new - после (None - удаление,
+    вызывается до удаления строки, пока события объекта еще существуют).
+    Для массовых update() old - копия объекта до изменения полей. events -
+    дополнительные события операции, они пишутся одним пакетом со сменами
+    статуса.
+
+    Возвращает записанные события.
+    """
+    now = now or timezone.now()
+    changes = [(old, new) for old, new in changes if old is not None or new is not None]
+    if not changes:
+        return record_events(events)
+
+    move_map_states([
+        (get_map_state(old) if old else None, get_map_state(new) if new else None)
+        for old, new in changes
+    ])
+
+    # Закрытия считаются по событиям - как и при пересчете агрегатов. Объект,
+    # который удаляется (события удаляются каскадом) или уходит в архив,
+    # вычитает свои закрытия, восстановленный из архива - добавляет; читаем
+    # до записи новых событий
+    removed_events = _closure_events([
+        old.id for old, new in changes if _is_counted(old) and not _is_counted(new)
+    ])
+    restored_events = _closure_events([
+        new.id for old, new in changes if old is not None and not _is_counted(old) and _is_counted(new)
+    ])
+    counted_ids = {new.id for old, new in changes if _is_counted(new)}
+
+    events = list(events) + [
+        status_changed_event(new.id, old.status, new.status, actor, now)
+        for old, new in changes
+        if old is not None and new is not None and old.status != new.status
+    ]
+    record_events(events)
+
+    move_object_rollup_states([
+        (get_rollup_state(DashboardRollup.Metric.OBJECTS, old), get_rollup_state(DashboardRollup.Metric.OBJECTS, new))
+        for old, new in changes
+    ], restored_events + [event for event in events if event.user_object_id in counted_ids], removed_events)
+
+    object_ids = [new.id for old, new in changes if new is not None]
+    user_ids = [old.user_id for old, new in changes if old is not None]
+    invalidate_object_counters(object_ids, user_ids)
+    return events
@@ -0,0 +1,277 @@
+"""
+Кластеризация объектов на карте по уровню масштаба
+
+Карта делится на тайлы web-mercator. Кластер для масштаба zoom - тайл
+уровня zoom + CLUSTER_CELL_SHIFT (4x4 кластера на тайл карты 256px).
+Для администраторов агрегаты берутся из UserObjectMapTile (обновляется
+инкрементально при создании, перемещении, смене статуса и удалении
+объекта), для остальных ролей считаются на лету по их объектам.
+"""
+import math
+from collections import defaultdict
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+
+from .geo import filter_bbox
+from .models import UserObject, UserObjectMapTile
+
+MAX_CLUSTER_ZOOM = 16
+CLUSTER_CELL_SHIFT = 2
+TILE_ZOOMS = range(CLUSTER_CELL_SHIFT, MAX_CLUSTER_ZOOM + CLUSTER_CELL_SHIFT + 1)
+
+MAX_MERCATOR_LATITUDE = 85.05112878
+
+# Поля объекта, от которых зависит вклад в тайлы
+MAP_TILE_FIELDS = ('latitude', 'longitude', 'status', 'is_deleted')
+
+# Строк в одном INSERT ... ON CONFLICT
+MAP_TILE_UPSERT_BATCH = 500
+
+
+def get_tile(latitude, longitude, zoom):
+    """
+    Тайл web-mercator (x, y), содержащий точку
+    """
+    latitude = max(-MAX_MERCATOR_LATITUDE, min(MAX_MERCATOR_LATITUDE, float(latitude)))
+    scale = 2 ** zoom
+    x = int((float(longitude) + 180.0) / 360.0 * scale)
+    lat_rad = math.radians(latitude)
+    y = int((1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * scale)
+    return min(max(x, 0), scale - 1), min(max(y, 0), scale - 1)
+
+
+def get_tile_bbox(tile_x, tile_y, zoom):
+    """
+    Границы тайла: (min_lat, min_lon, max_lat, max_lon)
+    """
+    scale = 2 ** zoom
+    
+    def tile_latitude(y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / scale))))
+    
+    return (
+        tile_latitude(tile_y + 1), tile_x / scale * 360.0 - 180.0,
+        tile_latitude(tile_y), (tile_x + 1) / scale * 360.0 - 180.0,
+    )
+
+
+def get_map_state(user_object):
+    """
+    Вклад объекта в тайлы: (latitude, longitude, status) или None
+    """
+    if user_object.is_deleted or user_object.latitude is None or user_object.longitude is None:
+        return None
+    return float(user_object.latitude), float(user_object.longitude), user_object.status or ''
+
+
+def _add_state_deltas(deltas, state, sign):
+    if state is None:
+        return
+    latitude, longitude, status = state
+    for zoom in TILE_ZOOMS:
+        tile_x, tile_y = get_tile(latitude, longitude, zoom)
+        delta = deltas[(zoom, tile_x, tile_y, status)]
+        delta[0] += sign
+        delta[1] += sign * latitude
+        delta[2] += sign * longitude
+
+
+def _upsert_map_tile_deltas(rows):
+    """
+    PostgreSQL / SQLite: все дельты одним INSERT ... ON CONFLICT DO UPDATE на пакет
+    
+    Строки отсортированы по ключу тайла - параллельные транзакции блокируют
+    тайлы в одном порядке и не ждут друг друга по кругу. Отрицательная дельта
+    для отсутствующего тайла (расхождение) создает строку с count <= 0 -
+    она удаляется вместе с опустевшими тайлами (_delete_empty_map_tiles).
+    """
+    quote = connection.ops.quote_name
+    table = quote(UserObjectMapTile._meta.db_table)
+    key_columns = ', '.join(quote(column) for column in ('zoom', 'tile_x', 'tile_y', 'status'))
+    value_columns = ('count', 'latitude_sum', 'longitude_sum')
+    updates = ', '.join(f'{quote(column)} = {table}.{quote(column)} + EXCLUDED.{quote(column)}' for column in value_columns)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), MAP_TILE_UPSERT_BATCH):
+            batch = rows[start:start + MAP_TILE_UPSERT_BATCH]
+            placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(batch))
+            cursor.execute(
+                f'INSERT INTO {table} ({key_columns}, {", ".join(quote(column) for column in value_columns)}) '
+                f'VALUES {placeholders} ON CONFLICT ({key_columns}) DO UPDATE SET {updates}',
+                [value for row in batch for value in row]
+            )
+
+
+def _update_map_tile_deltas(rows):
+    """
+    Остальные БД: UPDATE тайла, при отсутствии - INSERT
+    """
+    for zoom, tile_x, tile_y, status, count, latitude_sum, longitude_sum in rows:
+        lookup = {'zoom': zoom, 'tile_x': tile_x, 'tile_y': tile_y, 'status': status}
+        update = {
+            'count': F('count') + count,
+            'latitude_sum': F('latitude_sum') + latitude_sum,
+            'longitude_sum': F('longitude_sum') + longitude_sum,
+        }
+        # Отсутствующий тайл с отрицательной дельтой не создаем
+        if UserObjectMapTile.objects.filter(**lookup).update(**update) or count <= 0:
+            continue
+        try:
+            with transaction.atomic():
+                UserObjectMapTile.objects.create(count=count, latitude_sum=latitude_sum, longitude_sum=longitude_sum, **lookup)
+        except IntegrityError:
+            # Тайл создан параллельно
+            UserObjectMapTile.objects.filter(**lookup).update(**update)
+
+
+def _delete_empty_map_tiles(keys):
+    """
+    Удаление тайлов, в которых не осталось объектов (после отрицательных дельт)
+    """
+    for start in range(0, len(keys), MAP_TILE_UPSERT_BATCH):
+        condition = Q()
+        for zoom, tile_x, tile_y, status in keys[start:start + MAP_TILE_UPSERT_BATCH]:
+            condition |= Q(zoom=zoom, tile_x=tile_x, tile_y=tile_y, status=status)
+        UserObjectMapTile.objects.filter(condition, count__lte=0).delete()
+
+
+def apply_map_tile_deltas(deltas):
+    """
+    Применение накопленных изменений {(zoom, x, y, status): [count, lat_sum, lon_sum]}
+    """
+    rows = sorted(
+        (zoom, tile_x, tile_y, status, count, latitude_sum, longitude_sum)
+        for (zoom, tile_x, tile_y, status), (count, latitude_sum, longitude_sum) in deltas.items()
+        if count or latitude_sum or longitude_sum
+    )
+    if not rows:
+        return
+    if connection.vendor in ('postgresql', 'sqlite'):
+        _upsert_map_tile_deltas(rows)
+    else:
+        _update_map_tile_deltas(rows)
+    # Тайлы могли опустеть только от отрицательной дельты
+    _delete_empty_map_tiles([row[:4] for row in rows if row[4] < 0])
+
+
+def move_map_states(changes):
+    """
+    Перенос вклада объектов в тайлах: changes - список (old_state, new_state)
+    
+    Изменения нескольких объектов в одном тайле суммируются и применяются
+    одним INSERT ... ON CONFLICT на пакет тайлов.
+    """
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    for old_state, new_state in changes:
+        if old_state == new_state:
+            continue
+        _add_state_deltas(deltas, old_state, -1)
+        _add_state_deltas(deltas, new_state, 1)
+    apply_map_tile_deltas(deltas)
+
+
+def rebuild_map_tiles(batch_size=2000):
+    """
+    Полный пересчет UserObjectMapTile
+    """
+    aggregates = defaultdict(lambda: [0, 0.0, 0.0])
+    queryset = UserObject.objects.filter(
+        is_deleted=False, latitude__isnull=False, longitude__isnull=False
+    ).values_list('latitude', 'longitude', 'status')
+    for latitude, longitude, status in queryset.iterator(chunk_size=batch_size):
+        latitude, longitude = float(latitude), float(longitude)
+        for zoom in TILE_ZOOMS:
+            tile_x, tile_y = get_tile(latitude, longitude, zoom)
+            aggregate = aggregates[(zoom, tile_x, tile_y, status or '')]
+            aggregate[0] += 1
+            aggregate[1] += latitude
+            aggregate[2] += longitude
+    
+    with transaction.atomic():
+        UserObjectMapTile.objects.all().delete()
+        UserObjectMapTile.objects.bulk_create([
+            UserObjectMapTile(
+                zoom=zoom, tile_x=tile_x, tile_y=tile_y, status=status,
+                count=count, latitude_sum=latitude_sum, longitude_sum=longitude_sum
+            )
+            for (zoom, tile_x, tile_y, status), (count, latitude_sum, longitude_sum) in aggregates.items()
+        ], batch_size=batch_size)
+    return len(aggregates)
+
+
+def _tile_ranges(min_lat, min_lon, max_lat, max_lon, zoom):
+    """
+    Диапазоны тайлов (x_from, x_to, y_from, y_to) для области карты
+    """
+    boxes = [(min_lon, 180.0), (-180.0, max_lon)] if min_lon > max_lon else [(min_lon, max_lon)]
+    ranges = []
+    for box_min_lon, box_max_lon in boxes:
+        x_from, y_from = get_tile(max_lat, box_min_lon, zoom)
+        x_to, y_to = get_tile(min_lat, box_max_lon, zoom)
+        ranges.append((x_from, x_to, y_from, y_to))
+    return ranges
+
+
+def _make_cluster(zoom, tile_x, tile_y, count, latitude_sum, longitude_sum, statuses):
+    min_lat, min_lon, max_lat, max_lon = get_tile_bbox(tile_x, tile_y, zoom)
+    return {
+        'latitude': round(latitude_sum / count, 6),
+        'longitude': round(longitude_sum / count, 6),
+        'count': count,
+        'statuses': statuses,
+        'bbox': {
+            'min_lat': round(min_lat, 6), 'min_lon': round(min_lon, 6),
+            'max_lat': round(max_lat, 6), 'max_lon': round(max_lon, 6),
+        },
+    }
+
+
+def _group_clusters(rows, zoom):
+    """
+    rows: (tile_x, tile_y, status, count, latitude_sum, longitude_sum)
+    """
+    clusters = {}
+    for tile_x, tile_y, status, count, latitude_sum, longitude_sum in rows:
+        cluster = clusters.setdefault((tile_x, tile_y), [0, 0.0, 0.0, {}])
+        cluster[0] += count
+        cluster[1] += latitude_sum
+        cluster[2] += longitude_sum
+        cluster[3][status] = cluster[3].get(status, 0) + count
+    return [
+        _make_cluster(zoom, tile_x, tile_y, count, latitude_sum, longitude_sum, statuses)
+        for (tile_x, tile_y), (count, latitude_sum, longitude_sum, statuses) in sorted(clusters.items())
+        if count > 0
+    ]
+
+
+def get_tile_clusters(zoom, min_lat, min_lon, max_lat, max_lon):
+    """
+    Кластеры всех объектов из предрасчитанных тайлов
+    """
+    tile_zoom = zoom + CLUSTER_CELL_SHIFT
+    rows = []
+    for x_from, x_to, y_from, y_to in _tile_ranges(min_lat, min_lon, max_lat, max_lon, tile_zoom):
+        rows.extend(
+            UserObjectMapTile.objects.filter(
+                zoom=tile_zoom,
+                tile_x__gte=x_from, tile_x__lte=x_to,
+                tile_y__gte=y_from, tile_y__lte=y_to,
+                count__gt=0
+            ).values_list('tile_x', 'tile_y', 'status', 'count', 'latitude_sum', 'longitude_sum')
+        )
+    return _group_clusters(rows, tile_zoom)
+
+
+def get_queryset_clusters(queryset, zoom, min_lat, min_lon, max_lat, max_lon):
+    """
+    Кластеры объектов queryset, посчитанные на лету
+    """
+    tile_zoom = zoom + CLUSTER_CELL_SHIFT
+    queryset = filter_bbox(queryset, min_lat, min_lon, max_lat, max_lon)\
+        .values_list('latitude', 'longitude', 'status')
+    rows = []
+    for latitude, longitude, status in queryset.iterator():
+        latitude, longitude = float(latitude), float(longitude)
+        tile_x, tile_y = get_tile(latitude, longitude, tile_zoom)
+        rows.append((tile_x, tile_y, status or '', 1, latitude, longitude))
+    return _group_clusters(rows, tile_zoom)
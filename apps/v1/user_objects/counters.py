@@ -0,0 +1,124 @@
+"""
+Счетчики профиля (active_applications, completed_this_month) с кэшем на пользователя
+
+Определения одинаковы для всех ролей и совпадают с панелью администратора:
+active_applications - неудаленные объекты в активных статусах,
+completed_this_month - закрытия неудаленных объектов за текущий месяц, т.е.
+события STATUS_CHANGED из открытого статуса в completed/cancelled
+(CLOSURE_EVENTS, как метрика objects_closed). "За текущий месяц" -
+полуоткрытый диапазон [начало месяца, начало следующего) по индексу
+(user_object, ts). Счетчики администратора общие для всех администраторов
+и берутся из агрегатов панели, остальных - из их объектов. Результат
+хранится в кэше: ключ содержит месяц, кэш сбрасывается при изменении
+объектов и работников (invalidate_object_counters / invalidate_user_counters).
+"""
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from apps.v1.accounts.roles import get_user_roles, ROLE_ADMIN, ROLE_CUSTOMER
+from apps.v1.dashboard.models import DashboardRollup
+from apps.v1.dashboard.rollups import ACTIVE_OBJECT_STATUSES, CLOSED_OBJECT_STATUSES, CLOSURE_EVENTS, TOTAL_PERIOD_START
+from .models import UserObject, UserObjectEvent, UserObjectWorkers
+
+USER_COUNTERS_CACHE_KEY = 'profile_counters:{user_id}:{month}'
+ADMIN_COUNTERS_CACHE_KEY = 'profile_counters:admin:{month}'
+COUNTERS_CACHE_TIMEOUT = 300  # секунд
+
+
+def get_month_range(now=None):
+    """
+    Текущий месяц как полуоткрытый диапазон [start, end) в локальной таймзоне
+    """
+    today = timezone.localdate(now)
+    month_start = today.replace(day=1)
+    next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return (
+        timezone.make_aware(datetime.combine(month_start, time.min)),
+        timezone.make_aware(datetime.combine(next_month, time.min)),
+    )
+
+
+def _month_key(month_start):
+    return month_start.strftime('%Y%m')
+
+
+def _compute_admin_counters(month_start):
+    Metric, Period = DashboardRollup.Metric, DashboardRollup.Period
+    active = Q(metric=Metric.OBJECTS, period=Period.TOTAL, period_start=TOTAL_PERIOD_START, status__in=ACTIVE_OBJECT_STATUSES)
+    completed = Q(metric=Metric.OBJECTS_CLOSED, period=Period.MONTH, period_start=timezone.localdate(month_start), status__in=CLOSED_OBJECT_STATUSES)
+    counters = DashboardRollup.objects.filter(active | completed).aggregate(
+        active_applications=Sum('count', filter=active),
+        completed_this_month=Sum('count', filter=completed),
+    )
+    return {key: value or 0 for key, value in counters.items()}
+
+
+def _compute_user_counters(user, is_customer, month_start, month_end):
+    if is_customer:
+        objects = Q(user_id=user.pk)
+    else:
+        objects = Q(user_object_workers__user_id=user.pk)
+    closures = UserObjectEvent.objects.filter(
+        CLOSURE_EVENTS,
+        user_object__in=UserObject.objects.filter(objects, is_deleted=False).values('pk'),
+        ts__gte=month_start,
+        ts__lt=month_end,
+    )
+    return {
+        'active_applications': UserObject.objects.filter(
+            objects, is_deleted=False, status__in=ACTIVE_OBJECT_STATUSES
+        ).count(),
+        'completed_this_month': closures.count(),
+    }
+
+
+def get_profile_counters(user):
+    """
+    Счетчики профиля пользователя: {'active_applications', 'completed_this_month'}
+    """
+    month_start, month_end = get_month_range()
+    month = _month_key(month_start)
+    roles = get_user_roles(user)
+
+    if ROLE_ADMIN in roles:
+        cache_key = ADMIN_COUNTERS_CACHE_KEY.format(month=month)
+    else:
+        cache_key = USER_COUNTERS_CACHE_KEY.format(user_id=user.pk, month=month)
+
+    counters = cache.get(cache_key)
+    if counters is None:
+        if ROLE_ADMIN in roles:
+            counters = _compute_admin_counters(month_start)
+        else:
+            counters = _compute_user_counters(user, ROLE_CUSTOMER in roles, month_start, month_end)
+        cache.set(cache_key, counters, COUNTERS_CACHE_TIMEOUT)
+    return counters
+
+
+def invalidate_user_counters(user_ids):
+    """
+    Сброс кэша счетчиков указанных пользователей и общего кэша администраторов
+
+    Выполняется после коммита транзакции, чтобы параллельный запрос не
+    закэшировал старые значения.
+    """
+    month = _month_key(get_month_range()[0])
+    keys = [USER_COUNTERS_CACHE_KEY.format(user_id=user_id, month=month) for user_id in set(user_ids)]
+    keys.append(ADMIN_COUNTERS_CACHE_KEY.format(month=month))
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_object_counters(object_ids, user_ids=()):
+    """
+    Сброс счетчиков владельцев и работников объектов (и дополнительных user_ids)
+    """
+    object_ids = list(object_ids)
+    user_ids = set(user_ids)
+    if object_ids:
+        user_ids.update(UserObject.objects.filter(id__in=object_ids).values_list('user_id', flat=True))
+        user_ids.update(UserObjectWorkers.objects.filter(user_object_id__in=object_ids).values_list('user_id', flat=True))
+    invalidate_user_counters(user_ids)
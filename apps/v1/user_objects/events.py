@@ -0,0 +1,60 @@
+"""
+Журнал событий объектов пользователей (UserObjectEvent)
+
+События только добавляются. Все события одной операции записываются одним
+bulk_create: массовое назначение работников или смена статуса многих
+объектов - один INSERT на пакет, а не строка за строкой.
+
+Смена статуса через save() записывается сигналом post_save (STATUS_CHANGED),
+поэтому вызывающему коду достаточно указать автора - set_event_actor.
+"""
+from django.utils import timezone
+
+from .models import UserObjectEvent
+
+EVENT_BATCH_SIZE = 500
+
+
+def make_event(user_object_id, event_type, actor=None, payload=None, ts=None):
+    """
+    Событие объекта (без записи в БД)
+    """
+    return UserObjectEvent(
+        user_object_id=user_object_id,
+        type=event_type,
+        actor_id=getattr(actor, 'pk', actor),
+        ts=ts or timezone.now(),
+        payload=payload or {},
+    )
+
+
+def record_events(events, batch_size=EVENT_BATCH_SIZE):
+    """
+    Пакетная запись событий
+    """
+    events = list(events)
+    if events:
+        UserObjectEvent.objects.bulk_create(events, batch_size=batch_size)
+    return events
+
+
+def set_event_actor(instance, actor):
+    """
+    Автор событий, которые сигналы запишут при следующем save() объекта
+    """
+    instance._event_actor = actor
+    return instance
+
+
+def status_changed_event(user_object_id, old_status, new_status, actor=None, ts=None):
+    return make_event(
+        user_object_id, UserObjectEvent.Type.STATUS_CHANGED, actor,
+        {'old': old_status, 'new': new_status}, ts
+    )
+
+
+def worker_added_event(user_object_id, worker_id, actor=None, ts=None):
+    return make_event(
+        user_object_id, UserObjectEvent.Type.WORKER_ADDED, actor,
+        {'worker_id': worker_id}, ts
+    )
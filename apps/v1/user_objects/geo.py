@@ -0,0 +1,193 @@
+"""
+Геопоиск объектов пользователей без PostGIS
+
+Для каждого объекта хранится geohash координат (UserObject.geohash, индекс
+uo_geohash_idx). Ячейка geohash длины p - прямоугольник, и все точки внутри
+него имеют общий префикс длины p, поэтому поиск по области сводится к
+нескольким диапазонным сканированиям индекса (geohash LIKE 'prefix%'),
+после чего кандидаты точно фильтруются по широте/долготе.
+"""
+import math
+from decimal import Decimal
+
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+
+GEOHASH_PRECISION = 9  # ~5 м
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Максимум ячеек geohash, на которые разбивается область поиска
+GEO_MAX_BBOX_CELLS = 32
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Кандидатов ближайшего поиска на один шаг (k * множитель), отбираются в SQL
+NEAREST_CANDIDATES_FACTOR = 4
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """
+    Geohash точки. Для пустых координат возвращает None
+    """
+    if latitude is None or longitude is None:
+        return None
+    
+    latitude, longitude = float(latitude), float(longitude)
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, value, even = 0, 0, True
+    while len(chars) < precision:
+        coordinate, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if coordinate >= middle:
+            value = (value << 1) | 1
+            bounds[0] = middle
+        else:
+            value <<= 1
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def get_cell_size(precision):
+    """
+    Размер ячейки geohash в градусах (lat_step, lon_step)
+    """
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def _cell_steps(start, end, step, lower):
+    """
+    Центры ячеек сетки с шагом step, пересекающих отрезок [start, end]
+    """
+    first = math.floor((start - lower) / step)
+    last = math.floor((end - lower) / step)
+    return [lower + (index + 0.5) * step for index in range(first, last + 1)]
+
+
+def get_bbox_prefixes(min_lat, min_lon, max_lat, max_lon, max_cells=GEO_MAX_BBOX_CELLS):
+    """
+    Префиксы geohash, покрывающие прямоугольник (min_lon <= max_lon)
+    
+    Выбирается наибольшая точность, при которой число ячеек не превышает
+    max_cells. Пустой список - область слишком большая, префиксы не помогут.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lon_step = get_cell_size(precision)
+        lat_centers = _cell_steps(min_lat, min(max_lat, 90.0 - 1e-9), lat_step, -90.0)
+        lon_centers = _cell_steps(min_lon, min(max_lon, 180.0 - 1e-9), lon_step, -180.0)
+        if len(lat_centers) * len(lon_centers) <= max_cells:
+            return sorted({
+                encode_geohash(lat, lon, precision)
+                for lat in lat_centers
+                for lon in lon_centers
+            })
+    return []
+
+
+def _prefixes_q(prefixes):
+    query = Q()
+    for prefix in prefixes:
+        query |= Q(geohash__startswith=prefix)
+    return query
+
+
+def filter_bbox(queryset, min_lat, min_lon, max_lat, max_lon):
+    """
+    Объекты внутри прямоугольника. min_lon > max_lon - область через 180-й меридиан
+    """
+    if min_lon > max_lon:
+        boxes = [(min_lon, 180.0), (-180.0, max_lon)]
+    else:
+        boxes = [(min_lon, max_lon)]
+    
+    query = Q()
+    for box_min_lon, box_max_lon in boxes:
+        box_query = Q(
+            latitude__gte=Decimal(str(min_lat)), latitude__lte=Decimal(str(max_lat)),
+            longitude__gte=Decimal(str(box_min_lon)), longitude__lte=Decimal(str(box_max_lon)),
+        )
+        prefixes = get_bbox_prefixes(min_lat, box_min_lon, max_lat, box_max_lon)
+        if prefixes:
+            box_query &= _prefixes_q(prefixes)
+        query |= box_query
+    return queryset.filter(query)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (float(lat1), float(lon1), float(lat2), float(lon2)))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _neighbour_prefixes(latitude, longitude, precision):
+    """
+    Ячейка точки и 8 соседних ячеек
+    """
+    lat_step, lon_step = get_cell_size(precision)
+    prefixes = set()
+    for lat_offset in (-1, 0, 1):
+        lat = latitude + lat_offset * lat_step
+        if not -90.0 <= lat <= 90.0:
+            continue
+        for lon_offset in (-1, 0, 1):
+            lon = (longitude + lon_offset * lon_step + 180.0) % 360.0 - 180.0
+            prefixes.add(encode_geohash(lat, lon, precision))
+    return sorted(prefixes)
+
+
+def _covered_radius_km(latitude, precision):
+    """
+    Радиус, гарантированно покрытый блоком 3x3 ячеек вокруг точки
+    """
+    lat_step, lon_step = get_cell_size(precision)
+    lat_km = lat_step * math.pi / 180 * EARTH_RADIUS_KM
+    lon_km = lon_step * math.pi / 180 * EARTH_RADIUS_KM * math.cos(math.radians(min(abs(latitude) + lat_step, 90.0)))
+    return min(lat_km, lon_km)
+
+
+def _approx_distance(latitude, longitude):
+    """
+    Квадрат расстояния в градусах (равнопромежуточная проекция) - для сортировки в SQL
+    """
+    scale = Decimal(str(round(math.cos(math.radians(latitude)), 9)))
+    lat_delta = F('latitude') - Value(Decimal(str(latitude)))
+    lon_delta = (F('longitude') - Value(Decimal(str(longitude)))) * Value(scale)
+    return ExpressionWrapper(lat_delta * lat_delta + lon_delta * lon_delta, output_field=FloatField())
+
+
+def find_nearest(queryset, latitude, longitude, k):
+    """
+    k ближайших к точке объектов: список (объект, расстояние_км)
+    
+    Поиск начинается с мелких ячеек вокруг точки и расширяется, пока k-й
+    найденный объект не окажется ближе гарантированно покрытого радиуса.
+    На каждом шаге (и в запасном поиске по всем объектам) БД сортирует по
+    приближенному расстоянию и возвращает не больше k * NEAREST_CANDIDATES_FACTOR
+    строк, точное расстояние считается только для них.
+    """
+    limit = k * NEAREST_CANDIDATES_FACTOR
+    queryset = queryset.filter(geohash__isnull=False)\
+        .annotate(approx_distance=_approx_distance(latitude, longitude))\
+        .order_by('approx_distance', 'pk')
+    
+    def ranked(candidates):
+        result = [
+            (user_object, haversine_km(latitude, longitude, user_object.latitude, user_object.longitude))
+            for user_object in candidates[:limit]
+        ]
+        result.sort(key=lambda item: (item[1], item[0].pk))
+        return result
+    
+    for precision in range(GEOHASH_PRECISION - 2, 0, -1):
+        candidates = ranked(queryset.filter(_prefixes_q(_neighbour_prefixes(latitude, longitude, precision))))
+        if len(candidates) >= k and candidates[k - 1][1] <= _covered_radius_km(latitude, precision):
+            return candidates[:k]
+    
+    # Объектов мало или они далеко - ближайшие по всем объектам (с тем же ограничением)
+    return ranked(queryset)[:k]
@@ -0,0 +1,96 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+
+from apps.v1.accounts.models import CustomUser
+from apps.v1.documents.exports import EXPORT_FORMATS, stream_export
+from apps.v1.user_objects.models import UserObject
+from apps.v1.user_objects.views import USER_OBJECT_EXPORT_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк потокового экспорта объектов (CSV / NDJSON / XLSX): время и пиковая память'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Количество объектов')
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Размер пакета при создании')
+        parser.add_argument('--formats', default=','.join(EXPORT_FORMATS), help='Форматы через запятую')
+        parser.add_argument('--memory', action='store_true', help='Дополнительный проход с tracemalloc (пиковая память, заметно медленнее)')
+
+    def handle(self, *args, **options):
+        formats = [export_format.strip() for export_format in options['formats'].split(',') if export_format.strip()]
+        rows = options['rows']
+
+        # Все тестовые данные создаются в транзакции и откатываются в конце
+        with transaction.atomic():
+            started = time.perf_counter()
+            owner = self._create_fixture(rows, options['batch_size'])
+            self.stdout.write(f'Создано {rows} объектов за {time.perf_counter() - started:.1f} с')
+
+            # Пиковая память на 10% и 100% строк должна быть одинаковой
+            sizes = sorted({max(rows // 10, 1), rows})
+            self.stdout.write(f"{'format':>7} {'rows':>9} {'seconds':>8} {'rows/s':>9} {'MB out':>8} {'peak MB':>8}")
+            for export_format in formats:
+                for size in sizes:
+                    queryset = UserObject.objects.filter(user=owner).order_by('id')[:size]
+                    seconds, size_bytes = self._measure(queryset, export_format)
+                    peak = '-'
+                    if options['memory']:
+                        peak = f'{self._measure_memory(queryset, export_format) / 1024 / 1024:.1f}'
+                    self.stdout.write(
+                        f'{export_format:>7} {size:>9} {seconds:>8.1f} {size / seconds:>9.0f} '
+                        f'{size_bytes / 1024 / 1024:>8.1f} {peak:>8}'
+                    )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершен, тестовые данные удалены'))
+
+    def _consume(self, queryset, export_format):
+        request = RequestFactory().get('/', {'export': export_format})
+        response = stream_export(request, queryset, USER_OBJECT_EXPORT_FIELDS, export_format, 'objects')
+        return sum(len(chunk) for chunk in response.streaming_content)
+
+    def _measure(self, queryset, export_format):
+        """
+        Полное чтение ответа: время (с) и размер (байт)
+        """
+        started = time.perf_counter()
+        size_bytes = self._consume(queryset, export_format)
+        return time.perf_counter() - started, size_bytes
+
+    def _measure_memory(self, queryset, export_format):
+        """
+        Пиковая память Python (байт) при полном чтении ответа
+        """
+        tracemalloc.start()
+        try:
+            self._consume(queryset, export_format)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def _create_fixture(self, rows, batch_size):
+        owner = CustomUser.objects.create(email='bench-export@example.com', username='bench-export')
+        statuses = [choice for choice, _ in UserObject.Status.choices]
+        for offset in range(0, rows, batch_size):
+            UserObject.objects.bulk_create([
+                UserObject(
+                    user=owner,
+                    name=f'Объект {index}',
+                    address=f'ул. Ленина, д. {index % 300}',
+                    latitude=41.3 + index % 1000 / 10000,
+                    longitude=69.2 + index % 1000 / 10000,
+                    size=index % 5000,
+                    number_of_fire_extinguishing_systems=index % 20,
+                    status=statuses[index % len(statuses)],
+                )
+                for index in range(offset, min(offset + batch_size, rows))
+            ])
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE user_objects_userobject')
+        return owner
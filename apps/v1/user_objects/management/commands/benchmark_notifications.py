@@ -0,0 +1,105 @@
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.v1.accounts.models import CustomUser
+from apps.v1.accounts.roles import ROLE_ADMIN, ROLE_CUSTOMER
+from apps.v1.notification.models import Notification
+from apps.v1.notification.services import ROLE_GROUPS, NotificationDispatcher, build_notification_event, get_admin_ids
+from apps.v1.user_objects.models import UserObject
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк рассылки уведомления о новом объекте всем администраторам: по одному против NotificationDispatcher и широковещательной группы роли'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--admins', type=int, default=500, help='Количество администраторов')
+        parser.add_argument('--repeat', type=int, default=5, help='Повторов каждого варианта')
+
+    def handle(self, *args, **options):
+        channel_layer = get_channel_layer()
+        # Все тестовые данные создаются в транзакции и откатываются в конце
+        with transaction.atomic():
+            creator, admin_ids = self._create_fixture(options['admins'])
+            # У каждого администратора одно подключение - group_send реально доставляет сообщение
+            if channel_layer:
+                for admin_id in admin_ids:
+                    async_to_sync(channel_layer.group_add)(f'user_{admin_id}', f'bench.{admin_id}')
+                    async_to_sync(channel_layer.group_add)(ROLE_GROUPS[ROLE_ADMIN], f'bench.{admin_id}')
+            user_object = UserObject.objects.create(user=creator, name='Объект', latitude=41.3, longitude=69.2)
+
+            variants = {
+                'per recipient': lambda: self._legacy_fan_out(admin_ids, creator, user_object),
+                'dispatcher': lambda: NotificationDispatcher().add(
+                    get_admin_ids(), 'Новый объект', 'object_created', actor=creator, user_object=user_object
+                ).dispatch(),
+                'broadcast': lambda: NotificationDispatcher().broadcast(
+                    ROLE_ADMIN, 'Новый объект', 'object_created', actor=creator, user_object=user_object
+                ).dispatch(),
+                'object create': lambda: UserObject.objects.create(user=creator, name='Объект', latitude=41.3, longitude=69.2),
+            }
+
+            self.stdout.write(f"{'variant':>14} {'admins':>7} {'avg ms':>8} {'queries':>8}")
+            for name, run in variants.items():
+                seconds, queries = self._measure(run, options['repeat'], channel_layer)
+                self.stdout.write(f'{name:>14} {len(admin_ids):>7} {seconds * 1000:>8.1f} {queries:>8}')
+
+            transaction.set_rollback(True)
+
+        if channel_layer and hasattr(channel_layer, 'flush'):
+            async_to_sync(channel_layer.flush)()
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершен, тестовые данные удалены'))
+
+    def _legacy_fan_out(self, admin_ids, actor, user_object):
+        """
+        Прежняя схема: create + async_to_sync(group_send) на каждого получателя
+        """
+        channel_layer = get_channel_layer()
+        for admin in CustomUser.objects.filter(id__in=admin_ids):
+            notification = Notification.objects.create(
+                recipient=admin,
+                actor=actor,
+                verb='object_created',
+                message='Новый объект',
+                user_object=user_object,
+                category='user_object'
+            )
+            if channel_layer:
+                async_to_sync(channel_layer.group_send)(f'user_{admin.id}', build_notification_event(notification))
+
+    def _measure(self, run, repeat, channel_layer):
+        """
+        Среднее время (с) и количество SQL запросов одного вызова
+        """
+        total = 0
+        queries = 0
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                run()
+                total += time.perf_counter() - started
+            queries = len(context.captured_queries)
+            # Очередь каналов in-memory ограничена - очищаем между повторами
+            if channel_layer and hasattr(channel_layer, 'flush'):
+                async_to_sync(channel_layer.flush)()
+        return total / repeat, queries
+
+    def _create_fixture(self, admins):
+        admin_group = Group.objects.get_or_create(name=ROLE_ADMIN)[0]
+        customer_group = Group.objects.get_or_create(name=ROLE_CUSTOMER)[0]
+        creator = CustomUser.objects.create(email='bench-notify@example.com', username='bench-notify')
+        creator.groups.add(customer_group)
+        users = CustomUser.objects.bulk_create([
+            CustomUser(email=f'bench-admin-{index}@example.com', username=f'bench-admin-{index}')
+            for index in range(admins)
+        ])
+        CustomUser.groups.through.objects.bulk_create([
+            CustomUser.groups.through(customuser_id=user.id, group_id=admin_group.id)
+            for user in users
+        ])
+        return creator, get_admin_ids()
@@ -0,0 +1,157 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from apps.v1.accounts.models import CustomUser
+from apps.v1.products.models import Product
+from apps.v1.user_objects.models import UserObject
+
+# Полные составные индексы до перехода на частичные (WHERE is_deleted = ...)
+LEGACY_INDEXES = {
+    UserObject: [
+        models.Index(fields=['user', '-created_at'], name='uo_user_created_idx'),
+        models.Index(fields=['status', '-created_at'], name='uo_status_created_idx'),
+        models.Index(fields=['is_deleted', '-created_at'], name='uo_deleted_created_idx'),
+    ],
+    Product: [
+        models.Index(fields=['category', '-created_at'], name='product_category_created_idx'),
+        models.Index(fields=['is_active', 'is_deleted', '-created_at'], name='product_active_deleted_idx'),
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк основных списков: частичные индексы (is_deleted) против полных составных'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000, help='Количество объектов')
+        parser.add_argument('--products', type=int, default=50_000, help='Количество товаров')
+        parser.add_argument('--owners', type=int, default=20, help='Количество заказчиков')
+        parser.add_argument('--deleted-ratio', type=float, default=0.5, help='Доля удаленных строк')
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Размер пакета при создании')
+        parser.add_argument('--repeat', type=int, default=5, help='Повторов каждого запроса')
+
+    def handle(self, *args, **options):
+        # Все тестовые данные и изменения индексов откатываются в конце
+        with transaction.atomic():
+            started = time.perf_counter()
+            owner = self._create_fixture(options)
+            self.stdout.write(
+                f"Создано {options['rows']} объектов и {options['products']} товаров "
+                f"за {time.perf_counter() - started:.1f} с (удалено {options['deleted_ratio']:.0%})"
+            )
+
+            queries = {
+                'all active': lambda: UserObject.objects.filter(is_deleted=False),
+                'customer active': lambda: UserObject.objects.filter(user=owner, is_deleted=False),
+                'status active': lambda: UserObject.objects.filter(status=UserObject.Status.ACTIVE, is_deleted=False),
+                'customer archive': lambda: UserObject.objects.filter(user=owner, is_deleted=True).order_by('-deleted_at', '-pk'),
+                'products': lambda: Product.objects.filter(is_deleted=False),
+            }
+
+            partial = {name: self._measure(build, options['repeat']) for name, build in queries.items()}
+            partial_size = self._index_size()
+
+            with transaction.atomic():
+                self._swap_to_legacy_indexes()
+                legacy = {name: self._measure(build, options['repeat']) for name, build in queries.items()}
+                legacy_size = self._index_size()
+                transaction.set_rollback(True)
+
+            self.stdout.write(f"{'query':>18} {'full idx ms':>12} {'partial ms':>11} {'rows':>8}")
+            for name in queries:
+                legacy_ms, count = legacy[name]
+                partial_ms, partial_count = partial[name]
+                if count != partial_count:
+                    self.stderr.write(f'Результаты различаются: {count} != {partial_count}')
+                self.stdout.write(f"{name:>18} {legacy_ms:>12.1f} {partial_ms:>11.1f} {count:>8}")
+            if partial_size is not None:
+                self.stdout.write(f'Размер индексов: {legacy_size / 1024:.0f} KB -> {partial_size / 1024:.0f} KB')
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершен, тестовые данные удалены'))
+
+    def _measure(self, build_queryset, repeat):
+        """
+        Среднее время (мс) получения первой страницы (50 строк) и количества строк
+        """
+        total = 0.0
+        count = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset = build_queryset()
+            list(queryset[:50])
+            count = queryset.count()
+            total += time.perf_counter() - started
+        return total / repeat * 1000, count
+
+    def _swap_to_legacy_indexes(self):
+        """
+        Замена частичных индексов на прежние полные (внутри транзакции)
+        """
+        schema_editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model, legacy_indexes in LEGACY_INDEXES.items():
+                for index in model._meta.indexes:
+                    if index.condition is not None:
+                        cursor.execute(schema_editor.sql_delete_index % {
+                            'table': schema_editor.quote_name(model._meta.db_table),
+                            'name': schema_editor.quote_name(index.name),
+                        })
+                for index in legacy_indexes:
+                    cursor.execute(str(index.create_sql(model, schema_editor)))
+        self._analyze()
+
+    def _index_size(self):
+        """
+        Суммарный размер индексов таблиц объектов и товаров (только PostgreSQL)
+        """
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_indexes_size(%s) + pg_indexes_size(%s)',
+                [UserObject._meta.db_table, Product._meta.db_table]
+            )
+            return cursor.fetchone()[0]
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            for model in LEGACY_INDEXES:
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+    def _create_fixture(self, options):
+        rnd = random.Random(42)
+        owners = [
+            CustomUser.objects.create(email=f'bench-archive-{index}@example.com', username=f'bench-archive-{index}')
+            for index in range(max(options['owners'], 1))
+        ]
+        statuses = [choice for choice, _ in UserObject.Status.choices]
+        now = timezone.now()
+
+        def user_objects(start, stop):
+            for index in range(start, stop):
+                is_deleted = rnd.random() < options['deleted_ratio']
+                yield UserObject(
+                    user=rnd.choice(owners),
+                    name=f'Объект {index}',
+                    status=rnd.choice(statuses),
+                    is_deleted=is_deleted,
+                    deleted_at=now - timedelta(minutes=index) if is_deleted else None,
+                )
+
+        def products(start, stop):
+            for index in range(start, stop):
+                yield Product(name=f'Товар {index}', is_deleted=rnd.random() < options['deleted_ratio'])
+
+        for build, rows in ((user_objects, options['rows']), (products, options['products'])):
+            for offset in range(0, rows, options['batch_size']):
+                objects = list(build(offset, min(offset + options['batch_size'], rows)))
+                type(objects[0]).objects.bulk_create(objects)
+        self._analyze()
+        return owners[0]
@@ -0,0 +1,89 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.v1.accounts.models import CustomUser
+from apps.v1.user_objects.models import UserObject
+from apps.v1.user_objects.search import refresh_search_grams, search_user_objects, uses_pg_trgm
+
+NAME_WORDS = ['Склад', 'Офис', 'Торговый центр', 'Завод', 'Школа', 'Больница', 'Гостиница', 'Котельная', 'Паркинг', 'Библиотека']
+STREET_WORDS = ['Ленина', 'Пушкина', 'Гагарина', 'Советская', 'Мира', 'Садовая', 'Лесная', 'Школьная', 'Набережная', 'Заводская']
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк поиска объектов: icontains без индекса против trigram поиска'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Количество объектов')
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Размер пакета при создании')
+        parser.add_argument('--queries', default='Гагарина,торговый,Склад 4242', help='Поисковые строки через запятую')
+        parser.add_argument('--repeat', type=int, default=3, help='Повторов каждого запроса')
+
+    def handle(self, *args, **options):
+        queries = [query.strip() for query in options['queries'].split(',') if query.strip()]
+        backend = 'pg_trgm' if uses_pg_trgm() else 'n-gram table'
+
+        # Все тестовые данные создаются в транзакции и откатываются в конце
+        with transaction.atomic():
+            started = time.perf_counter()
+            self._create_fixture(options['rows'], options['batch_size'])
+            self.stdout.write(f"Создано {options['rows']} объектов за {time.perf_counter() - started:.1f} с (backend: {backend})")
+
+            self.stdout.write(f"{'field':>8} {'query':>20} {'icontains ms':>13} {'search ms':>10} {'rows':>8}")
+            for query in queries:
+                for field_name in ('name', 'address'):
+                    baseline_ms, baseline_count = self._measure(
+                        lambda: UserObject.objects.filter(**{f'{field_name}__icontains': query}),
+                        options['repeat'],
+                        without_indexes=True
+                    )
+                    search_ms, search_count = self._measure(
+                        lambda: search_user_objects(UserObject.objects.all(), **{field_name: query}),
+                        options['repeat']
+                    )
+                    if baseline_count != search_count:
+                        self.stderr.write(f'Результаты различаются: {baseline_count} != {search_count}')
+                    self.stdout.write(f"{field_name:>8} {query[:20]:>20} {baseline_ms:>13.1f} {search_ms:>10.1f} {search_count:>8}")
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершен, тестовые данные удалены'))
+
+    def _measure(self, build_queryset, repeat, without_indexes=False):
+        """
+        Среднее время (мс) получения первой страницы (50 строк) и количества совпадений
+        """
+        with transaction.atomic():
+            if without_indexes and connection.vendor == 'postgresql':
+                # Текущее поведение: последовательное сканирование
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_bitmapscan = off')
+                    cursor.execute('SET LOCAL enable_indexscan = off')
+            total = 0.0
+            count = 0
+            for _ in range(repeat):
+                started = time.perf_counter()
+                queryset = build_queryset()
+                list(queryset[:50])
+                count = queryset.count()
+                total += time.perf_counter() - started
+        return total / repeat * 1000, count
+
+    def _create_fixture(self, rows, batch_size):
+        owner = CustomUser.objects.create(email='bench-search@example.com', username='bench-search')
+        rnd = random.Random(42)
+        for offset in range(0, rows, batch_size):
+            user_objects = UserObject.objects.bulk_create([
+                UserObject(
+                    user=owner,
+                    name=f'{rnd.choice(NAME_WORDS)} {index}',
+                    address=f'ул. {rnd.choice(STREET_WORDS)}, д. {rnd.randint(1, 300)}'
+                )
+                for index in range(offset, min(offset + batch_size, rows))
+            ])
+            refresh_search_grams(user_objects)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE user_objects_userobject')
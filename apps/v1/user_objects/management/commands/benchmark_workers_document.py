@@ -0,0 +1,84 @@
+import time
+
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.v1.accounts.models import CustomUser
+from apps.v1.user_objects.models import (
+    UserObject, UserObjectWorkers, UserObjectDocuments, UserObjectDocumentItems
+)
+from apps.v1.user_objects.serializers import UserObjectSerializer
+from apps.v1.accounts.roles import WORKER_ROLES
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк построения workers_document для страниц списка объектов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-sizes', default='10,25,50,100', help='Размеры страниц через запятую')
+        parser.add_argument('--workers', type=int, default=5, help='Работников на объект')
+        parser.add_argument('--documents', type=int, default=2, help='Документов на работника')
+
+    def handle(self, *args, **options):
+        page_sizes = [int(size) for size in options['page_sizes'].split(',')]
+
+        # Все тестовые данные создаются в транзакции и откатываются в конце
+        with transaction.atomic():
+            object_ids = self._create_fixture(max(page_sizes), options['workers'], options['documents'])
+
+            self.stdout.write(f"{'page':>6} {'per-object q':>14} {'per-object ms':>14} {'bulk q':>8} {'bulk ms':>9}")
+            for page_size in page_sizes:
+                page = list(UserObject.objects.filter(id__in=object_ids[:page_size]).select_related('user'))
+
+                with CaptureQueriesContext(connection) as single_ctx:
+                    started = time.perf_counter()
+                    for user_object in page:
+                        UserObjectSerializer(user_object).data
+                    single_ms = (time.perf_counter() - started) * 1000
+
+                with CaptureQueriesContext(connection) as bulk_ctx:
+                    started = time.perf_counter()
+                    UserObjectSerializer(page, many=True).data
+                    bulk_ms = (time.perf_counter() - started) * 1000
+
+                self.stdout.write(
+                    f"{page_size:>6} {len(single_ctx.captured_queries):>14} {single_ms:>14.1f} "
+                    f"{len(bulk_ctx.captured_queries):>8} {bulk_ms:>9.1f}"
+                )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершен, тестовые данные удалены'))
+
+    def _create_fixture(self, objects_count, workers_per_object, documents_per_worker):
+        owner = CustomUser.objects.create(email='bench-owner@example.com', username='bench-owner')
+        groups = [Group.objects.get_or_create(name=role)[0] for role in WORKER_ROLES]
+
+        workers = []
+        for index in range(workers_per_object):
+            worker = CustomUser.objects.create(email=f'bench-worker-{index}@example.com', username=f'bench-worker-{index}')
+            worker.groups.add(groups[index % len(groups)])
+            workers.append(worker)
+
+        user_objects = UserObject.objects.bulk_create([
+            UserObject(user=owner, name=f'Bench object {index}', address='Bench address')
+            for index in range(objects_count)
+        ])
+        UserObjectWorkers.objects.bulk_create([
+            UserObjectWorkers(user_object=user_object, user=worker)
+            for user_object in user_objects
+            for worker in workers
+        ])
+        documents = UserObjectDocuments.objects.bulk_create([
+            UserObjectDocuments(user_object=user_object, user=worker, comment='bench')
+            for user_object in user_objects
+            for worker in workers
+            for _ in range(documents_per_worker)
+        ])
+        UserObjectDocumentItems.objects.bulk_create([
+            UserObjectDocumentItems(user_object_document=document, document='user_objects/documents/bench.pdf')
+            for document in documents
+        ])
+        return [user_object.id for user_object in user_objects]
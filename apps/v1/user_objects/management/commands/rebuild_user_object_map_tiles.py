@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.v1.user_objects.clusters import rebuild_map_tiles
+
+
+class Command(BaseCommand):
+    help = 'Полная пересборка тайлов карты объектов (кластеризация)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Размер пакета чтения и записи')
+
+    def handle(self, *args, **options):
+        tiles = rebuild_map_tiles(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Тайлы пересобраны: {tiles}'))
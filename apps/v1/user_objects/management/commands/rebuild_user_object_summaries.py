@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from apps.v1.user_objects.models import UserObject
+from apps.v1.user_objects.summary import refresh_user_object_summaries
+
+
+class Command(BaseCommand):
+    help = 'Полная пересборка сводок workers_document для всех объектов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Количество объектов в одном пакете')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        object_ids = UserObject.objects.order_by('id').values_list('id', flat=True)
+
+        rebuilt = 0
+        batch = []
+        for object_id in object_ids.iterator(chunk_size=batch_size):
+            batch.append(object_id)
+            if len(batch) >= batch_size:
+                refresh_user_object_summaries(batch)
+                rebuilt += len(batch)
+                batch = []
+        if batch:
+            refresh_user_object_summaries(batch)
+            rebuilt += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Сводки пересобраны: {rebuilt}'))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_objects', '0004_userobject_uo_user_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserObjectSummary',
+            fields=[
+                ('user_object', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='user_objects.userobject')),
+                ('workers_document', models.JSONField(default=dict, verbose_name='Работники и документы')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Сводка объекта пользователя',
+                'verbose_name_plural': '05. Сводки объектов пользователей',
+            },
+        ),
+    ]
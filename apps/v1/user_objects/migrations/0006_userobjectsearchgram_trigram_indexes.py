@@ -0,0 +1,96 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:49
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TRGM_INDEXES = {
+    'uo_name_trgm_idx': 'name',
+    'uo_address_trgm_idx': 'address',
+}
+
+
+# Копия search.make_grams / search.get_words_grams на момент миграции:
+# изменения search.py не должны менять результат исторической миграции
+_WORD_SPLIT_RE = re.compile(r'\W+')
+
+
+def make_grams(text):
+    text = (text or '').lower()
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def get_words_grams(text):
+    grams = make_grams(text)
+    for word in _WORD_SPLIT_RE.split((text or '').lower()):
+        grams |= make_grams(f'  {word} ')
+    return grams
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    PostgreSQL: pg_trgm GIN индексы по UPPER(field) - именно это выражение
+    Django использует для icontains
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, column in TRGM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON user_objects_userobject '
+            f'USING gin (UPPER({column}::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name in TRGM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+def fill_search_grams(apps, schema_editor):
+    """
+    Другие БД: заполнение таблицы триграмм для существующих объектов
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        return
+    UserObject = apps.get_model('user_objects', 'UserObject')
+    UserObjectSearchGram = apps.get_model('user_objects', 'UserObjectSearchGram')
+    fields = {'name': 1, 'address': 2}
+    grams = []
+    for user_object in UserObject.objects.only('id', 'name', 'address').iterator():
+        for field_name, field in fields.items():
+            for gram in get_words_grams(getattr(user_object, field_name)):
+                grams.append(UserObjectSearchGram(user_object_id=user_object.id, field=field, gram=gram))
+        if len(grams) >= 5000:
+            UserObjectSearchGram.objects.bulk_create(grams)
+            grams = []
+    UserObjectSearchGram.objects.bulk_create(grams)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_objects', '0005_userobjectsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserObjectSearchGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.PositiveSmallIntegerField(choices=[(1, 'Название'), (2, 'Адрес')], verbose_name='Поле')),
+                ('gram', models.CharField(max_length=3, verbose_name='Триграмма')),
+                ('user_object', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_grams', to='user_objects.userobject')),
+            ],
+            options={
+                'verbose_name': 'Триграмма объекта пользователя',
+                'verbose_name_plural': '06. Триграммы объектов пользователей',
+                'indexes': [models.Index(fields=['field', 'gram', 'user_object'], name='uosg_field_gram_obj_idx')],
+            },
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+        migrations.RunPython(fill_search_grams, migrations.RunPython.noop),
+    ]
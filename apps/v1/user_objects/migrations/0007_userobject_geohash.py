@@ -0,0 +1,69 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Копия geo.encode_geohash на момент миграции: изменения geo.py
+# не должны менять результат исторической миграции
+GEOHASH_PRECISION = 9
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    if latitude is None or longitude is None:
+        return None
+    
+    latitude, longitude = float(latitude), float(longitude)
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, value, even = 0, 0, True
+    while len(chars) < precision:
+        coordinate, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if coordinate >= middle:
+            value = (value << 1) | 1
+            bounds[0] = middle
+        else:
+            value <<= 1
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def fill_geohash(apps, schema_editor):
+    UserObject = apps.get_model('user_objects', 'UserObject')
+    user_objects = []
+    queryset = UserObject.objects.filter(latitude__isnull=False, longitude__isnull=False)\
+        .only('id', 'latitude', 'longitude')
+    for user_object in queryset.iterator():
+        user_object.geohash = encode_geohash(user_object.latitude, user_object.longitude)
+        user_objects.append(user_object)
+        if len(user_objects) >= 1000:
+            UserObject.objects.bulk_update(user_objects, ['geohash'])
+            user_objects = []
+    UserObject.objects.bulk_update(user_objects, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_objects', '0006_userobjectsearchgram_trigram_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userobject',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12, null=True, verbose_name='Geohash координат'),
+        ),
+        migrations.AddIndex(
+            model_name='userobject',
+            index=models.Index(fields=['geohash'], name='uo_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(fill_geohash, migrations.RunPython.noop),
+    ]
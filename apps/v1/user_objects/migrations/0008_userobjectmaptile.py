@@ -0,0 +1,72 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:57
+
+import math
+from collections import defaultdict
+
+from django.db import migrations, models
+
+# Копия clusters.TILE_ZOOMS / clusters.get_tile на момент миграции:
+# изменения clusters.py не должны менять результат исторической миграции
+TILE_ZOOMS = range(2, 19)
+MAX_MERCATOR_LATITUDE = 85.05112878
+
+
+def get_tile(latitude, longitude, zoom):
+    latitude = max(-MAX_MERCATOR_LATITUDE, min(MAX_MERCATOR_LATITUDE, float(latitude)))
+    scale = 2 ** zoom
+    x = int((float(longitude) + 180.0) / 360.0 * scale)
+    lat_rad = math.radians(latitude)
+    y = int((1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * scale)
+    return min(max(x, 0), scale - 1), min(max(y, 0), scale - 1)
+
+
+def fill_map_tiles(apps, schema_editor):
+    UserObject = apps.get_model('user_objects', 'UserObject')
+    UserObjectMapTile = apps.get_model('user_objects', 'UserObjectMapTile')
+    aggregates = defaultdict(lambda: [0, 0.0, 0.0])
+    queryset = UserObject.objects.filter(is_deleted=False, latitude__isnull=False, longitude__isnull=False)\
+        .values_list('latitude', 'longitude', 'status')
+    for latitude, longitude, status in queryset.iterator():
+        latitude, longitude = float(latitude), float(longitude)
+        for zoom in TILE_ZOOMS:
+            tile_x, tile_y = get_tile(latitude, longitude, zoom)
+            aggregate = aggregates[(zoom, tile_x, tile_y, status or '')]
+            aggregate[0] += 1
+            aggregate[1] += latitude
+            aggregate[2] += longitude
+    UserObjectMapTile.objects.bulk_create([
+        UserObjectMapTile(
+            zoom=zoom, tile_x=tile_x, tile_y=tile_y, status=status,
+            count=count, latitude_sum=latitude_sum, longitude_sum=longitude_sum
+        )
+        for (zoom, tile_x, tile_y, status), (count, latitude_sum, longitude_sum) in aggregates.items()
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_objects', '0007_userobject_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserObjectMapTile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.PositiveSmallIntegerField(verbose_name='Уровень тайла')),
+                ('tile_x', models.PositiveIntegerField(verbose_name='Тайл X')),
+                ('tile_y', models.PositiveIntegerField(verbose_name='Тайл Y')),
+                ('status', models.CharField(blank=True, default='', max_length=255, verbose_name='Статус объекта')),
+                ('count', models.IntegerField(default=0, verbose_name='Кол-во объектов')),
+                ('latitude_sum', models.FloatField(default=0, verbose_name='Сумма широт')),
+                ('longitude_sum', models.FloatField(default=0, verbose_name='Сумма долгот')),
+            ],
+            options={
+                'verbose_name': 'Тайл карты объектов',
+                'verbose_name_plural': '07. Тайлы карты объектов',
+                'constraints': [models.UniqueConstraint(fields=('zoom', 'tile_x', 'tile_y', 'status'), name='uomt_tile_status_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_map_tiles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:59
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_workers(apps, schema_editor):
+    """
+    Оставляем самую раннюю запись (user_object, user); is_finished сохраняется,
+    если хотя бы один дубликат был завершен
+    """
+    UserObjectWorkers = apps.get_model('user_objects', 'UserObjectWorkers')
+    duplicates = UserObjectWorkers.objects.values('user_object_id', 'user_id')\
+        .annotate(rows=Count('id'), keep_id=Min('id'))\
+        .filter(rows__gt=1)
+    for duplicate in list(duplicates):
+        rows = UserObjectWorkers.objects.filter(
+            user_object_id=duplicate['user_object_id'],
+            user_id=duplicate['user_id']
+        )
+        if rows.filter(is_finished=True).exists():
+            rows.filter(id=duplicate['keep_id']).update(is_finished=True)
+        rows.exclude(id=duplicate['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_objects', '0008_userobjectmaptile'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_workers, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='userobjectworkers',
+            name='uow_obj_user_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='userobjectworkers',
+            constraint=models.UniqueConstraint(fields=('user_object', 'user'), name='uow_obj_user_uniq'),
+        ),
+    ]
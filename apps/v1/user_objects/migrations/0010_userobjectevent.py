@@ -0,0 +1,67 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_events(apps, schema_editor):
+    """
+    Начальная лента из существующих данных: создание объектов, работники, документы
+
+    История смены статусов не сохранялась: закрытые объекты получают одно
+    событие закрытия (STATUS_CHANGED из неизвестного статуса) на момент
+    последнего изменения, иначе счетчики закрытий после обновления обнулятся.
+    """
+    UserObject = apps.get_model('user_objects', 'UserObject')
+    UserObjectWorkers = apps.get_model('user_objects', 'UserObjectWorkers')
+    UserObjectDocuments = apps.get_model('user_objects', 'UserObjectDocuments')
+    UserObjectEvent = apps.get_model('user_objects', 'UserObjectEvent')
+    
+    def batches():
+        for object_id, user_id, created_at in UserObject.objects.values_list('id', 'user_id', 'created_at').iterator():
+            yield UserObjectEvent(user_object_id=object_id, type=1, actor_id=user_id, ts=created_at, payload={})
+        for object_id, user_id, created_at in UserObjectWorkers.objects.values_list('user_object_id', 'user_id', 'created_at').iterator():
+            yield UserObjectEvent(user_object_id=object_id, type=3, ts=created_at, payload={'worker_id': user_id})
+        for document_id, object_id, user_id, created_at in UserObjectDocuments.objects.values_list('id', 'user_object_id', 'user_id', 'created_at').iterator():
+            yield UserObjectEvent(user_object_id=object_id, type=4, actor_id=user_id, ts=created_at, payload={'document_id': document_id})
+        closed = UserObject.objects.filter(status__in=['completed', 'cancelled'])
+        for object_id, status, updated_at in closed.values_list('id', 'status', 'updated_at').iterator():
+            yield UserObjectEvent(user_object_id=object_id, type=2, ts=updated_at, payload={'old': None, 'new': status})
+    
+    batch = []
+    for event in batches():
+        batch.append(event)
+        if len(batch) >= 1000:
+            UserObjectEvent.objects.bulk_create(batch)
+            batch = []
+    UserObjectEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_objects', '0009_userobjectworkers_unique_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserObjectEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.PositiveSmallIntegerField(choices=[(1, 'Объект создан'), (2, 'Статус изменен'), (3, 'Работник назначен'), (4, 'Документ загружен')], verbose_name='Тип события')),
+                ('ts', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время события')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Данные события')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Инициатор')),
+                ('user_object', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='user_objects.userobject')),
+            ],
+            options={
+                'verbose_name': 'Событие объекта',
+                'verbose_name_plural': '08. События объектов',
+                'indexes': [models.Index(fields=['user_object', 'ts'], name='uoe_obj_ts_idx')],
+            },
+        ),
+        migrations.RunPython(fill_events, migrations.RunPython.noop),
+    ]
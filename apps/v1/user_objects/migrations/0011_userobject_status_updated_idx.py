@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_objects', '0010_userobjectevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userobject',
+            index=models.Index(fields=['status', 'updated_at'], name='uo_status_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:14
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_deleted_at(apps, schema_editor):
+    # Точное время удаления не сохранялось - берем время последнего изменения
+    UserObject = apps.get_model('user_objects', 'UserObject')
+    UserObject.objects.filter(is_deleted=True).update(deleted_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_objects', '0011_userobject_status_updated_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='userobject',
+            name='uo_user_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userobject',
+            name='uo_status_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userobject',
+            name='uo_deleted_created_idx',
+        ),
+        migrations.AddField(
+            model_name='userobject',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата удаления'),
+        ),
+        migrations.RunPython(fill_deleted_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='userobject',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', '-created_at'], name='uo_user_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userobject',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['status', '-created_at'], name='uo_status_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userobject',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['-created_at'], name='uo_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userobject',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['user', '-deleted_at'], name='uo_user_archived_idx'),
+        ),
+    ]
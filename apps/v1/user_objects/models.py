@@ -1,5 +1,7 @@
 from django.db import models
+from django.utils import timezone
 from apps.v1.accounts.models import CustomUser
+from .geo import encode_geohash
 
 
 class UserObject(models.Model):
@@ -15,10 +17,12 @@ class UserObject(models.Model):
     address = models.CharField(max_length=255, verbose_name='Адрес объекта', null=True, blank=True)
     latitude = models.DecimalField(max_digits=10, decimal_places=8, verbose_name='Широта', null=True, blank=True)
     longitude = models.DecimalField(max_digits=10, decimal_places=8, verbose_name='Долгота', null=True, blank=True)
+    geohash = models.CharField(max_length=12, verbose_name='Geohash координат', null=True, blank=True, editable=False)
     size = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Размер', null=True, blank=True)
     number_of_fire_extinguishing_systems = models.IntegerField(verbose_name='Кол-во систем пожаротушения', null=True, blank=True)
     status = models.CharField(max_length=255, verbose_name='Статус объекта', null=True, blank=True, choices=Status.choices, default=Status.ACTIVE)
     is_deleted = models.BooleanField(default=False, verbose_name='Удален')
+    deleted_at = models.DateTimeField(verbose_name='Дата удаления', null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
     
@@ -28,12 +32,34 @@ class UserObject(models.Model):
         verbose_name = 'Объект пользователя'
         verbose_name_plural = '01. Объекты пользователей'
         ordering = ['-created_at']
+        # Частичные индексы: активные объекты и архив индексируются отдельно,
+        # удаленные строки не попадают в индексы основных списков
         indexes = [
-            models.Index(fields=['user', '-created_at'], name='uo_user_created_idx'),
-            models.Index(fields=['status', '-created_at'], name='uo_status_created_idx'),
-            models.Index(fields=['is_deleted', '-created_at'], name='uo_deleted_created_idx'),
+            models.Index(fields=['user', '-created_at'], name='uo_user_active_created_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['status', '-created_at'], name='uo_status_active_created_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['status', 'updated_at'], name='uo_status_updated_idx'),
+            models.Index(fields=['-created_at'], name='uo_active_created_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['user', '-deleted_at'], name='uo_user_archived_idx', condition=models.Q(is_deleted=True)),
+            models.Index(fields=['geohash'], name='uo_geohash_idx', opclasses=['varchar_pattern_ops']),
         ]
         
+    def save(self, *args, **kwargs):
+        # geohash пересчитывается вместе с координатами (см. geo.py)
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+        # deleted_at следует за is_deleted (сортировка архива)
+        if not self.is_deleted:
+            self.deleted_at = None
+        elif self.deleted_at is None:
+            self.deleted_at = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            if {'latitude', 'longitude'} & set(update_fields):
+                update_fields = set(update_fields) | {'geohash'}
+            if 'is_deleted' in update_fields:
+                update_fields = set(update_fields) | {'deleted_at'}
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return self.name
     
@@ -51,9 +77,11 @@ class UserObjectWorkers(models.Model):
         verbose_name = 'Работник объекта пользователя'
         verbose_name_plural = '02. Работники объектов пользователей'
         indexes = [
-            models.Index(fields=['user_object', 'user'], name='uow_obj_user_idx'),
             models.Index(fields=['is_finished'], name='uow_finished_idx'),
         ]
+        constraints = [
+            models.UniqueConstraint(fields=['user_object', 'user'], name='uow_obj_user_uniq'),
+        ]
 
 
 class UserObjectDocuments(models.Model):
@@ -84,4 +112,99 @@ class UserObjectDocumentItems(models.Model):
     
     class Meta:
         verbose_name = 'Элемент документа объекта пользователя'
-        verbose_name_plural = '04. Элементы документов объектов пользователей'
\ No newline at end of file
+        verbose_name_plural = '04. Элементы документов объектов пользователей'
+
+
+class UserObjectSummary(models.Model):
+    """
+    Денормализованная сводка по работникам и документам объекта (workers_document).
+    Поддерживается сигналами, пересобирается командой rebuild_user_object_summaries.
+    """
+    user_object = models.OneToOneField(UserObject, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    workers_document = models.JSONField(default=dict, verbose_name='Работники и документы')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
+    
+    objects = models.Manager()
+    
+    class Meta:
+        verbose_name = 'Сводка объекта пользователя'
+        verbose_name_plural = '05. Сводки объектов пользователей'
+
+
+class UserObjectSearchGram(models.Model):
+    """
+    N-gram индекс name/address для поиска на БД без pg_trgm.
+    На PostgreSQL не заполняется - используются GIN индексы pg_trgm (см. search.py).
+    """
+    class Field(models.IntegerChoices):
+        NAME = 1, 'Название'
+        ADDRESS = 2, 'Адрес'
+    
+    user_object = models.ForeignKey(UserObject, on_delete=models.CASCADE, related_name='search_grams')
+    field = models.PositiveSmallIntegerField(choices=Field.choices, verbose_name='Поле')
+    gram = models.CharField(max_length=3, verbose_name='Триграмма')
+    
+    objects = models.Manager()
+    
+    class Meta:
+        verbose_name = 'Триграмма объекта пользователя'
+        verbose_name_plural = '06. Триграммы объектов пользователей'
+        indexes = [
+            models.Index(fields=['field', 'gram', 'user_object'], name='uosg_field_gram_obj_idx'),
+        ]
+
+
+class UserObjectMapTile(models.Model):
+    """
+    Предрасчитанные агрегаты объектов по тайлам карты (для кластеризации).
+    Одна строка - тайл (zoom, tile_x, tile_y) и статус; поддерживается
+    инкрементально сигналами, пересобирается командой rebuild_user_object_map_tiles.
+    """
+    zoom = models.PositiveSmallIntegerField(verbose_name='Уровень тайла')
+    tile_x = models.PositiveIntegerField(verbose_name='Тайл X')
+    tile_y = models.PositiveIntegerField(verbose_name='Тайл Y')
+    status = models.CharField(max_length=255, blank=True, default='', verbose_name='Статус объекта')
+    count = models.IntegerField(default=0, verbose_name='Кол-во объектов')
+    latitude_sum = models.FloatField(default=0, verbose_name='Сумма широт')
+    longitude_sum = models.FloatField(default=0, verbose_name='Сумма долгот')
+    
+    objects = models.Manager()
+    
+    class Meta:
+        verbose_name = 'Тайл карты объектов'
+        verbose_name_plural = '07. Тайлы карты объектов'
+        constraints = [
+            models.UniqueConstraint(fields=['zoom', 'tile_x', 'tile_y', 'status'], name='uomt_tile_status_uniq'),
+        ]
+
+
+class UserObjectEvent(models.Model):
+    """
+    Журнал событий объекта (только добавление): смена статуса, назначение
+    работников, загрузка документов. Пишется пакетно (см. events.py),
+    лента объекта читается по индексу (user_object, ts) курсором.
+    """
+    class Type(models.IntegerChoices):
+        CREATED = 1, 'Объект создан'
+        STATUS_CHANGED = 2, 'Статус изменен'
+        WORKER_ADDED = 3, 'Работник назначен'
+        DOCUMENT_UPLOADED = 4, 'Документ загружен'
+    
+    # Отдельный индекс по user_object не нужен - его покрывает uoe_obj_ts_idx
+    user_object = models.ForeignKey(UserObject, on_delete=models.CASCADE, related_name='events', db_index=False)
+    type = models.PositiveSmallIntegerField(choices=Type.choices, verbose_name='Тип события')
+    actor = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, related_name='+', null=True, blank=True, verbose_name='Инициатор')
+    ts = models.DateTimeField(default=timezone.now, verbose_name='Время события')
+    payload = models.JSONField(default=dict, blank=True, verbose_name='Данные события')
+    
+    objects = models.Manager()
+    
+    class Meta:
+        verbose_name = 'Событие объекта'
+        verbose_name_plural = '08. События объектов'
+        indexes = [
+            models.Index(fields=['user_object', 'ts'], name='uoe_obj_ts_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_type_display()} - {self.user_object_id}"
@@ -0,0 +1,115 @@
+"""
+Поиск объектов пользователей по name/address
+
+PostgreSQL: GIN индексы pg_trgm по UPPER(name) и UPPER(address) (миграция 0006),
+поэтому фильтр icontains использует индекс, а результаты ранжируются по
+TrigramSimilarity.
+
+Другие БД: таблица UserObjectSearchGram (триграммы каждого поля). Кандидаты
+выбираются по совпадению всех триграмм запроса, затем проверяются icontains;
+ранг - доля триграмм поля, совпавших с запросом.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Count, F, FloatField, Value
+from django.db.models.functions import Cast, Greatest, Length
+
+from .models import UserObjectSearchGram
+
+SEARCH_FIELDS = {
+    'name': UserObjectSearchGram.Field.NAME,
+    'address': UserObjectSearchGram.Field.ADDRESS,
+}
+
+_WORD_SPLIT_RE = re.compile(r'\W+')
+
+
+def uses_pg_trgm():
+    return connection.vendor == 'postgresql'
+
+
+def make_grams(text):
+    """
+    Триграммы строки (без учета регистра)
+    """
+    text = (text or '').lower()
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def get_words_grams(text):
+    """
+    Триграммы для индекса: по словам, как в pg_trgm, плюс триграммы всей строки
+    (чтобы запросы через пробел тоже находили кандидатов)
+    """
+    grams = make_grams(text)
+    for word in _WORD_SPLIT_RE.split((text or '').lower()):
+        grams |= make_grams(f'  {word} ')
+    return grams
+
+
+def refresh_search_grams(user_objects):
+    """
+    Пересборка триграмм для списка объектов (только для БД без pg_trgm)
+    """
+    if uses_pg_trgm():
+        return
+    
+    user_objects = list(user_objects)
+    if not user_objects:
+        return
+    
+    UserObjectSearchGram.objects.filter(user_object__in=user_objects).delete()
+    UserObjectSearchGram.objects.bulk_create([
+        UserObjectSearchGram(user_object_id=user_object.pk, field=field, gram=gram)
+        for user_object in user_objects
+        for field_name, field in SEARCH_FIELDS.items()
+        for gram in get_words_grams(getattr(user_object, field_name))
+    ], batch_size=1000)
+
+
+def _gram_search(queryset, field_name, value):
+    field = SEARCH_FIELDS[field_name]
+    query_grams = make_grams(value)
+    queryset = queryset.filter(**{f'{field_name}__icontains': value})
+    if not query_grams:
+        # Слишком короткий запрос - индекс не помогает
+        return queryset, Value(0.0, output_field=FloatField())
+    
+    matched_ids = UserObjectSearchGram.objects.filter(field=field, gram__in=query_grams)\
+        .values('user_object_id')\
+        .annotate(matched=Count('gram', distinct=True))\
+        .filter(matched=len(query_grams))\
+        .values('user_object_id')
+    queryset = queryset.filter(id__in=matched_ids)
+    
+    # Доля триграмм поля, совпавших с запросом (число триграмм поля ~ длина + 2)
+    rank = Value(float(len(query_grams))) / (Cast(Length(field_name), FloatField()) + Value(2.0))
+    return queryset, rank
+
+
+def search_user_objects(queryset, name=None, address=None):
+    """
+    Фильтрация queryset по name/address с ранжированием по похожести
+    
+    Возвращает queryset, отсортированный по search_rank (затем -created_at).
+    Без поисковых параметров queryset не меняется.
+    """
+    terms = {field_name: value for field_name, value in (('name', name), ('address', address)) if value}
+    if not terms:
+        return queryset
+    
+    ranks = []
+    if uses_pg_trgm():
+        from django.contrib.postgres.search import TrigramSimilarity
+        for field_name, value in terms.items():
+            # UPPER(field) LIKE UPPER(%value%) - использует GIN индекс uo_*_trgm_idx
+            queryset = queryset.filter(**{f'{field_name}__icontains': value})
+            ranks.append(TrigramSimilarity(field_name, value))
+    else:
+        for field_name, value in terms.items():
+            queryset, rank = _gram_search(queryset, field_name, value)
+            ranks.append(rank)
+    
+    search_rank = ranks[0] if len(ranks) == 1 else Greatest(*ranks)
+    return queryset.annotate(search_rank=search_rank).order_by(F('search_rank').desc(), '-created_at')
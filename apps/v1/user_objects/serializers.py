@@ -1,17 +1,47 @@
+from django.db import models
 from rest_framework import serializers
-from .models import UserObject, UserObjectWorkers, UserObjectDocuments, UserObjectDocumentItems
+from .models import UserObject, UserObjectDocuments, UserObjectDocumentItems, UserObjectEvent
+from .summary import get_workers_document_map, refresh_user_object_summaries
+from .clusters import MAX_CLUSTER_ZOOM
+from .events import set_event_actor
+from .utils import assign_workers_to_objects, ADMIN_STATUSES
 from apps.v1.accounts.models import CustomUser
+from apps.v1.documents.mixins import SparseFieldsetMixin
+from apps.v1.accounts.roles import has_role, ROLE_MANAGER
 
 
-class UserObjectSerializer(serializers.ModelSerializer):
+class UserObjectListSerializer(serializers.ListSerializer):
+    """
+    List-сериализатор для UserObject: workers_document берется из сводок
+    (UserObjectSummary) для всей страницы сразу
+    """
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        user_objects = list(iterable)
+        # workers_document может быть исключен через fields/omit
+        if 'workers_document' in self.child.fields:
+            self.child.workers_document_map = get_workers_document_map(
+                user_objects, self.context.get('request')
+            )
+        return super().to_representation(user_objects)
+
+
+class UserObjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Сериализатор для чтения UserObject
     """
+    EXPANDABLE_FIELDS = ('user', 'workers_document')
+    FIELD_RELATIONS = {
+        'user': {'select_related': ['user']},
+        'workers_document': {'select_related': ['summary']},
+    }
+    
     user = serializers.SerializerMethodField()
     workers_document = serializers.SerializerMethodField()
     
     class Meta:
         model = UserObject
+        list_serializer_class = UserObjectListSerializer
         fields = [
             'id', 'user', 'name', 'address', 'latitude', 'longitude',
             'size', 'number_of_fire_extinguishing_systems', 'status',
@@ -34,9 +64,12 @@ class UserObjectSerializer(serializers.ModelSerializer):
         """
         Получение данных о работниках и их документах
         """
-        from .utils import get_workers_document_data
+        workers_document_map = getattr(self, 'workers_document_map', None)
+        if workers_document_map is not None and obj.id in workers_document_map:
+            return workers_document_map[obj.id]
+        
         request = self.context.get('request')
-        return get_workers_document_data(obj, request)
+        return get_workers_document_map([obj], request)[obj.id]
 
 
 class UserObjectCreateSerializer(serializers.ModelSerializer):
@@ -113,127 +146,72 @@ class UserObjectWorkersAddSerializer(serializers.Serializer):
         """
         Добавление работников к объекту
         """
-        from apps.v1.notification.models import Notification
-        from channels.layers import get_channel_layer
-        from asgiref.sync import async_to_sync
-        # Import here to avoid potential circular imports at module load time
-        from apps.v1.user_objects.signals import send_notification_to_user
-        
         user_object_id = validated_data['user_objects_id']
-        worker_ids = validated_data['worker_list']
-        
-        # Получаем объект
-        user_object = UserObject.objects.get(id=user_object_id)
-        
-        # Изменяем статус объекта на PENDING
-        user_object.status = UserObject.Status.PENDING
-        user_object.save()
-        
-        # Создаем записи для работников
-        # Bulk operations ishlatilmoqda - tezroq ishlash uchun
-        # Avval mavjud bo'lganlarini tekshiramiz
-        existing_workers = UserObjectWorkers.objects.filter(
-            user_object=user_object,
-            user_id__in=worker_ids
-        ).values_list('user_id', flat=True)
+        request = self.context.get('request')
+        added_counts = assign_workers_to_objects(
+            [user_object_id], validated_data['worker_list'], actor=getattr(request, 'user', None)
+        )
         
-        # Yangi qo'shiladigan worker ID'larni topamiz
-        new_worker_ids = [wid for wid in worker_ids if wid not in existing_workers]
+        user_object = UserObject.objects.select_related('user', 'summary').get(id=user_object_id)
+        return {
+            'user_object': user_object,
+            'added_workers_count': added_counts.get(user_object_id, 0)
+        }
+
+
+class UserObjectWorkersBulkAddSerializer(serializers.Serializer):
+    """
+    Сериализатор для добавления работников сразу к нескольким объектам
+    """
+    MAX_OBJECTS = 500
+    
+    user_objects_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=True,
+        allow_empty=False,
+        min_length=1,
+        max_length=MAX_OBJECTS
+    )
+    worker_list = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=True,
+        allow_empty=False,
+        min_length=1
+    )
+    
+    def validate_user_objects_ids(self, value):
+        """
+        Проверка существования объектов
+        """
+        value = list(dict.fromkeys(value))
+        existing_ids = UserObject.objects.filter(id__in=value, is_deleted=False).values_list('id', flat=True)
+        missing_ids = set(value) - set(existing_ids)
         
-        # Bulk create
-        if new_worker_ids:
-            workers_to_create = [
-                UserObjectWorkers(
-                    user_object=user_object,
-                    user_id=worker_id,
-                    is_finished=False
-                )
-                for worker_id in new_worker_ids
-            ]
-            created_workers = UserObjectWorkers.objects.bulk_create(workers_to_create)
-        else:
-            created_workers = []
+        if missing_ids:
+            raise serializers.ValidationError(f'Объекты с ID {sorted(missing_ids)} не найдены или удалены.')
         
-        # ------------------------------------------------------------------
-        # Yangi workerlar uchun bildirishnoma yuborish
-        # Eslatma: bulk_create post_save signalini chaqirmaydi, shuning uchun
-        #          workerlarga notification ni qo'lda jo'natamiz.
-        # ------------------------------------------------------------------
-        if created_workers:
-            for worker in created_workers:
-                message_to_worker = (
-                    f"Объект '{user_object.name}' отправлен администратором для проверки"
-                )
-                try:
-                    send_notification_to_user(
-                        user=worker.user,
-                        message=message_to_worker,
-                        verb="object_assigned",
-                        actor=user_object.user,  # Создатель объекта
-                        user_object=user_object,
-                    )
-                except Exception:
-                    # Agar notification jo'natishda xatolik bo'lsa,
-                    # asosiy logikani to'xtatmaymiz.
-                    pass
+        return value
+    
+    def validate_worker_list(self, value):
+        """
+        Проверка существования пользователей
+        """
+        existing_users = CustomUser.objects.filter(id__in=value).values_list('id', flat=True)
+        missing_ids = set(value) - set(existing_users)
         
-        # Отправляем одно уведомление создателю объекта со всеми ролями
-        if created_workers:
-            workers = UserObjectWorkers.objects.filter(user_object=user_object)
-            worker_roles = set()
-            for w in workers:
-                worker_groups = w.user.groups.all()
-                for group in worker_groups:
-                    if group.name not in ['Администратор', 'Заказчик']:
-                        worker_roles.add(group.name)
-            
-            if worker_roles:
-                roles_str = ", ".join(worker_roles)
-                message_to_creator = f"Ваш объект '{user_object.name}' отправлен для проверки ролям: {roles_str}"
-                
-                # Создаем уведомление
-                notification = Notification.objects.create(
-                    recipient=user_object.user,
-                    actor=user_object.user,
-                    verb="object_sent_for_review",
-                    message=message_to_creator,
-                    user_object=user_object,
-                    category='user_object'
-                )
-                
-                # Отправляем через WebSocket
-                try:
-                    channel_layer = get_channel_layer()
-                    if channel_layer:
-                        async_to_sync(channel_layer.group_send)(
-                            f"user_{user_object.user.id}",
-                            {
-                                "type": "notification_message",
-                                "notification": {
-                                    "id": notification.id,
-                                    "message": message_to_creator,
-                                    "verb": "object_sent_for_review",
-                                    "actor": {
-                                        "id": user_object.user.id,
-                                        "first_name": user_object.user.first_name,
-                                        "last_name": user_object.user.last_name,
-                                    },
-                                    "user_object": {
-                                        "id": user_object.id,
-                                        "name": user_object.name,
-                                    },
-                                    "created_at": notification.created_at.isoformat(),
-                                    "is_read": notification.is_read,
-                                }
-                            }
-                        )
-                except Exception:
-                    pass
+        if missing_ids:
+            raise serializers.ValidationError(f'Пользователи с ID {sorted(missing_ids)} не найдены.')
         
-        return {
-            'user_object': user_object,
-            'workers': created_workers
-        }
+        return value
+    
+    def create(self, validated_data):
+        """
+        Добавление работников ко всем объектам в одной транзакции
+        """
+        request = self.context.get('request')
+        return assign_workers_to_objects(
+            validated_data['user_objects_ids'], validated_data['worker_list'], actor=getattr(request, 'user', None)
+        )
 
 
 class WorkerSerializer(serializers.ModelSerializer):
@@ -336,13 +314,15 @@ class UserObjectDocumentCreateSerializer(serializers.Serializer):
                 for document_file in document_list
             ]
             UserObjectDocumentItems.objects.bulk_create(document_items)
+            # bulk_create post_save signalini chaqirmaydi - svodkani qo'lda yangilaymiz
+            refresh_user_object_summaries([user_object.id])
         else:
             document_items = []
         
         # Если пользователь с ролью "Менеджер" создал документ, меняем статус объекта на COMPLETED
-        if user.groups.filter(name='Менеджер').exists():
+        if has_role(user, ROLE_MANAGER):
             user_object.status = UserObject.Status.COMPLETED
-            user_object.save()
+            set_event_actor(user_object, user).save()
         
         return {
             'user_object_document': user_object_document,
@@ -404,3 +384,107 @@ class UserObjectDocumentSerializer(serializers.ModelSerializer):
         items = obj.user_object_document_items.all().order_by('-created_at')
         serializer = UserObjectDocumentItemSerializer(items, many=True, context=self.context)
         return serializer.data
+
+
+class UserObjectGeoSerializer(serializers.ModelSerializer):
+    """
+    Облегченный сериализатор объекта для карты
+    """
+    distance_km = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UserObject
+        fields = ['id', 'name', 'address', 'latitude', 'longitude', 'status', 'distance_km']
+    
+    def get_distance_km(self, obj):
+        distance = getattr(obj, 'distance_km', None)
+        return round(distance, 3) if distance is not None else None
+
+
+class UserObjectEventSerializer(serializers.ModelSerializer):
+    """
+    Событие ленты объекта
+    """
+    type = serializers.SerializerMethodField()
+    type_display = serializers.CharField(source='get_type_display', read_only=True)
+    actor = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UserObjectEvent
+        fields = ['id', 'type', 'type_display', 'actor', 'ts', 'payload']
+    
+    def get_type(self, obj):
+        return UserObjectEvent.Type(obj.type).name.lower()
+    
+    def get_actor(self, obj):
+        if obj.actor is None:
+            return None
+        return {
+            'id': obj.actor.id,
+            'first_name': obj.actor.first_name,
+            'last_name': obj.actor.last_name,
+        }
+
+
+class UserObjectBBoxQuerySerializer(serializers.Serializer):
+    """
+    Параметры поиска объектов в прямоугольной области
+    """
+    min_lat = serializers.FloatField(min_value=-90, max_value=90)
+    min_lon = serializers.FloatField(min_value=-180, max_value=180)
+    max_lat = serializers.FloatField(min_value=-90, max_value=90)
+    max_lon = serializers.FloatField(min_value=-180, max_value=180)
+    limit = serializers.IntegerField(min_value=1, max_value=2000, default=500)
+    
+    def validate(self, attrs):
+        if attrs['min_lat'] > attrs['max_lat']:
+            raise serializers.ValidationError({'min_lat': 'min_lat не может быть больше max_lat'})
+        return attrs
+
+
+class UserObjectNearestQuerySerializer(serializers.Serializer):
+    """
+    Параметры поиска ближайших объектов
+    """
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lon = serializers.FloatField(min_value=-180, max_value=180)
+    k = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class UserObjectClustersQuerySerializer(UserObjectBBoxQuerySerializer):
+    """
+    Параметры кластеризации объектов на карте
+    """
+    zoom = serializers.IntegerField(min_value=0, max_value=MAX_CLUSTER_ZOOM)
+    limit = None
+
+
+class UserObjectBulkStatusUpdateSerializer(serializers.Serializer):
+    """
+    Сериализатор для смены статуса нескольких объектов
+    """
+    MAX_OBJECTS = 1000
+    
+    object_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=True,
+        allow_empty=False,
+        min_length=1,
+        max_length=MAX_OBJECTS
+    )
+    status = serializers.ChoiceField(choices=ADMIN_STATUSES)
+
+
+class UserObjectRestoreSerializer(serializers.Serializer):
+    """
+    Сериализатор для восстановления объектов из архива
+    """
+    MAX_OBJECTS = 1000
+    
+    object_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=True,
+        allow_empty=False,
+        min_length=1,
+        max_length=MAX_OBJECTS
+    )
@@ -1,64 +1,153 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver
+from django.db import transaction
 from django.contrib.auth.models import Group
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-from .models import UserObject, UserObjectWorkers, UserObjectDocuments
+from .models import UserObject, UserObjectWorkers, UserObjectDocuments, UserObjectDocumentItems, UserObjectSummary, UserObjectEvent
+from .summary import refresh_user_object_summaries, refresh_user_summaries
+from .search import refresh_search_grams, SEARCH_FIELDS
+from .changes import TRACKED_FIELDS, affects_tracked_fields, apply_user_object_changes
+from .events import make_event, record_events, worker_added_event
+from .counters import invalidate_user_counters
+from .workers import WORKER_FIELDS, bump_workers_version
 from apps.v1.accounts.models import CustomUser
-from apps.v1.notification.models import Notification
+from apps.v1.accounts.roles import get_user_roles, ROLE_ADMIN, ROLE_CUSTOMER
+from apps.v1.notification.events import notification_event, notify
 import json
 
 
-def send_notification_to_user(user, message, verb, actor=None, user_object=None):
+@notification_event('object_created')
+def object_created_notifications(dispatcher, object_id):
     """
-    Создание уведомления и отправка через WebSocket
+    Новый объект - одно широковещательное уведомление для роли администратора
     """
-    try:
-        # Создаем уведомление в БД
-        notification = Notification.objects.create(
-            recipient=user,
+    user_object = UserObject.objects.select_related('user').filter(pk=object_id).first()
+    if user_object is None:
+        return
+    creator_name = user_object.user.get_full_name() or user_object.user.email
+    dispatcher.broadcast(
+        ROLE_ADMIN,
+        f"Новый объект создан пользователем {creator_name}",
+        "object_created",
+        actor=user_object.user,
+        user_object=user_object
+    )
+
+
+@notification_event('object_assigned')
+def object_assigned_notifications(dispatcher, object_worker_id):
+    """
+    Работник добавлен к объекту - уведомление работнику
+    
+    Уведомление создателю объекта отправляется из serializer после добавления всех работников.
+    """
+    object_worker = UserObjectWorkers.objects.select_related('user_object__user').filter(pk=object_worker_id).first()
+    if object_worker is None:
+        return
+    user_object = object_worker.user_object
+    dispatcher.add(
+        [object_worker.user_id],
+        f"Объект '{user_object.name}' отправлен администратором для проверки",
+        "object_assigned",
+        actor=user_object.user,  # Создатель объекта
+        user_object=user_object
+    )
+
+
+@notification_event('objects_assigned')
+def objects_assigned_notifications(dispatcher, pairs):
+    """
+    Массовое назначение работников (pairs - пары [object_id, worker_id]):
+    уведомление каждому работнику и одно уведомление создателю каждого
+    объекта со всеми ролями работников объекта
+    """
+    user_objects = UserObject.objects.select_related('user').in_bulk({object_id for object_id, _ in pairs})
+    
+    # Роли всех работников изменённых объектов одним запросом
+    object_workers = {}
+    for object_id, user_id in UserObjectWorkers.objects.filter(user_object_id__in=user_objects)\
+            .values_list('user_object_id', 'user_id'):
+        object_workers.setdefault(object_id, set()).add(user_id)
+    all_worker_ids = set().union(*object_workers.values())
+    user_roles = {}
+    for user_id, group_name in CustomUser.groups.through.objects.filter(customuser_id__in=all_worker_ids)\
+            .exclude(group__name__in=[ROLE_ADMIN, ROLE_CUSTOMER])\
+            .values_list('customuser_id', 'group__name'):
+        user_roles.setdefault(user_id, set()).add(group_name)
+    
+    for object_id, worker_id in pairs:
+        user_object = user_objects.get(object_id)
+        if user_object is None:
+            continue
+        dispatcher.add(
+            [worker_id],
+            f"Объект '{user_object.name}' отправлен администратором для проверки",
+            "object_assigned",
+            actor=user_object.user,  # Создатель объекта
+            user_object=user_object
+        )
+    
+    for user_object in user_objects.values():
+        worker_roles = set()
+        for user_id in object_workers.get(user_object.id, ()):
+            worker_roles |= user_roles.get(user_id, set())
+        if not worker_roles:
+            continue
+        dispatcher.add(
+            [user_object.user_id],
+            f"Ваш объект '{user_object.name}' отправлен для проверки ролям: {', '.join(sorted(worker_roles))}",
+            "object_sent_for_review",
+            actor=user_object.user,
+            user_object=user_object
+        )
+
+
+@notification_event('objects_status_changed')
+def objects_status_changed_notifications(dispatcher, object_ids, status, actor_id):
+    """
+    Администратор изменил статус объектов - уведомление создателю каждого объекта
+    """
+    actor = CustomUser.objects.filter(pk=actor_id).first()
+    status_text = UserObject.Status(status).label
+    for user_object in UserObject.objects.filter(id__in=object_ids):
+        dispatcher.add(
+            [user_object.user_id],
+            f"Администратор изменил статус объекта '{user_object.name}' на {status_text}",
+            "object_status_changed",
             actor=actor,
-            verb=verb,
-            message=message,
-            user_object=user_object,
-            category='user_object'
+            user_object=user_object
         )
-        
-        # Отправляем через WebSocket
-        try:
-            channel_layer = get_channel_layer()
-            if channel_layer:
-                group_name = f"user_{user.id}"
-                notification_data = {
-                    "type": "notification_message",
-                    "notification": {
-                        "id": notification.id,
-                        "message": message,
-                        "verb": verb,
-                        "actor": {
-                            "id": actor.id,
-                            "first_name": actor.first_name,
-                            "last_name": actor.last_name,
-                        } if actor else None,
-                        "user_object": {
-                            "id": user_object.id,
-                            "name": user_object.name,
-                        } if user_object else None,
-                        "created_at": notification.created_at.isoformat(),
-                        "is_read": notification.is_read,
-                    }
-                }
-                async_to_sync(channel_layer.group_send)(
-                    group_name,
-                    notification_data
-                )
-        except Exception as e:
-            # Если WebSocket недоступен, просто создаем уведомление в БД
-            pass
-        
-        return notification
-    except Exception as e:
-        return None
+
+
+@notification_event('object_documents_uploaded')
+def object_documents_uploaded_notifications(dispatcher, document_id):
+    """
+    Работник загрузил документы - уведомление другим работникам объекта и роли администратора
+    """
+    document = UserObjectDocuments.objects.select_related('user_object', 'user').filter(pk=document_id).first()
+    if document is None:
+        return
+    user_object = document.user_object
+    document_creator = document.user
+    
+    # Получаем роль создателя документа
+    creator_role = None
+    for role_name in sorted(get_user_roles(document_creator)):
+        if role_name not in [ROLE_ADMIN, ROLE_CUSTOMER]:
+            creator_role = role_name
+            break
+    
+    creator_name = document_creator.get_full_name() or document_creator.email
+    role_text = f"с ролью {creator_role}" if creator_role else ""
+    message = f"Пользователь {creator_name} {role_text} проверил объект '{user_object.name}' и загрузил документы"
+    
+    # 1. Уведомление другим работникам этого объекта (администраторы получат широковещательное)
+    worker_ids = UserObjectWorkers.objects.filter(user_object=user_object)\
+        .exclude(user=document_creator).exclude(user__groups__name=ROLE_ADMIN)\
+        .values_list('user_id', flat=True)
+    dispatcher.add(worker_ids, message, "object_documents_uploaded", actor=document_creator, user_object=user_object)
+    
+    # 2. Уведомление всем администраторам (всегда отправляем)
+    dispatcher.broadcast(ROLE_ADMIN, message, "object_documents_uploaded", actor=document_creator, user_object=user_object)
 
 
 @receiver(post_save, sender=UserObject)
@@ -67,113 +156,236 @@ def user_object_created(sender, instance, created, **kwargs):
     Когда создается UserObject, отправляем уведомление всем администраторам
     """
     if created:
-        # Получаем всех пользователей с ролью "Администратор"
-        admin_group = Group.objects.filter(name='Администратор').first()
-        
-        if admin_group:
-            admin_users = CustomUser.objects.filter(groups=admin_group, is_active=True)
-            
-            if admin_users.exists():
-                creator_name = instance.user.get_full_name() or instance.user.email
-                message = f"Новый объект создан пользователем {creator_name}"
-                
-                for admin in admin_users:
-                    send_notification_to_user(
-                        user=admin,
-                        message=message,
-                        verb="object_created",
-                        actor=instance.user,
-                        user_object=instance
-                    )
+        notify('object_created', object_id=instance.pk)
 
 
 @receiver(post_save, sender=UserObjectWorkers)
 def user_object_workers_created(sender, instance, created, **kwargs):
     """
-    Когда создается UserObjectWorkers:
-    1. Отправляем уведомление выбранным работникам
-    Примечание: Уведомление создателю объекта отправляется из serializer после добавления всех работников
+    Когда создается UserObjectWorkers, отправляем уведомление выбранному работнику
     """
     if created:
-        user_object = instance.user_object
-        worker = instance.user
-        
-        # Уведомление работнику
-        message_to_worker = f"Объект '{user_object.name}' отправлен администратором для проверки"
-        send_notification_to_user(
-            user=worker,
-            message=message_to_worker,
-            verb="object_assigned",
-            actor=user_object.user,  # Создатель объекта
-            user_object=user_object
-        )
+        notify('object_assigned', object_worker_id=instance.pk)
 
 
 @receiver(post_save, sender=UserObjectDocuments)
 def user_object_documents_created(sender, instance, created, **kwargs):
     """
     Когда создается UserObjectDocuments:
-    1. Отправляем уведомление другим работникам этого объекта (кроме создателя документа)
-    2. Отправляем уведомление всем администраторам
-    3. Устанавливаем is_finished=True для UserObjectWorkers этого пользователя
+    1. Устанавливаем is_finished=True для UserObjectWorkers этого пользователя
+    2. Уведомляем других работников объекта и всех администраторов (NOTIFICATION_DELIVERY)
     """
     if created:
         try:
-            user_object = instance.user_object
-            document_creator = instance.user
-            
             # Устанавливаем is_finished=True для UserObjectWorkers
             UserObjectWorkers.objects.filter(
-                user_object=user_object,
-                user=document_creator
+                user_object_id=instance.user_object_id,
+                user_id=instance.user_id
             ).update(is_finished=True)
-            
-            # Получаем роль создателя документа
-            creator_groups = document_creator.groups.all()
-            creator_role = None
-            for group in creator_groups:
-                if group.name not in ['Администратор', 'Заказчик']:
-                    creator_role = group.name
-                    break
-            
-            creator_name = document_creator.get_full_name() or document_creator.email
-            role_text = f"с ролью {creator_role}" if creator_role else ""
-            
-            # 1. Уведомление другим работникам этого объекта
-            workers = UserObjectWorkers.objects.filter(user_object=user_object).exclude(user=document_creator)
-            if workers.exists():
-                for worker in workers:
-                    try:
-                        message = f"Пользователь {creator_name} {role_text} проверил объект '{user_object.name}' и загрузил документы"
-                        send_notification_to_user(
-                            user=worker.user,
-                            message=message,
-                            verb="object_documents_uploaded",
-                            actor=document_creator,
-                            user_object=user_object
-                        )
-                    except Exception as e:
-                        # Логируем ошибку, но продолжаем работу
-                        pass
-            
-            # 2. Уведомление всем администраторам (всегда отправляем)
-            admin_group = Group.objects.filter(name='Администратор').first()
-            if admin_group:
-                admin_users = CustomUser.objects.filter(groups=admin_group, is_active=True)
-                message = f"Пользователь {creator_name} {role_text} проверил объект '{user_object.name}' и загрузил документы"
-                for admin in admin_users:
-                    try:
-                        send_notification_to_user(
-                            user=admin,
-                            message=message,
-                            verb="object_documents_uploaded",
-                            actor=document_creator,
-                            user_object=user_object
-                        )
-                    except Exception as e:
-                        # Логируем ошибку, но продолжаем работу
-                        pass
+            notify('object_documents_uploaded', document_id=instance.pk)
         except Exception as e:
             # Логируем общую ошибку, но не прерываем выполнение
             pass
 
+
+# Поля пользователя, которые попадают в сводку workers_document
+SUMMARY_USER_FIELDS = {'first_name', 'last_name', 'email', 'phone_number'}
+
+
+@receiver(post_save, sender=UserObject)
+def user_object_summary_created(sender, instance, created, **kwargs):
+    """
+    Для нового объекта создаем пустую сводку
+    """
+    if created:
+        UserObjectSummary.objects.get_or_create(user_object=instance)
+
+
+@receiver([post_save, post_delete], sender=UserObjectWorkers)
+@receiver([post_save, post_delete], sender=UserObjectDocuments)
+def user_object_summary_refresh(sender, instance, signal, **kwargs):
+    """
+    Пересчет сводки объекта при изменении работников или документов
+
+    После удаления пересчет откладывается до коммита: при каскадном удалении
+    объекта его сводка иначе создавалась бы заново для удаляемой строки.
+    """
+    if signal is post_delete:
+        object_id = instance.user_object_id
+        transaction.on_commit(lambda: refresh_user_object_summaries([object_id]))
+        return
+    refresh_user_object_summaries([instance.user_object_id])
+
+
+@receiver([post_save, post_delete], sender=UserObjectDocumentItems)
+def user_object_document_item_summary_refresh(sender, instance, **kwargs):
+    """
+    Пересчет сводки объекта при изменении элементов документа
+    """
+    object_ids = UserObjectDocuments.objects.filter(
+        id=instance.user_object_document_id
+    ).values_list('user_object_id', flat=True)
+    refresh_user_object_summaries(list(object_ids))
+
+
+@receiver(pre_save, sender=CustomUser)
+def user_summary_capture(sender, instance, update_fields=None, **kwargs):
+    """
+    Запоминаем поля сводки до сохранения: пересчет нужен, только если они изменились
+    """
+    fields = SUMMARY_USER_FIELDS if update_fields is None else SUMMARY_USER_FIELDS.intersection(update_fields)
+    if instance._state.adding or not instance.pk or not fields:
+        return
+    instance._summary_before = CustomUser.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(post_save, sender=CustomUser)
+def user_summary_refresh(sender, instance, created, **kwargs):
+    """
+    Пересчет сводок при изменении данных работника (имя, email, телефон)
+
+    Пересчет затрагивает все объекты работника, поэтому выполняется после
+    коммита и только если поля сводки действительно изменились (вход, смена
+    пароля и т.п. сводки не трогают).
+    """
+    before = instance.__dict__.pop('_summary_before', None)
+    if created or not before:
+        return
+    if all(getattr(instance, field) == value for field, value in before.items()):
+        return
+    user_id = instance.pk
+    transaction.on_commit(lambda: refresh_user_summaries([user_id]))
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def user_groups_summary_refresh(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Пересчет сводок при изменении групп (ролей) работников
+    """
+    if reverse and action == 'pre_clear':
+        # group.user_set.clear() - pk_set не передается, запоминаем пользователей заранее
+        instance._cleared_user_ids = list(instance.user_set.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        user_ids = [instance.pk]
+    elif action == 'post_clear':
+        user_ids = getattr(instance, '_cleared_user_ids', [])
+    else:
+        user_ids = list(pk_set or [])
+    refresh_user_summaries(user_ids)
+
+
+@receiver(post_save, sender=UserObject)
+def user_object_search_grams_refresh(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Обновление триграмм поиска при изменении name/address (на БД без pg_trgm)
+    """
+    if update_fields is not None and not SEARCH_FIELDS.keys() & set(update_fields):
+        return
+    refresh_search_grams([instance])
+
+
+@receiver(pre_save, sender=UserObject)
+def user_object_state_capture(sender, instance, update_fields=None, **kwargs):
+    """
+    Запоминаем объект до сохранения (один SELECT для всех производных данных)
+    """
+    if instance._state.adding or not instance.pk or not affects_tracked_fields(update_fields):
+        return
+    instance._state_before = UserObject.objects.filter(pk=instance.pk).only(*TRACKED_FIELDS).first()
+
+
+@receiver(post_save, sender=UserObject)
+def user_object_state_refresh(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Тайлы карты, агрегаты панели, журнал смены статуса и счетчики профиля
+    для любого save(); автор события задается через set_event_actor
+    """
+    actor = instance.__dict__.pop('_event_actor', None)
+    if not created and not affects_tracked_fields(update_fields):
+        return
+    old = None if created else instance.__dict__.pop('_state_before', None)
+    apply_user_object_changes([(old, instance)], actor)
+
+
+@receiver(pre_delete, sender=UserObject)
+def user_object_state_delete(sender, instance, **kwargs):
+    # pre_delete (внутри транзакции удаления): события объекта еще не удалены каскадом.
+    # Работники удаляются каскадом - их счетчики сбрасывает сигнал UserObjectWorkers
+    apply_user_object_changes([(instance, None)])
+
+
+@receiver(post_save, sender=UserObject)
+def user_object_created_event(sender, instance, created, **kwargs):
+    if created:
+        record_events([make_event(instance.id, UserObjectEvent.Type.CREATED, instance.user_id, ts=instance.created_at)])
+
+
+@receiver(post_save, sender=UserObjectWorkers)
+def user_object_worker_added_event(sender, instance, created, **kwargs):
+    """
+    Работник, добавленный через save() (массовое назначение пишет события само)
+    """
+    if created:
+        record_events([worker_added_event(instance.user_object_id, instance.user_id, ts=instance.created_at)])
+
+
+@receiver(post_save, sender=UserObjectDocuments)
+def user_object_document_uploaded_event(sender, instance, created, **kwargs):
+    if created:
+        record_events([make_event(
+            instance.user_object_id, UserObjectEvent.Type.DOCUMENT_UPLOADED, instance.user_id,
+            {'document_id': instance.id}, instance.created_at
+        )])
+
+
+@receiver([post_save, post_delete], sender=UserObjectWorkers)
+def user_object_worker_counters_invalidate(sender, instance, **kwargs):
+    invalidate_user_counters([instance.user_id])
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def user_groups_counters_invalidate(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Счетчики профиля зависят от роли пользователя
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_user_counters([instance.pk])
+    elif action == 'post_clear':
+        invalidate_user_counters(getattr(instance, '_cleared_user_ids', []))
+    else:
+        invalidate_user_counters(pk_set or [])
+
+
+# Поля пользователя, от которых зависит список работников
+WORKERS_USER_FIELDS = set(WORKER_FIELDS) | {'is_active'}
+
+
+@receiver(post_save, sender=CustomUser)
+def workers_list_user_changed(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Сброс кэша списка работников при изменении данных пользователя
+    (новый пользователь попадает в список только после добавления в группу)
+    """
+    if created:
+        return
+    if update_fields is not None and not WORKERS_USER_FIELDS.intersection(update_fields):
+        return
+    bump_workers_version()
+
+
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def workers_list_changed(sender, instance, **kwargs):
+    bump_workers_version()
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def workers_list_groups_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_workers_version()
@@ -0,0 +1,93 @@
+"""
+Денормализованная сводка workers_document для объектов пользователя
+"""
+import copy
+
+from .models import UserObject, UserObjectSummary, UserObjectWorkers
+from .utils import build_workers_document_map
+
+
+def refresh_user_object_summaries(object_ids):
+    """
+    Пересчет сводок для указанных объектов (одним пакетом запросов)
+    
+    URL документов хранятся относительными, полный URL формируется при чтении.
+    """
+    object_ids = {object_id for object_id in object_ids if object_id}
+    if not object_ids:
+        return
+    
+    user_objects = list(UserObject.objects.filter(id__in=object_ids).only('id'))
+    workers_document_map = build_workers_document_map(user_objects)
+    
+    UserObjectSummary.objects.bulk_create(
+        [
+            UserObjectSummary(user_object_id=object_id, workers_document=workers_document)
+            for object_id, workers_document in workers_document_map.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['user_object'],
+        update_fields=['workers_document', 'updated_at'],
+    )
+
+
+def refresh_user_summaries(user_ids):
+    """
+    Пересчет сводок всех объектов, где пользователи являются работниками
+    (после изменения их данных или групп)
+    """
+    object_ids = UserObjectWorkers.objects.filter(
+        user_id__in=user_ids
+    ).values_list('user_object_id', flat=True).distinct()
+    refresh_user_object_summaries(list(object_ids))
+
+
+def absolutize_workers_document(workers_document, request):
+    """
+    Преобразование относительных URL документов сводки в полные
+    """
+    if not request:
+        return workers_document
+    
+    result = copy.deepcopy(workers_document)
+    for role_data in result.values():
+        for document in role_data['document_list']:
+            for item in document['items']:
+                item['document_url'] = request.build_absolute_uri(item['document_url'])
+    return result
+
+
+def get_workers_document_map(user_objects, request=None):
+    """
+    Получение workers_document для списка объектов из сводок
+    
+    Если сводка загружена через select_related('summary') - дополнительных
+    запросов нет. Для объектов без сводки данные собираются на лету.
+    """
+    user_objects = list(user_objects)
+    if not user_objects:
+        return {}
+    
+    if all(UserObject.summary.is_cached(user_object) for user_object in user_objects):
+        summaries = {
+            user_object.id: user_object.summary.workers_document
+            for user_object in user_objects
+            if getattr(user_object, 'summary', None) is not None
+        }
+    else:
+        summaries = dict(
+            UserObjectSummary.objects.filter(
+                user_object_id__in=[user_object.id for user_object in user_objects]
+            ).values_list('user_object_id', 'workers_document')
+        )
+    
+    result = {
+        object_id: absolutize_workers_document(workers_document, request)
+        for object_id, workers_document in summaries.items()
+    }
+    
+    missing = [user_object for user_object in user_objects if user_object.id not in result]
+    if missing:
+        result.update(build_workers_document_map(missing, request))
+    
+    return result
@@ -0,0 +1,21 @@
+from celery import shared_task
+
+from .bundle import build_bundle, compute_bundle_plan
+from .models import UserObject
+
+
+@shared_task(ignore_result=True)
+def build_object_bundle_plan(user_object_id, etag):
+    """
+    План ZIP архива объекта для докачки (Range) - вне HTTP запроса
+
+    Если файлы объекта изменились (другой ETag), план не строится: старый
+    ETag больше не отдается, новый получит план при отдаче.
+    """
+    user_object = UserObject.objects.filter(pk=user_object_id).first()
+    if user_object is None:
+        return
+    bundle = build_bundle(user_object)
+    if bundle.etag != etag:
+        return
+    compute_bundle_plan(bundle)
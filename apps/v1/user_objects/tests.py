@@ -1,3 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.v1.accounts.roles import ROLE_ADMIN, ROLE_CUSTOMER
+from .models import UserObject, UserObjectWorkers
+
+
+class UserObjectWorkersBulkAddTests(TestCase):
+    """
+    Массовое назначение работников доступно только администраторам
+    """
+
+    def setUp(self):
+        User = get_user_model()
+        self.customer = User.objects.create_user(username='customer', email='customer@example.com', password='password')
+        self.customer.groups.add(Group.objects.get_or_create(name=ROLE_CUSTOMER)[0])
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='password')
+        self.admin.groups.add(Group.objects.get_or_create(name=ROLE_ADMIN)[0])
+        self.worker = User.objects.create_user(username='worker', email='worker@example.com', password='password')
+        self.objects = [UserObject.objects.create(user=self.customer, name=f'Объект {index}') for index in range(2)]
+        self.client = APIClient()
+        self.url = reverse('user_objects:user_object_workers_bulk_add')
+        self.payload = {
+            'user_objects_ids': [user_object.id for user_object in self.objects],
+            'worker_list': [self.worker.id],
+        }
+
+    def test_non_admin_forbidden(self):
+        self.client.force_authenticate(self.customer)
+        response = self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(response.data['success'])
+        self.assertFalse(UserObjectWorkers.objects.exists())
+
+    def test_admin_assigns_workers(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['added_workers_count'], 2)
+        self.assertEqual(UserObjectWorkers.objects.filter(user=self.worker).count(), 2)
@@ -8,14 +8,24 @@ urlpatterns = [
     path('', views.UserObjectListCreateAPIView.as_view(), name='user_object_list_create'),
     path('all/', views.UserObjectAllListAPIView.as_view(), name='user_object_all_list'),
     path('archived/', views.UserObjectDeletedListAPIView.as_view(), name='user_object_deleted_list'),
+    path('archived/restore/', views.UserObjectRestoreAPIView.as_view(), name='user_object_restore'),
     path('<int:pk>/', views.UserObjectDetailAPIView.as_view(), name='user_object_detail'),
+    path('<int:pk>/timeline/', views.UserObjectTimelineAPIView.as_view(), name='user_object_timeline'),
+    path('<int:pk>/bundle/', views.UserObjectBundleAPIView.as_view(), name='user_object_bundle'),
+    
+    # Геопоиск объектов для карты
+    path('geo/bbox/', views.UserObjectBBoxAPIView.as_view(), name='user_object_geo_bbox'),
+    path('geo/nearest/', views.UserObjectNearestAPIView.as_view(), name='user_object_geo_nearest'),
+    path('geo/clusters/', views.UserObjectClustersAPIView.as_view(), name='user_object_geo_clusters'),
     
     # Добавление работников к объекту
     path('workers/add/', views.UserObjectWorkersAddAPIView.as_view(), name='user_object_workers_add'),
+    path('workers/bulk-add/', views.UserObjectWorkersBulkAddAPIView.as_view(), name='user_object_workers_bulk_add'),
     path('workers/', views.WorkersListAPIView.as_view(), name='workers_list'),
     path('documents/create/', views.UserObjectDocumentCreateAPIView.as_view(), name='user_object_document_create'),
     path('documents/', views.UserObjectDocumentsListAPIView.as_view(), name='user_object_documents_list'),
     
     # Обновление статуса объекта
     path('status/update/', views.UserObjectStatusUpdateAPIView.as_view(), name='user_object_status_update'),
+    path('status/bulk-update/', views.UserObjectBulkStatusUpdateAPIView.as_view(), name='user_object_status_bulk_update'),
 ]
\ No newline at end of file
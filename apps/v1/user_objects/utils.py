@@ -1,6 +1,16 @@
 from .models import UserObject, UserObjectWorkers, UserObjectDocuments, UserObjectDocumentItems
+from .search import search_user_objects
+from .changes import apply_user_object_changes
+from .events import worker_added_event
 from apps.v1.accounts.models import CustomUser
+from apps.v1.accounts.roles import get_user_roles, ROLE_ADMIN, ROLE_CUSTOMER, WORKER_ROLES
+from apps.v1.notification.events import notify
+from apps.v1.documents.mixins import make_etag
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.utils import timezone
+import copy
 
 
 def get_user_objects_queryset(user):
@@ -11,30 +21,28 @@ def get_user_objects_queryset(user):
     Если пользователь в других группах - возвращает объекты, где он является работником
     """
     # Проверяем, является ли пользователь Заказчиком
-    is_customer = user.groups.filter(name='Заказчик').exists()
-    is_admin = user.groups.filter(name='Администратор').exists()
+    roles = get_user_roles(user)
+    is_customer = ROLE_CUSTOMER in roles
+    is_admin = ROLE_ADMIN in roles
     
     if is_customer:
         # Заказчик видит только свои объекты
-        queryset = UserObject.objects.filter(user=user, is_deleted=False)\
-            .select_related('user')\
-            .prefetch_related('user_object_workers', 'user_object_documents')
+        queryset = UserObject.objects.filter(user_id=user.pk, is_deleted=False)\
+            .select_related('user', 'summary')
     elif is_admin:
         # Администратор видит все объекты
         queryset = UserObject.objects.filter(is_deleted=False)\
-            .select_related('user')\
-            .prefetch_related('user_object_workers', 'user_object_documents')
+            .select_related('user', 'summary')
     else:
         # Другие роли видят объекты, где они являются работниками
         worker_objects = UserObjectWorkers.objects.filter(
-            user=user
+            user_id=user.pk
         ).select_related('user_object', 'user_object__user').values_list('user_object_id', flat=True)
         
         queryset = UserObject.objects.filter(
             id__in=worker_objects,
             is_deleted=False
-        ).select_related('user')\
-         .prefetch_related('user_object_workers', 'user_object_documents')
+        ).select_related('user', 'summary')
     
     return queryset
 
@@ -43,15 +51,12 @@ def apply_user_objects_filters(queryset, request):
     """
     Применение фильтров к queryset объектов пользователя
     """
-    # Фильтрация по name
-    name = request.query_params.get('name', None)
-    if name:
-        queryset = queryset.filter(name__icontains=name)
-    
-    # Фильтрация по address
-    address = request.query_params.get('address', None)
-    if address:
-        queryset = queryset.filter(address__icontains=address)
+    # Поиск по name и address (trigram индекс, сортировка по похожести)
+    queryset = search_user_objects(
+        queryset,
+        name=request.query_params.get('name', None),
+        address=request.query_params.get('address', None)
+    )
     
     # Фильтрация по size
     size = request.query_params.get('size', None)
@@ -79,94 +84,326 @@ def apply_user_objects_filters(queryset, request):
     return queryset
 
 
-def get_workers_document_data(user_object, request):
+# Роли для группировки работников в workers_document - по алфавиту
+# (порядок ключей и приоритет роли, если у работника их несколько)
+WORKER_DOCUMENT_ROLES = sorted(WORKER_ROLES)
+
+
+def annotate_user_object_version(queryset):
     """
-    Получение данных о работниках и их документах для объекта
+    Добавление к queryset данных для версии объекта (время изменения и число счетов)
+    
+    Работники и документы учитываются через summary.updated_at - сводка
+    пересобирается сигналами при любом их изменении, включая удаление.
+    """
+    from apps.v1.documents.models import Bills
+    bills = Bills.objects.filter(object_id=OuterRef('pk')).order_by().values('object_id')
+    return queryset.annotate(
+        bills_updated_at=Subquery(bills.annotate(value=Max('updated_at')).values('value')[:1]),
+        bills_count=Subquery(bills.annotate(value=Count('pk')).values('value')[:1], output_field=IntegerField()),
+    )
+
+
+def get_user_object_version(user_object, request):
+    """
+    Strong ETag и Last-Modified объекта
+    
+    Версия: updated_at объекта, сводки по работникам/документам, владельца и
+    счетов (объект загружен через annotate_user_object_version и
+    select_related('user', 'summary')). ETag также зависит от пользователя и URL,
+    так как от них зависят поля и ссылки в ответе.
     """
-    # Роли для группировки
-    roles = [
-        'Дежурный инженер',
-        'Инспектор МЧС',
-        'Исполнителя',
-        'Менеджер',
-        'Обслуживающий инженер'
+    summary = getattr(user_object, 'summary', None)
+    timestamps = [
+        user_object.updated_at,
+        summary.updated_at if summary else None,
+        user_object.user.updated_at,
+        getattr(user_object, 'bills_updated_at', None),
     ]
+    etag = make_etag(
+        request.user.pk, request.get_host(), request.get_full_path(),
+        *timestamps, getattr(user_object, 'bills_count', None)
+    )
+    return etag, max((timestamp for timestamp in timestamps if timestamp), default=None)
+
+
+def build_workers_document_map(user_objects, request=None):
+    """
+    Получение данных о работниках и их документах для списка объектов
     
-    # Получаем всех работников объекта
-    workers = UserObjectWorkers.objects.filter(
-        user_object=user_object
-    ).select_related('user').prefetch_related('user__groups')
-    
-    # Группируем работников по ролям
-    workers_by_role = {}
-    for role in roles:
-        workers_by_role[role] = {
-            'user_info': [],
-            'is_send': False,
-            'document_list': []
-        }
+    Данные для всей страницы собираются фиксированным количеством запросов
+    (работники, их группы, документы, элементы документов) независимо от
+    количества объектов. Возвращает словарь {user_object_id: workers_document}.
+    """
+    object_ids = [user_object.id for user_object in user_objects]
+    result = {object_id: {} for object_id in object_ids}
+    if not object_ids:
+        return result
     
-    # Обрабатываем каждого работника
+    # 1. Все работники объектов страницы одним запросом
+    workers = list(
+        UserObjectWorkers.objects.filter(user_object_id__in=object_ids)
+        .select_related('user')
+        .order_by('id')
+    )
+    if not workers:
+        return result
+    
+    user_ids = {worker.user_id for worker in workers}
+    
+    # 2. Роли всех работников одним запросом
+    user_groups = {}
+    group_rows = CustomUser.groups.through.objects.filter(
+        customuser_id__in=user_ids,
+        group__name__in=WORKER_DOCUMENT_ROLES
+    ).values_list('customuser_id', 'group__name')
+    for user_id, group_name in group_rows:
+        user_groups.setdefault(user_id, set()).add(group_name)
+    
+    # 3-4. Документы работников и их элементы
+    documents_by_worker = {}
+    documents = UserObjectDocuments.objects.filter(
+        user_object_id__in=object_ids,
+        user_id__in=user_ids
+    ).prefetch_related('user_object_document_items').order_by('id')
+    for doc in documents:
+        documents_by_worker.setdefault((doc.user_object_id, doc.user_id), []).append(doc)
+    
+    # Группируем работников по объектам и ролям
+    workers_by_object = {}
     for worker in workers:
         user = worker.user
-        user_groups = list(user.groups.values_list('name', flat=True))
+        groups = user_groups.get(user.id, set())
         
         # Находим роль работника
         user_role = None
-        for role in roles:
-            if role in user_groups:
+        for role in WORKER_DOCUMENT_ROLES:
+            if role in groups:
                 user_role = role
                 break
         
         if not user_role:
             continue
         
+        workers_by_role = workers_by_object.setdefault(worker.user_object_id, {
+            role: {'user_info': [], 'is_send': False, 'document_list': []}
+            for role in WORKER_DOCUMENT_ROLES
+        })
+        role_data = workers_by_role[user_role]
+        
         # Добавляем информацию о пользователе
-        user_info = {
+        role_data['user_info'].append({
             'id': user.id,
             'first_name': user.first_name,
             'last_name': user.last_name,
             'email': user.email,
             'phone_number': user.phone_number
-        }
-        workers_by_role[user_role]['user_info'].append(user_info)
+        })
         
         # Проверяем, отправлял ли пользователь документы
-        user_documents = UserObjectDocuments.objects.filter(
-            user_object=user_object,
-            user=user
-        ).prefetch_related('user_object_document_items')
+        user_documents = documents_by_worker.get((worker.user_object_id, user.id))
+        if not user_documents:
+            continue
+        
+        # Если хотя бы один пользователь в роли отправил документы, is_send = True
+        role_data['is_send'] = True
         
-        if user_documents.exists():
-            # Если хотя бы один пользователь в роли отправил документы, is_send = True
-            workers_by_role[user_role]['is_send'] = True
+        for doc in user_documents:
+            document_urls = []
+            for item in doc.user_object_document_items.all():
+                if item.document:
+                    # Формируем полный URL
+                    if request:
+                        document_url = request.build_absolute_uri(item.document.url)
+                    else:
+                        document_url = item.document.url
+                    document_urls.append({
+                        'document_url': document_url
+                    })
             
-            # Получаем все документы пользователя
-            for doc in user_documents:
-                # Получаем элементы документа
-                items = doc.user_object_document_items.all()
-                document_urls = []
-                for item in items:
-                    if item.document:
-                        # Формируем полный URL
-                        if request:
-                            document_url = request.build_absolute_uri(item.document.url)
-                        else:
-                            document_url = item.document.url
-                        document_urls.append({
-                            'document_url': document_url
-                        })
-                
-                workers_by_role[user_role]['document_list'].append({
-                    'comment': doc.comment or '',
-                    'items': document_urls
-                })
+            role_data['document_list'].append({
+                'comment': doc.comment or '',
+                'items': document_urls
+            })
     
     # Удаляем пустые роли
-    result = {}
-    for role, data in workers_by_role.items():
-        if data['user_info']:  # Если есть хотя бы один работник
-            result[role] = data
+    for object_id, workers_by_role in workers_by_object.items():
+        result[object_id] = {
+            role: data for role, data in workers_by_role.items() if data['user_info']
+        }
     
     return result
 
+
+def get_workers_document_data(user_object, request):
+    """
+    Получение данных о работниках и их документах для объекта
+    """
+    return build_workers_document_map([user_object], request)[user_object.id]
+
+
+def assign_workers_to_objects(object_ids, worker_ids, actor=None):
+    """
+    Назначение списка работников сразу нескольким объектам
+    
+    В одной транзакции: новые связи (user_object, user) создаются одним
+    bulk_create (дубликаты пропускаются уникальным ограничением), статус
+    объектов меняется на PENDING одним UPDATE, события объектов пишутся
+    одним пакетом. Уведомления работникам и создателям объектов - одно
+    событие notify('objects_assigned') на операцию.
+    
+    Возвращает словарь {user_object_id: количество добавленных работников}.
+    """
+    # summary.py импортирует utils - импорт внутри функции
+    from .summary import refresh_user_object_summaries
+    
+    worker_ids = list(dict.fromkeys(worker_ids))
+    
+    with transaction.atomic():
+        user_objects = list(
+            UserObject.objects.select_for_update(of=('self',))
+            .filter(id__in=object_ids, is_deleted=False)
+            .select_related('user')
+            .order_by('id')
+        )
+        object_ids = [user_object.id for user_object in user_objects]
+        
+        existing_pairs = set(
+            UserObjectWorkers.objects.filter(user_object_id__in=object_ids, user_id__in=worker_ids)
+            .values_list('user_object_id', 'user_id')
+        )
+        new_pairs = [
+            (user_object, worker_id)
+            for user_object in user_objects
+            for worker_id in worker_ids
+            if (user_object.id, worker_id) not in existing_pairs
+        ]
+        UserObjectWorkers.objects.bulk_create([
+            UserObjectWorkers(user_object=user_object, user_id=worker_id, is_finished=False)
+            for user_object, worker_id in new_pairs
+        ], ignore_conflicts=True)
+        
+        # Статус всех объектов - PENDING
+        now = timezone.now()
+        changes = []
+        for user_object in user_objects:
+            old = copy.copy(user_object)
+            user_object.status = UserObject.Status.PENDING
+            changes.append((old, user_object))
+        UserObject.objects.filter(id__in=object_ids).update(
+            status=UserObject.Status.PENDING,
+            updated_at=now
+        )
+        apply_user_object_changes(changes, actor, now, events=[
+            worker_added_event(user_object.id, worker_id, actor, now) for user_object, worker_id in new_pairs
+        ])
+        
+        added_counts = {object_id: 0 for object_id in object_ids}
+        for user_object, worker_id in new_pairs:
+            added_counts[user_object.id] += 1
+        changed_object_ids = [object_id for object_id, count in added_counts.items() if count]
+        # bulk_create post_save signalini chaqirmaydi - svodkani qo'lda yangilaymiz
+        refresh_user_object_summaries(changed_object_ids)
+    
+    if new_pairs:
+        notify('objects_assigned', pairs=[[user_object.id, worker_id] for user_object, worker_id in new_pairs])
+    return added_counts
+
+
+# Статусы, которые администратор может установить вручную
+ADMIN_STATUSES = [
+    UserObject.Status.COMPLETED,
+    UserObject.Status.ON_HOLD,
+    UserObject.Status.CANCELLED
+]
+
+
+def update_objects_status(object_ids, new_status, actor):
+    """
+    Смена статуса нескольких объектов одним UPDATE ... WHERE id IN
+    
+    Уведомления создателям изменённых объектов - одно событие
+    notify('objects_status_changed') на операцию.
+    
+    Возвращает словарь результатов по каждому id:
+    {'success': True, 'old_status', 'status'} или {'success': False, 'message'}.
+    """
+    object_ids = list(dict.fromkeys(object_ids))
+    results = {}
+    
+    with transaction.atomic():
+        user_objects = {
+            user_object.id: user_object
+            for user_object in UserObject.objects.select_for_update(of=('self',))
+            .filter(id__in=object_ids, is_deleted=False)
+            .select_related('user')
+        }
+        
+        changed = []
+        for object_id in object_ids:
+            user_object = user_objects.get(object_id)
+            if user_object is None:
+                results[object_id] = {'success': False, 'message': 'Объект не найден'}
+                continue
+            results[object_id] = {'success': True, 'old_status': user_object.status, 'status': new_status}
+            if user_object.status != new_status:
+                changed.append(user_object)
+        
+        now = timezone.now()
+        changes = []
+        for user_object in changed:
+            old = copy.copy(user_object)
+            user_object.status = new_status
+            changes.append((old, user_object))
+        UserObject.objects.filter(id__in=[user_object.id for user_object in changed]).update(
+            status=new_status,
+            updated_at=now
+        )
+        apply_user_object_changes(changes, actor, now)
+    
+    if changed:
+        notify(
+            'objects_status_changed',
+            object_ids=[user_object.id for user_object in changed],
+            status=new_status,
+            actor_id=getattr(actor, 'pk', actor)
+        )
+    return results
+
+
+def restore_user_objects(object_ids, user):
+    """
+    Восстановление объектов пользователя из архива одним UPDATE ... WHERE id IN
+    
+    Восстанавливаются только удаленные объекты самого пользователя.
+    Возвращает словарь результатов по каждому id:
+    {'success': True} или {'success': False, 'message'}.
+    """
+    object_ids = list(dict.fromkeys(object_ids))
+    
+    with transaction.atomic():
+        user_objects = list(
+            UserObject.objects.select_for_update()
+            .filter(id__in=object_ids, user_id=user.pk, is_deleted=True)
+        )
+        restored_ids = {user_object.id for user_object in user_objects}
+        
+        now = timezone.now()
+        changes = []
+        for user_object in user_objects:
+            old = copy.copy(user_object)
+            user_object.is_deleted = False
+            user_object.deleted_at = None
+            changes.append((old, user_object))
+        UserObject.objects.filter(id__in=restored_ids).update(
+            is_deleted=False,
+            deleted_at=None,
+            updated_at=now
+        )
+        apply_user_object_changes(changes, user, now)
+    
+    return {
+        object_id: {'success': True} if object_id in restored_ids
+        else {'success': False, 'message': 'Объект не найден в архиве'}
+        for object_id in object_ids
+    }
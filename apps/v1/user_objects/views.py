@@ -5,24 +5,57 @@ from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from .models import UserObject, UserObjectDocuments, UserObjectDocuments
+from .models import UserObject, UserObjectDocuments, UserObjectEvent
 from .serializers import (
     UserObjectSerializer, UserObjectCreateSerializer, UserObjectUpdateSerializer,
-    UserObjectWorkersAddSerializer, WorkerSerializer, UserObjectDocumentCreateSerializer,
-    UserObjectDocumentSerializer
+    UserObjectWorkersAddSerializer, UserObjectWorkersBulkAddSerializer, UserObjectDocumentCreateSerializer,
+    UserObjectDocumentSerializer, UserObjectGeoSerializer,
+    UserObjectBBoxQuerySerializer, UserObjectNearestQuerySerializer, UserObjectClustersQuerySerializer,
+    UserObjectBulkStatusUpdateSerializer, UserObjectRestoreSerializer, UserObjectEventSerializer
 )
 from apps.v1.accounts.error_handlers import get_error_message
-from apps.v1.accounts.models import CustomUser
-from django.contrib.auth.models import Group
-from .utils import get_user_objects_queryset, apply_user_objects_filters
-from apps.v1.documents.mixins import PaginationMixin
+from apps.v1.accounts.roles import is_admin, is_customer
+from .utils import (
+    get_user_objects_queryset, apply_user_objects_filters, update_objects_status, restore_user_objects,
+    annotate_user_object_version, get_user_object_version
+)
+from .geo import filter_bbox, find_nearest
+from .clusters import get_tile_clusters, get_queryset_clusters
+from .events import set_event_actor
+from apps.v1.notification.events import notify
+from .workers import get_workers_by_role
+from .bundle import build_bundle, get_bundle_response
+from apps.v1.documents.exports import ExportMixin, EXPORT_PARAMETERS
+from apps.v1.documents.mixins import (
+    PaginationMixin, CURSOR_PAGINATION_PARAMETERS, SPARSE_FIELDSET_PARAMETERS, CONDITIONAL_GET_PARAMETERS,
+    get_sparse_fieldset, apply_sparse_fieldset, get_not_modified_response, set_conditional_headers
+)
+
+# Колонки экспорта объектов (?export=csv|ndjson|xlsx)
+USER_OBJECT_EXPORT_FIELDS = (
+    ('id', 'ID'),
+    ('name', 'Название объекта'),
+    ('address', 'Адрес объекта'),
+    ('latitude', 'Широта'),
+    ('longitude', 'Долгота'),
+    ('size', 'Размер'),
+    ('number_of_fire_extinguishing_systems', 'Кол-во систем пожаротушения'),
+    ('status', 'Статус объекта'),
+    ('user_id', 'ID заказчика'),
+    ('user__email', 'Email заказчика'),
+    ('created_at', 'Дата создания'),
+    ('updated_at', 'Дата обновления'),
+)
 
 
-class UserObjectListCreateAPIView(PaginationMixin, APIView):
+class UserObjectListCreateAPIView(ExportMixin, PaginationMixin, APIView):
     """
     Список и создание объектов пользователя
     """
     permission_classes = [IsAuthenticated]
+    EXPORT_FIELDS = USER_OBJECT_EXPORT_FIELDS
+    EXPORT_FILENAME = 'objects'
+    ETAG_VERSION_FIELDS = ('updated_at', 'summary__updated_at', 'user__updated_at')
     
     @swagger_auto_schema(
         operation_description="Получение списка объектов текущего пользователя с фильтрацией и пагинацией",
@@ -35,6 +68,10 @@ class UserObjectListCreateAPIView(PaginationMixin, APIView):
             openapi.Parameter('status', openapi.IN_QUERY, description='Фильтр по статусу', type=openapi.TYPE_STRING, required=False),
             openapi.Parameter('page', openapi.IN_QUERY, description='Номер страницы', type=openapi.TYPE_INTEGER, required=False),
             openapi.Parameter('limit', openapi.IN_QUERY, description='Количество элементов на странице', type=openapi.TYPE_INTEGER, required=False),
+            *CURSOR_PAGINATION_PARAMETERS,
+            *CONDITIONAL_GET_PARAMETERS,
+            *SPARSE_FIELDSET_PARAMETERS,
+            *EXPORT_PARAMETERS,
         ],
         responses={200: 'OK', 401: 'Unauthorized'},
         security=[{'Bearer': []}]
@@ -49,10 +86,23 @@ class UserObjectListCreateAPIView(PaginationMixin, APIView):
             # Применяем фильтры
             queryset = apply_user_objects_filters(queryset, request)
             
+            export_response = self.get_export_response(request, queryset)
+            if export_response is not None:
+                return export_response
+            
+            # fields/omit/expand - keraksiz join'lar olib tashlanadi
+            fieldset = get_sparse_fieldset(request)
+            queryset = apply_sparse_fieldset(queryset, UserObjectSerializer, fieldset)
+            
+            # Conditional GET: ro'yxat o'zgarmagan bo'lsa 304 (serializatsiyasiz)
+            not_modified = self.get_list_not_modified_response(request, queryset)
+            if not_modified is not None:
+                return not_modified
+            
             # Pagination Mixin ishlatilmoqda
             objects_page, paginator = self.paginate_queryset(queryset, request)
             
-            serializer = UserObjectSerializer(objects_page, many=True, context={'request': request})
+            serializer = UserObjectSerializer(objects_page, many=True, context={'request': request, 'sparse_fieldset': fieldset})
             
             return self.get_paginated_response(
                 objects_page,
@@ -79,7 +129,7 @@ class UserObjectListCreateAPIView(PaginationMixin, APIView):
         try:
             # Проверка группы Заказчик
             user = request.user
-            if not user.groups.filter(name='Заказчик').exists():
+            if not is_customer(user):
                 return Response({
                     'success': False,
                     'message': 'Только пользователи с группой "Заказчик" могут создавать объекты'
@@ -204,11 +254,14 @@ class UserObjectDocumentCreateAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class UserObjectAllListAPIView(PaginationMixin, APIView):
+class UserObjectAllListAPIView(ExportMixin, PaginationMixin, APIView):
     """
     Список всех объектов пользователей (для админов)
     """
     permission_classes = [IsAuthenticated]
+    EXPORT_FIELDS = USER_OBJECT_EXPORT_FIELDS
+    EXPORT_FILENAME = 'objects'
+    ETAG_VERSION_FIELDS = ('updated_at', 'summary__updated_at', 'user__updated_at')
     
     @swagger_auto_schema(
         operation_description="Получение списка всех объектов пользователей с фильтрацией и пагинацией",
@@ -221,6 +274,10 @@ class UserObjectAllListAPIView(PaginationMixin, APIView):
             openapi.Parameter('status', openapi.IN_QUERY, description='Фильтр по статусу', type=openapi.TYPE_STRING, required=False),
             openapi.Parameter('page', openapi.IN_QUERY, description='Номер страницы', type=openapi.TYPE_INTEGER, required=False),
             openapi.Parameter('limit', openapi.IN_QUERY, description='Количество элементов на странице', type=openapi.TYPE_INTEGER, required=False),
+            *CURSOR_PAGINATION_PARAMETERS,
+            *CONDITIONAL_GET_PARAMETERS,
+            *SPARSE_FIELDSET_PARAMETERS,
+            *EXPORT_PARAMETERS,
         ],
         responses={200: 'OK', 401: 'Unauthorized'},
         security=[{'Bearer': []}]
@@ -228,16 +285,28 @@ class UserObjectAllListAPIView(PaginationMixin, APIView):
     def get(self, request):
         try:
             queryset = UserObject.objects.filter(is_deleted=False)\
-                .select_related('user')\
-                .prefetch_related('user_object_workers', 'user_object_documents')
+                .select_related('user', 'summary')
             
             # Применяем фильтры
             queryset = apply_user_objects_filters(queryset, request)
             
+            export_response = self.get_export_response(request, queryset)
+            if export_response is not None:
+                return export_response
+            
+            # fields/omit/expand - keraksiz join'lar olib tashlanadi
+            fieldset = get_sparse_fieldset(request)
+            queryset = apply_sparse_fieldset(queryset, UserObjectSerializer, fieldset)
+            
+            # Conditional GET: ro'yxat o'zgarmagan bo'lsa 304 (serializatsiyasiz)
+            not_modified = self.get_list_not_modified_response(request, queryset)
+            if not_modified is not None:
+                return not_modified
+            
             # Pagination Mixin ishlatilmoqda
             objects_page, paginator = self.paginate_queryset(queryset, request)
             
-            serializer = UserObjectSerializer(objects_page, many=True, context={'request': request})
+            serializer = UserObjectSerializer(objects_page, many=True, context={'request': request, 'sparse_fieldset': fieldset})
             
             return self.get_paginated_response(
                 objects_page,
@@ -254,28 +323,94 @@ class UserObjectAllListAPIView(PaginationMixin, APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class UserObjectDeletedListAPIView(APIView):
+class UserObjectDeletedListAPIView(PaginationMixin, APIView):
     """
-    Список удаленных объектов пользователя
+    Список удаленных объектов пользователя (архив), последние удаленные первыми
     """
     permission_classes = [IsAuthenticated]
     
     @swagger_auto_schema(
-        operation_description="Получение списка удаленных объектов текущего пользователя",
+        operation_description="Получение списка удаленных объектов текущего пользователя. Сортировка по дате удаления, пагинация только курсором (next_cursor/previous_cursor).",
         tags=['User Objects'],
+        manual_parameters=[
+            openapi.Parameter('limit', openapi.IN_QUERY, description='Количество элементов на странице', type=openapi.TYPE_INTEGER, required=False),
+            *[parameter for parameter in CURSOR_PAGINATION_PARAMETERS if parameter.name != 'pagination'],
+        ],
         responses={200: 'OK', 401: 'Unauthorized'},
         security=[{'Bearer': []}]
     )
     def get(self, request):
         try:
             user = request.user
-            queryset = UserObject.objects.filter(user=user, is_deleted=True).select_related('user')
-            serializer = UserObjectSerializer(queryset, many=True, context={'request': request})
+            queryset = UserObject.objects.filter(user=user, is_deleted=True).select_related('user', 'summary')
+            
+            # Keyset pagination bo'yicha (user, -deleted_at) qisman indeksi
+            user_objects, paginator = self.paginate_queryset_by_cursor(queryset, request, ordering_field='deleted_at')
+            
+            serializer = UserObjectSerializer(user_objects, many=True, context={'request': request})
+            
+            return self.get_paginated_response(
+                user_objects,
+                paginator,
+                serializer.data,
+                'Список удаленных объектов получен успешно'
+            )
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': get_error_message('server_error'),
+                'errors': {'detail': str(e)}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class UserObjectRestoreAPIView(APIView):
+    """
+    Восстановление нескольких объектов из архива
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @swagger_auto_schema(
+        operation_description="Восстановление удаленных объектов текущего пользователя (до 1000) одним запросом. Возвращает результат по каждому ID.",
+        tags=['User Objects'],
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'object_ids': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                    description='Список ID удаленных объектов'
+                ),
+            },
+            required=['object_ids']
+        ),
+        responses={
+            200: openapi.Response('Результат по каждому объекту'),
+            400: openapi.Response('Ошибка валидации данных'),
+            401: openapi.Response('Требуется авторизация')
+        },
+        security=[{'Bearer': []}]
+    )
+    def post(self, request):
+        try:
+            serializer = UserObjectRestoreSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'message': get_error_message('validation_error'),
+                    'errors': serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            results = restore_user_objects(serializer.validated_data['object_ids'], request.user)
+            restored_count = sum(1 for result in results.values() if result['success'])
             
             return Response({
                 'success': True,
-                'message': 'Список удаленных объектов получен успешно',
-                'data': serializer.data
+                'message': f'Восстановлено {restored_count} из {len(results)} объектов',
+                'data': {
+                    'results': {str(object_id): result for object_id, result in results.items()},
+                    'restored_count': restored_count
+                }
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -295,13 +430,16 @@ class UserObjectDetailAPIView(APIView):
     @swagger_auto_schema(
         operation_description="Получение детальной информации об объекте по ID",
         tags=['User Objects'],
-        responses={200: 'OK', 404: 'Not Found', 401: 'Unauthorized'},
+        manual_parameters=CONDITIONAL_GET_PARAMETERS,
+        responses={200: 'OK', 304: 'Not Modified', 404: 'Not Found', 401: 'Unauthorized'},
         security=[{'Bearer': []}]
     )
     def get(self, request, pk):
         try:
             user = request.user
-            user_object = UserObject.objects.filter(pk=pk, is_deleted=False).select_related('user').first()
+            user_object = annotate_user_object_version(
+                UserObject.objects.filter(pk=pk, is_deleted=False).select_related('user', 'summary')
+            ).first()
             
             if not user_object:
                 return Response({
@@ -310,8 +448,7 @@ class UserObjectDetailAPIView(APIView):
                 }, status=status.HTTP_404_NOT_FOUND)
             
             # Проверяем доступ: Заказчик видит только свои объекты, другие роли - где они работники
-            is_customer = user.groups.filter(name='Заказчик').exists()
-            if is_customer:
+            if is_customer(user):
                 if user_object.user != user:
                     return Response({
                         'success': False,
@@ -326,13 +463,20 @@ class UserObjectDetailAPIView(APIView):
                         'message': 'Объект не найден'
                     }, status=status.HTTP_404_NOT_FOUND)
             
+            # Conditional GET: объект не изменился - 304 без сериализации
+            etag, last_modified = get_user_object_version(user_object, request)
+            not_modified = get_not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            
             serializer = UserObjectSerializer(user_object, context={'request': request})
             
-            return Response({
+            response = Response({
                 'success': True,
                 'message': 'Объект получен успешно',
                 'data': serializer.data
             }, status=status.HTTP_200_OK)
+            return set_conditional_headers(response, etag, last_modified)
             
         except Exception as e:
             return Response({
@@ -360,14 +504,13 @@ class UserObjectDetailAPIView(APIView):
                 }, status=status.HTTP_404_NOT_FOUND)
             
             # Проверяем доступ: только Заказчик может обновлять свои объекты
-            is_customer = user.groups.filter(name='Заказчик').exists()
-            if not is_customer or user_object.user != user:
+            if not is_customer(user) or user_object.user != user:
                 return Response({
                     'success': False,
                     'message': 'Объект не найден или у вас нет прав на обновление'
                 }, status=status.HTTP_404_NOT_FOUND)
             
-            serializer = UserObjectUpdateSerializer(user_object, data=request.data)
+            serializer = UserObjectUpdateSerializer(set_event_actor(user_object, user), data=request.data)
             
             if serializer.is_valid():
                 user_object = serializer.save()
@@ -412,14 +555,13 @@ class UserObjectDetailAPIView(APIView):
                 }, status=status.HTTP_404_NOT_FOUND)
             
             # Проверяем доступ: только Заказчик может обновлять свои объекты
-            is_customer = user.groups.filter(name='Заказчик').exists()
-            if not is_customer or user_object.user != user:
+            if not is_customer(user) or user_object.user != user:
                 return Response({
                     'success': False,
                     'message': 'Объект не найден или у вас нет прав на обновление'
                 }, status=status.HTTP_404_NOT_FOUND)
             
-            serializer = UserObjectUpdateSerializer(user_object, data=request.data, partial=True)
+            serializer = UserObjectUpdateSerializer(set_event_actor(user_object, user), data=request.data, partial=True)
             
             if serializer.is_valid():
                 user_object = serializer.save()
@@ -463,8 +605,7 @@ class UserObjectDetailAPIView(APIView):
                 }, status=status.HTTP_404_NOT_FOUND)
             
             # Проверяем доступ: только Заказчик может удалять свои объекты
-            is_customer = user.groups.filter(name='Заказчик').exists()
-            if not is_customer or user_object.user != user:
+            if not is_customer(user) or user_object.user != user:
                 return Response({
                     'success': False,
                     'message': 'Объект не найден или у вас нет прав на удаление'
@@ -531,22 +672,106 @@ class UserObjectWorkersAddAPIView(APIView):
     )
     def post(self, request):
         try:
-            serializer = UserObjectWorkersAddSerializer(data=request.data)
+            serializer = UserObjectWorkersAddSerializer(data=request.data, context={'request': request})
             
             if serializer.is_valid():
                 result = serializer.save()
                 user_object = result['user_object']
-                workers = result['workers']
+                added_workers_count = result['added_workers_count']
                 
                 # Возвращаем информацию об объекте
                 user_object_serializer = UserObjectSerializer(user_object)
                 
                 return Response({
                     'success': True,
-                    'message': f'Добавлено {len(workers)} работников. Статус объекта изменен на PENDING.',
+                    'message': f'Добавлено {added_workers_count} работников. Статус объекта изменен на PENDING.',
                     'data': {
                         'user_object': user_object_serializer.data,
-                        'added_workers_count': len(workers)
+                        'added_workers_count': added_workers_count
+                    }
+                }, status=status.HTTP_201_CREATED)
+            
+            return Response({
+                'success': False,
+                'message': get_error_message('validation_error'),
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': get_error_message('server_error'),
+                'errors': {'detail': str(e)}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class UserObjectWorkersBulkAddAPIView(APIView):
+    """
+    Добавление работников сразу к нескольким объектам
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @swagger_auto_schema(
+        operation_description="Добавление списка работников к нескольким объектам (до 500) в одной транзакции. Уже назначенные работники пропускаются. Статус всех объектов изменится на PENDING.",
+        tags=['User Objects'],
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'user_objects_ids': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                    description='Список ID объектов пользователя'
+                ),
+                'worker_list': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                    description='Список ID пользователей (работников)'
+                ),
+            },
+            required=['user_objects_ids', 'worker_list']
+        ),
+        responses={
+            201: openapi.Response(
+                'Успешное добавление работников',
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                        'message': openapi.Schema(type=openapi.TYPE_STRING),
+                        'data': openapi.Schema(type=openapi.TYPE_OBJECT),
+                    }
+                )
+            ),
+            400: openapi.Response('Ошибка валидации данных'),
+            401: openapi.Response('Требуется авторизация'),
+            403: openapi.Response('Доступ запрещен')
+        },
+        security=[{'Bearer': []}]
+    )
+    def post(self, request):
+        try:
+            # Массовое назначение - только для администраторов
+            if not is_admin(request.user):
+                return Response({
+                    'success': False,
+                    'message': 'Только администраторы могут назначать работников нескольким объектам'
+                }, status=status.HTTP_403_FORBIDDEN)
+            
+            serializer = UserObjectWorkersBulkAddSerializer(data=request.data, context={'request': request})
+            
+            if serializer.is_valid():
+                added_counts = serializer.save()
+                added_workers_count = sum(added_counts.values())
+                
+                return Response({
+                    'success': True,
+                    'message': f'Добавлено {added_workers_count} назначений для {len(added_counts)} объектов. Статус объектов изменен на PENDING.',
+                    'data': {
+                        'objects': [
+                            {'user_object_id': object_id, 'added_workers_count': count}
+                            for object_id, count in added_counts.items()
+                        ],
+                        'added_workers_count': added_workers_count
                     }
                 }, status=status.HTTP_201_CREATED)
             
@@ -615,39 +840,13 @@ class WorkersListAPIView(APIView):
     )
     def get(self, request):
         try:
-            # Список ролей для получения работников
-            worker_roles = [
-                'Дежурный инженер',
-                'Инспектор МЧС',
-                'Менеджер',
-                'Обслуживающий инженер',
-                'Исполнителя'
-            ]
-            
-            # Словарь для хранения работников по ролям
-            workers_by_role = {}
-            
-            # Получаем работников для каждой роли
-            for role_name in worker_roles:
-                try:
-                    group = Group.objects.get(name=role_name)
-                    # Получаем всех активных пользователей этой группы
-                    users = CustomUser.objects.filter(
-                        groups=group,
-                        is_active=True
-                    ).order_by('first_name', 'last_name')
-                    
-                    # Сериализуем пользователей
-                    serializer = WorkerSerializer(users, many=True)
-                    workers_by_role[role_name] = serializer.data
-                except Group.DoesNotExist:
-                    # Если группа не существует, возвращаем пустой список
-                    workers_by_role[role_name] = []
+            # Все роли одним запросом, результат - из общего кэша (см. workers.py)
+            workers_by_role = get_workers_by_role()
             
             return Response({
                 'success': True,
                 'message': 'Список работников получен успешно',
-                    'data': workers_by_role
+                'data': workers_by_role
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -696,7 +895,7 @@ class UserObjectStatusUpdateAPIView(APIView):
             user = request.user
             
             # Проверяем, является ли пользователь администратором
-            if not user.groups.filter(name='Администратор').exists():
+            if not is_admin(user):
                 return Response({
                     'success': False,
                     'message': 'Только администраторы могут изменять статус объекта'
@@ -740,61 +939,12 @@ class UserObjectStatusUpdateAPIView(APIView):
                 }, status=status.HTTP_404_NOT_FOUND)
             
             # Обновляем статус
-            old_status = user_object.status
             user_object.status = new_status
-            user_object.save()
-            
-            # Отправляем уведомление создателю объекта
-            from channels.layers import get_channel_layer
-            from asgiref.sync import async_to_sync
-            from apps.v1.notification.models import Notification
-            
-            channel_layer = get_channel_layer()
-            
-            # Статусы на русском
-            status_messages = {
-                UserObject.Status.COMPLETED: 'Завершенный',
-                UserObject.Status.ON_HOLD: 'На паузе',
-                UserObject.Status.CANCELLED: 'Отмененный'
-            }
-            
-            status_text = status_messages.get(new_status, new_status)
-            message = f"Администратор изменил статус объекта '{user_object.name}' на {status_text}"
-            
-            # Создаем уведомление
-            notification = Notification.objects.create(
-                recipient=user_object.user,
-                actor=user,
-                verb="object_status_changed",
-                message=message,
-                user_object=user_object,
-                category='user_object'
-            )
+            set_event_actor(user_object, user).save()
             
-            # Отправляем через WebSocket
-            if channel_layer:
-                async_to_sync(channel_layer.group_send)(
-                    f"user_{user_object.user.id}",
-                    {
-                        "type": "notification_message",
-                        "notification": {
-                            "id": notification.id,
-                            "message": message,
-                            "verb": "object_status_changed",
-                            "actor": {
-                                "id": user.id,
-                                "first_name": user.first_name,
-                                "last_name": user.last_name,
-                            },
-                            "user_object": {
-                                "id": user_object.id,
-                                "name": user_object.name,
-                            },
-                            "created_at": notification.created_at.isoformat(),
-                            "is_read": notification.is_read,
-                        }
-                    }
-                )
+            # Уведомление создателю объекта (в режиме NOTIFICATION_DELIVERY)
+            notify('objects_status_changed', object_ids=[user_object.id], status=new_status, actor_id=user.pk)
+            status_text = UserObject.Status(new_status).label
             
             # Возвращаем обновленный объект
             serializer = UserObjectSerializer(user_object, context={'request': request})
@@ -813,11 +963,88 @@ class UserObjectStatusUpdateAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class UserObjectBulkStatusUpdateAPIView(APIView):
+    """
+    Смена статуса нескольких объектов (закрытие сезона)
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @swagger_auto_schema(
+        operation_description="Смена статуса нескольких объектов (до 1000) одним запросом. Доступно только для администраторов. Статусы: completed, on_hold, cancelled. Возвращает результат по каждому ID; создатели изменённых объектов получают уведомления.",
+        tags=['User Objects'],
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'object_ids': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                    description='Список ID объектов пользователя'
+                ),
+                'status': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    enum=['completed', 'on_hold', 'cancelled'],
+                    description='Новый статус объектов'
+                ),
+            },
+            required=['object_ids', 'status']
+        ),
+        responses={
+            200: openapi.Response('Результат по каждому объекту'),
+            400: openapi.Response('Ошибка валидации данных'),
+            403: openapi.Response('Доступ запрещен'),
+            401: openapi.Response('Требуется авторизация')
+        },
+        security=[{'Bearer': []}]
+    )
+    def post(self, request):
+        try:
+            user = request.user
+            
+            # Проверяем, является ли пользователь администратором
+            if not is_admin(user):
+                return Response({
+                    'success': False,
+                    'message': 'Только администраторы могут изменять статус объекта'
+                }, status=status.HTTP_403_FORBIDDEN)
+            
+            serializer = UserObjectBulkStatusUpdateSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'message': get_error_message('validation_error'),
+                    'errors': serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            results = update_objects_status(
+                serializer.validated_data['object_ids'],
+                serializer.validated_data['status'],
+                actor=user
+            )
+            updated_count = sum(1 for result in results.values() if result['success'])
+            
+            return Response({
+                'success': True,
+                'message': f'Статус изменен для {updated_count} из {len(results)} объектов',
+                'data': {
+                    'results': {str(object_id): result for object_id, result in results.items()},
+                    'updated_count': updated_count
+                }
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': get_error_message('server_error'),
+                'errors': {'detail': str(e)}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class UserObjectDocumentsListAPIView(PaginationMixin, APIView):
     """
     Список документов объектов пользователя (фильтруется по текущему пользователю)
     """
     permission_classes = [IsAuthenticated]
+    ETAG_VERSION_FIELDS = ('updated_at', 'user_object__updated_at', 'user_object_document_items__updated_at')
     
     @swagger_auto_schema(
         operation_description="Получение списка документов объектов пользователя текущего пользователя с пагинацией. Возвращает: object (информация об объекте), comment, file_datas (список файлов с URL), created_at",
@@ -825,6 +1052,8 @@ class UserObjectDocumentsListAPIView(PaginationMixin, APIView):
         manual_parameters=[
             openapi.Parameter('page', openapi.IN_QUERY, description='Номер страницы', type=openapi.TYPE_INTEGER, required=False),
             openapi.Parameter('limit', openapi.IN_QUERY, description='Количество элементов на странице', type=openapi.TYPE_INTEGER, required=False),
+            *CURSOR_PAGINATION_PARAMETERS,
+            *CONDITIONAL_GET_PARAMETERS,
         ],
         responses={200: 'OK', 401: 'Unauthorized'},
         security=[{'Bearer': []}]
@@ -839,6 +1068,11 @@ class UserObjectDocumentsListAPIView(PaginationMixin, APIView):
                 .prefetch_related('user_object_document_items')\
                 .order_by('-created_at')
             
+            # Conditional GET: ro'yxat o'zgarmagan bo'lsa 304 (serializatsiyasiz)
+            not_modified = self.get_list_not_modified_response(request, queryset)
+            if not_modified is not None:
+                return not_modified
+            
             # Pagination Mixin ishlatilmoqda
             documents, paginator = self.paginate_queryset(queryset, request)
             
@@ -856,4 +1090,266 @@ class UserObjectDocumentsListAPIView(PaginationMixin, APIView):
                 'success': False,
                 'message': get_error_message('server_error'),
                 'errors': {'detail': str(e)}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class UserObjectTimelineAPIView(PaginationMixin, APIView):
+    """
+    Лента событий объекта (журнал UserObjectEvent), новые первыми
+    """
+    permission_classes = [IsAuthenticated]
+    DEFAULT_PAGE_SIZE = 20
+    
+    @swagger_auto_schema(
+        operation_description="Получение ленты событий объекта: создание, смена статуса, назначение работников, загрузка документов. Пагинация только курсором (next_cursor/previous_cursor). Доступ - как к объекту в списке объектов.",
+        tags=['User Objects'],
+        manual_parameters=[
+            openapi.Parameter('type', openapi.IN_QUERY, description='Фильтр по типу события (через запятую)', type=openapi.TYPE_STRING, enum=[event_type.name.lower() for event_type in UserObjectEvent.Type], required=False),
+            openapi.Parameter('limit', openapi.IN_QUERY, description='Количество событий на странице', type=openapi.TYPE_INTEGER, required=False),
+            *[parameter for parameter in CURSOR_PAGINATION_PARAMETERS if parameter.name != 'pagination'],
+        ],
+        responses={200: 'OK', 400: 'Bad Request', 404: 'Not Found', 401: 'Unauthorized'},
+        security=[{'Bearer': []}]
+    )
+    def get(self, request, pk):
+        try:
+            if not get_user_objects_queryset(request.user).filter(pk=pk).exists():
+                return Response({
+                    'success': False,
+                    'message': 'Объект не найден'
+                }, status=status.HTTP_404_NOT_FOUND)
+            
+            queryset = UserObjectEvent.objects.filter(user_object_id=pk).select_related('actor')
+            
+            type_param = request.query_params.get('type')
+            if type_param:
+                try:
+                    event_types = [UserObjectEvent.Type[name.strip().upper()] for name in type_param.split(',') if name.strip()]
+                except KeyError:
+                    return Response({
+                        'success': False,
+                        'message': get_error_message('validation_error'),
+                        'errors': {'type': [f'Допустимые значения: {", ".join(event_type.name.lower() for event_type in UserObjectEvent.Type)}']}
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                queryset = queryset.filter(type__in=event_types)
+            
+            # Keyset pagination bo'yicha (user_object, ts) indeksi
+            events, paginator = self.paginate_queryset_by_cursor(queryset, request, ordering_field='ts')
+            
+            serializer = UserObjectEventSerializer(events, many=True)
+            
+            return self.get_paginated_response(
+                events,
+                paginator,
+                serializer.data,
+                'Лента событий объекта получена успешно'
+            )
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': get_error_message('server_error'),
+                'errors': {'detail': str(e)}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class UserObjectBundleAPIView(APIView):
+    """
+    ZIP архив всех файлов объекта (потоковая отдача, докачка через Range)
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @swagger_auto_schema(
+        operation_description="Скачивание всех файлов объекта одним ZIP архивом: документы работников, журналы и акты, счета и файлы хранилища. Архив собирается на лету без временных файлов. Уже сжатые форматы (изображения, видео, архивы, docx/xlsx, pdf) хранятся без сжатия. Поддерживается докачка: Range (один диапазон) и If-Range с ETag. Доступ - как к объекту в списке объектов.",
+        tags=['User Objects'],
+        manual_parameters=[
+            openapi.Parameter('Range', openapi.IN_HEADER, description='Диапазон байт для докачки, например bytes=1048576-', type=openapi.TYPE_STRING, required=False),
+            openapi.Parameter('If-Range', openapi.IN_HEADER, description='ETag архива: диапазон отдается, только если архив не изменился', type=openapi.TYPE_STRING, required=False),
+            openapi.Parameter('If-None-Match', openapi.IN_HEADER, description='ETag из предыдущего ответа', type=openapi.TYPE_STRING, required=False),
+        ],
+        responses={200: 'ZIP архив', 206: 'Часть архива', 304: 'Not Modified', 404: 'Not Found', 416: 'Range Not Satisfiable', 401: 'Unauthorized'},
+        security=[{'Bearer': []}]
+    )
+    def get(self, request, pk):
+        try:
+            user_object = get_user_objects_queryset(request.user).filter(pk=pk).first()
+            if user_object is None:
+                return Response({
+                    'success': False,
+                    'message': 'Объект не найден'
+                }, status=status.HTTP_404_NOT_FOUND)
+            
+            bundle = build_bundle(user_object)
+            not_modified = get_not_modified_response(request, bundle.etag)
+            if not_modified is not None:
+                return not_modified
+            
+            return get_bundle_response(request, bundle)
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': get_error_message('server_error'),
+                'errors': {'detail': str(e)}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class UserObjectBBoxAPIView(APIView):
+    """
+    Объекты пользователя внутри прямоугольной области карты
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @swagger_auto_schema(
+        operation_description="Получение объектов внутри прямоугольной области (bounding box). Видимость объектов - как в списке объектов. Если min_lon > max_lon, область пересекает 180-й меридиан.",
+        tags=['User Objects'],
+        manual_parameters=[
+            openapi.Parameter('min_lat', openapi.IN_QUERY, description='Минимальная широта', type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('min_lon', openapi.IN_QUERY, description='Минимальная долгота', type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('max_lat', openapi.IN_QUERY, description='Максимальная широта', type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('max_lon', openapi.IN_QUERY, description='Максимальная долгота', type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('limit', openapi.IN_QUERY, description='Максимум объектов (по умолчанию 500, не больше 2000)', type=openapi.TYPE_INTEGER, required=False),
+        ],
+        responses={200: 'OK', 400: 'Bad Request', 401: 'Unauthorized'},
+        security=[{'Bearer': []}]
+    )
+    def get(self, request):
+        try:
+            query_serializer = UserObjectBBoxQuerySerializer(data=request.query_params)
+            if not query_serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'message': get_error_message('validation_error'),
+                    'errors': query_serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+            params = query_serializer.validated_data
+            
+            queryset = filter_bbox(
+                get_user_objects_queryset(request.user),
+                params['min_lat'], params['min_lon'], params['max_lat'], params['max_lon']
+            ).select_related(None).only('id', 'name', 'address', 'latitude', 'longitude', 'status').order_by('id')
+            
+            # Один лишний объект - признак того, что область обрезана по limit
+            user_objects = list(queryset[:params['limit'] + 1])
+            truncated = len(user_objects) > params['limit']
+            user_objects = user_objects[:params['limit']]
+            
+            serializer = UserObjectGeoSerializer(user_objects, many=True)
+            
+            return Response({
+                'success': True,
+                'message': 'Объекты в области получены успешно',
+                'data': serializer.data,
+                'truncated': truncated
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': get_error_message('server_error'),
+                'errors': {'detail': str(e)}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class UserObjectNearestAPIView(APIView):
+    """
+    Ближайшие к точке объекты пользователя
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @swagger_auto_schema(
+        operation_description="Получение k ближайших к точке объектов, отсортированных по расстоянию (distance_km). Видимость объектов - как в списке объектов.",
+        tags=['User Objects'],
+        manual_parameters=[
+            openapi.Parameter('lat', openapi.IN_QUERY, description='Широта точки', type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('lon', openapi.IN_QUERY, description='Долгота точки', type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('k', openapi.IN_QUERY, description='Количество объектов (по умолчанию 10, не больше 100)', type=openapi.TYPE_INTEGER, required=False),
+        ],
+        responses={200: 'OK', 400: 'Bad Request', 401: 'Unauthorized'},
+        security=[{'Bearer': []}]
+    )
+    def get(self, request):
+        try:
+            query_serializer = UserObjectNearestQuerySerializer(data=request.query_params)
+            if not query_serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'message': get_error_message('validation_error'),
+                    'errors': query_serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+            params = query_serializer.validated_data
+            
+            queryset = get_user_objects_queryset(request.user)\
+                .select_related(None)\
+                .only('id', 'name', 'address', 'latitude', 'longitude', 'status')
+            
+            user_objects = []
+            for user_object, distance_km in find_nearest(queryset, params['lat'], params['lon'], params['k']):
+                user_object.distance_km = distance_km
+                user_objects.append(user_object)
+            
+            serializer = UserObjectGeoSerializer(user_objects, many=True)
+            
+            return Response({
+                'success': True,
+                'message': 'Ближайшие объекты получены успешно',
+                'data': serializer.data
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': get_error_message('server_error'),
+                'errors': {'detail': str(e)}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class UserObjectClustersAPIView(APIView):
+    """
+    Кластеры объектов на карте для уровня масштаба
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @swagger_auto_schema(
+        operation_description="Получение кластеров объектов в области карты для уровня масштаба zoom. Каждый кластер содержит центр, количество объектов, разбивку по статусам и границы ячейки. Администраторы получают предрасчитанные агрегаты, остальные роли - агрегаты по видимым им объектам.",
+        tags=['User Objects'],
+        manual_parameters=[
+            openapi.Parameter('zoom', openapi.IN_QUERY, description='Уровень масштаба карты (0-16)', type=openapi.TYPE_INTEGER, required=True),
+            openapi.Parameter('min_lat', openapi.IN_QUERY, description='Минимальная широта', type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('min_lon', openapi.IN_QUERY, description='Минимальная долгота', type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('max_lat', openapi.IN_QUERY, description='Максимальная широта', type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('max_lon', openapi.IN_QUERY, description='Максимальная долгота', type=openapi.TYPE_NUMBER, required=True),
+        ],
+        responses={200: 'OK', 400: 'Bad Request', 401: 'Unauthorized'},
+        security=[{'Bearer': []}]
+    )
+    def get(self, request):
+        try:
+            query_serializer = UserObjectClustersQuerySerializer(data=request.query_params)
+            if not query_serializer.is_valid():
+                return Response({
+                    'success': False,
+                    'message': get_error_message('validation_error'),
+                    'errors': query_serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+            params = query_serializer.validated_data
+            bbox = (params['min_lat'], params['min_lon'], params['max_lat'], params['max_lon'])
+            
+            if is_admin(request.user):
+                # Администратор видит все объекты - используем предрасчитанные тайлы
+                clusters = get_tile_clusters(params['zoom'], *bbox)
+            else:
+                clusters = get_queryset_clusters(get_user_objects_queryset(request.user), params['zoom'], *bbox)
+            
+            return Response({
+                'success': True,
+                'message': 'Кластеры объектов получены успешно',
+                'data': clusters
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': get_error_message('server_error'),
+                'errors': {'detail': str(e)}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
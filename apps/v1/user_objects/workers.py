@@ -0,0 +1,81 @@
+"""
+Список работников, сгруппированных по ролям (WorkersListAPIView)
+
+Все роли загружаются одним запросом (JOIN групп пользователя), результат
+хранится в общем кэше под ключом с версией. Версия увеличивается сигналами
+при изменении пользователей, их групп и самих групп (bump_workers_version) -
+старые записи просто перестают читаться и вытесняются по таймауту.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from apps.v1.accounts.models import CustomUser
+from apps.v1.accounts.roles import WORKER_ROLES
+
+# Поля пользователя, которые попадают в список работников
+WORKER_FIELDS = ['id', 'first_name', 'last_name', 'email', 'phone_number']
+
+WORKERS_VERSION_CACHE_KEY = 'workers_by_role:version'
+WORKERS_CACHE_KEY = 'workers_by_role:{version}'
+WORKERS_CACHE_TIMEOUT = 3600  # секунд
+
+
+def get_workers_version():
+    """
+    Текущая версия списка работников
+
+    Начальное значение - время в мс: после вытеснения ключа версии из кэша
+    новая версия не совпадет со старыми записями.
+    """
+    version = cache.get(WORKERS_VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(WORKERS_VERSION_CACHE_KEY, int(time.time() * 1000), None)
+        version = cache.get(WORKERS_VERSION_CACHE_KEY)
+    return version
+
+
+def bump_workers_version():
+    """
+    Сброс кэша списка работников (после коммита транзакции)
+    """
+    def bump():
+        try:
+            cache.incr(WORKERS_VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(WORKERS_VERSION_CACHE_KEY, int(time.time() * 1000), None)
+    transaction.on_commit(bump)
+
+
+def build_workers_by_role():
+    """
+    Активные работники по ролям одним запросом: {role_name: [worker, ...]}
+
+    Пользователь с несколькими ролями попадает в каждую из них.
+    """
+    workers_by_role = {role_name: [] for role_name in WORKER_ROLES}
+    rows = CustomUser.objects.filter(
+        is_active=True,
+        groups__name__in=WORKER_ROLES
+    ).annotate(
+        role_name=F('groups__name')
+    ).order_by('first_name', 'last_name', 'id').values('role_name', *WORKER_FIELDS)
+
+    for row in rows:
+        role_name = row.pop('role_name')
+        workers_by_role[role_name].append(row)
+    return workers_by_role
+
+
+def get_workers_by_role():
+    """
+    Список работников по ролям из кэша (при промахе - build_workers_by_role)
+    """
+    cache_key = WORKERS_CACHE_KEY.format(version=get_workers_version())
+    workers_by_role = cache.get(cache_key)
+    if workers_by_role is None:
+        workers_by_role = build_workers_by_role()
+        cache.set(cache_key, workers_by_role, WORKERS_CACHE_TIMEOUT)
+    return workers_by_role
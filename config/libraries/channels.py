@@ -0,0 +1,51 @@
+import os
+
+# Channel Layers
+# memory - InMemoryChannelLayer, faqat bitta process (Daphne) ichida ishlaydi.
+# redis / redis_pubsub - Daphne, gunicorn va Celery processlari umumiy layer orqali
+# xabar almashadi. CHANNEL_REDIS_URLS - vergul bilan ajratilgan Redis URL'lar,
+# har biri alohida shard (kanal/guruh nomi bo'yicha consistent hash).
+# redis_pubsub - Redis Pub/Sub (at-most-once, navbat yo'q), bildirishnomalar uchun
+# yetarli va lokal stub (apps.v1.notification.redis_stub) bilan ishlaydi.
+CHANNEL_LAYER_BACKENDS = {
+    'memory': 'channels.layers.InMemoryChannelLayer',
+    'redis': 'channels_redis.core.RedisChannelLayer',
+    'redis_pubsub': 'channels_redis.pubsub.RedisPubSubChannelLayer',
+}
+
+
+def build_channel_layer(backend='memory', urls=(), prefix='asgi', capacity=100, expiry=60, group_expiry=86400):
+    """
+    CHANNEL_LAYERS['default'] konfiguratsiyasi
+    """
+    if backend not in CHANNEL_LAYER_BACKENDS:
+        raise ValueError(f'Unknown channel layer backend: {backend}')
+    if backend == 'memory':
+        return {
+            'BACKEND': CHANNEL_LAYER_BACKENDS[backend],
+            'CONFIG': {'capacity': capacity, 'expiry': expiry, 'group_expiry': group_expiry},
+        }
+    config = {
+        'hosts': [{'address': url} for url in urls],
+        'prefix': prefix,
+    }
+    if backend == 'redis':
+        config.update(capacity=capacity, expiry=expiry, group_expiry=group_expiry)
+    return {'BACKEND': CHANNEL_LAYER_BACKENDS[backend], 'CONFIG': config}
+
+
+CHANNEL_LAYER_BACKEND = os.getenv('CHANNEL_LAYER_BACKEND', 'memory')
+CHANNEL_REDIS_URLS = [
+    url.strip() for url in os.getenv('CHANNEL_REDIS_URLS', 'redis://localhost:6379/1').split(',') if url.strip()
+]
+
+CHANNEL_LAYERS = {
+    'default': build_channel_layer(
+        CHANNEL_LAYER_BACKEND,
+        CHANNEL_REDIS_URLS,
+        prefix=os.getenv('CHANNEL_LAYER_PREFIX', 'safecode'),
+        capacity=int(os.getenv('CHANNEL_LAYER_CAPACITY', 100)),
+        expiry=int(os.getenv('CHANNEL_LAYER_EXPIRY', 60)),
+        group_expiry=int(os.getenv('CHANNEL_LAYER_GROUP_EXPIRY', 86400)),
+    ),
+}
@@ -2,12 +2,12 @@ from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.utils import timezone
 from apps.v1.accounts.models import CustomUser
+from apps.v1.accounts.tokens import get_tokens_for_user
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -79,7 +79,7 @@ class SwaggerTokenView(APIView):
         user.save(update_fields=['last_login'])
         
         # Generate JWT tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = get_tokens_for_user(user)
         access_token = str(refresh.access_token)
         refresh_token = str(refresh)
         
@@ -77,6 +77,7 @@ LOCAL_APPS = [
     'apps.v1.user_objects',
     'apps.v1.documents',
     'apps.v1.orders',
+    'apps.v1.dashboard',
 ]
 
 THIRD_PARTY_APPS = [
@@ -228,6 +229,12 @@ SITE_ID = 1
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
 CELERY_TIMEZONE = TIME_ZONE
+# Тесты: задачи выполняются сразу в процессе (без брокера)
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+
+# Доставка уведомлений из сигналов: sync (в запросе), on_commit (после коммита
+# в процессе) или celery (после коммита задачей apps.v1.notification.tasks)
+NOTIFICATION_DELIVERY = os.getenv('NOTIFICATION_DELIVERY', 'sync')
 
 from celery.schedules import crontab
 
@@ -236,17 +243,19 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.v1.notification.views.notify_expiring_services',
         'schedule': crontab(minute=0, hour=8),
     },
-}
-
-# Channel Layers - InMemoryChannelLayer faqat bir process ichida ishlaydi
-# Agar Gunicorn va Daphne alohida processlarda ishlasa, Redis kerak
-# Lekin agar bitta processda (Daphne) ishlatsangiz, InMemoryChannelLayer yetarli
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer'
+    'refresh-dashboard-rollups-every-15-minutes': {
+        'task': 'apps.v1.dashboard.tasks.refresh_dashboard_rollups',
+        'schedule': crontab(minute='*/15'),
+    },
+    'reconcile-unread-notification-counts-hourly': {
+        'task': 'apps.v1.notification.tasks.reconcile_unread_notification_counts',
+        'schedule': crontab(minute=30),
     },
 }
 
+# Channel Layers - config/libraries/channels.py (CHANNEL_LAYER_BACKEND, CHANNEL_REDIS_URLS)
+from config.libraries.channels import CHANNEL_LAYERS
+
 ASGI_APPLICATION = 'config.asgi.application'
 
 SWAGGER_SETTINGS = {
@@ -60,6 +60,7 @@ schema_view = get_schema_view(
         path('api/v1/user_objects/', include('apps.v1.user_objects.urls')),
         path('api/v1/documents/', include('apps.v1.documents.urls')),
         path('api/v1/orders/', include('apps.v1.orders.urls')),
+        path('api/v1/dashboard/', include('apps.v1.dashboard.urls')),
     ],
     generator_class=CustomOpenAPISchemaGenerator,
     url=settings.BASE_URL if not settings.DEBUG else None,  # Auto-detect in development, use BASE_URL in production
@@ -88,6 +89,7 @@ urlpatterns += [
     path('api/v1/user_objects/', include('apps.v1.user_objects.urls')),
     path('api/v1/documents/', include('apps.v1.documents.urls')),
     path('api/v1/orders/', include('apps.v1.orders.urls')),
+    path('api/v1/dashboard/', include('apps.v1.dashboard.urls')),
 ]
 
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)